@@ -2,10 +2,12 @@
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import uvicorn
+import json
 import sys
 from pathlib import Path
 
@@ -14,7 +16,11 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from app.database import get_db_manager
-from app.agents import get_teacher_agent, get_problem_agent, get_review_agent
+from app.agents import get_teacher_agent, get_problem_agent, get_review_agent, get_problem_bank
+from app.agents.semantic_cache import get_semantic_cache
+from app.agents.llm import get_llm_registry
+from app.rag import start_background_warmup, get_warmup_status, get_vectorstore_manager, is_ready
+from app.sandbox import get_sandbox_pool
 from app.models.schemas import (
     TopicCategory,
     DifficultyLevel,
@@ -69,6 +75,7 @@ class ProblemGenerateRequest(BaseModel):
     difficulty: DifficultyLevel
     problem_type: ProblemType
     count: int = 1
+    user_id: Optional[str] = None  # 지정하면 문제 은행에서 이미 받은 문제 제외
 
 class ProblemResponse(BaseModel):
     id: str
@@ -80,6 +87,7 @@ class ProblemResponse(BaseModel):
     answer: str
     explanation: str
     hints: Optional[List[str]]
+    function_name: Optional[str] = None  # 테스트 케이스로 채점하는 함수 이름
 
 class ProblemAttemptRequest(BaseModel):
     user_id: str
@@ -88,7 +96,9 @@ class ProblemAttemptRequest(BaseModel):
 
 class CodeReviewRequest(BaseModel):
     code: str
-    problem_id: Optional[str] = None
+    problem_id: Optional[str] = None  # 문제 은행 문제("bank-...")면 테스트 케이스로 채점
+    llm_feedback: Optional[bool] = None  # 테스트를 모두 통과해도 LLM 피드백 요청
+    profile: Optional[bool] = None  # 테스트를 모두 통과하면 입력 크기별 성능 측정 (1초 안팎 추가)
 
 class CodeReviewResponse(BaseModel):
     is_correct: bool
@@ -96,6 +106,12 @@ class CodeReviewResponse(BaseModel):
     feedback: str
     suggestions: List[str]
     improved_code: Optional[str]
+    graded_by: str = "llm"
+    cached: bool = False  # 같은 코드의 저장된 리뷰 결과
+    tests_passed: Optional[int] = None
+    tests_total: Optional[int] = None
+    performance: Optional[Dict[str, Any]] = None  # 입력 크기별 측정값과 실측 시간 복잡도
+    static_analysis: Optional[Dict[str, Any]] = None  # 문법 오류, 발견 사항, 순환 복잡도
 
 class UserStats(BaseModel):
     total_attempts: int
@@ -104,6 +120,16 @@ class UserStats(BaseModel):
     by_topic: List[Dict[str, Any]]
     by_difficulty: List[Dict[str, Any]]
 
+# 시작 훅: 임베딩 모델과 벡터 스토어를 백그라운드에서 미리 로드
+@app.on_event("startup")
+async def start_warmup():
+    start_background_warmup()
+    # 보충 스레드는 warm-up이 끝난 뒤 생성을 시작 (문제 은행 자체는 모델을 로드하지 않음)
+    if settings.problem_bank_enabled and settings.problem_bank_refiller:
+        get_problem_bank().start_refiller()
+    # 첫 제출이 워커 생성 비용을 떠안지 않도록 샌드박스 워커를 미리 띄움
+    await run_in_threadpool(get_sandbox_pool)
+
 # 인증 헬퍼
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """현재 사용자 인증 (향후 JWT 토큰 검증으로 확장 가능)"""
@@ -122,6 +148,51 @@ async def health_check():
     """헬스 체크"""
     return {"status": "healthy", "service": "python-educator-api"}
 
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """레디니스 체크 (warm-up 완료 전에는 503)"""
+    status_info = get_warmup_status()
+    if not status_info["ready"]:
+        # 이전 warm-up이 재시도까지 모두 실패했으면 다시 시작 (진행 중이면 그대로)
+        start_background_warmup()
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming_up", **status_info},
+        )
+    return {"status": "ready", **status_info}
+
+@app.get("/cache/stats", tags=["Health"])
+async def semantic_cache_stats():
+    """TeacherAgent 의미 기반 캐시 히트율 / 절약 토큰"""
+    if not settings.semantic_cache_enabled:
+        return {"enabled": False}
+    return {"enabled": True, **get_semantic_cache().stats()}
+
+@app.get("/rag/cache/stats", tags=["Health"])
+async def rag_query_cache_stats():
+    """RAG 쿼리 임베딩 / 검색 결과 / 청크 벡터 캐시 히트율"""
+    # warm-up 전에는 벡터 스토어를 만들지 않음 (모델 로드가 요청을 막지 않도록)
+    if not is_ready():
+        return {"ready": False}
+    return {"ready": True, **get_vectorstore_manager().query_cache.stats()}
+
+@app.get("/llm/stats", tags=["Health"])
+async def llm_stats():
+    """프로바이더별 LLM 동시 요청 / 대기 현황"""
+    return get_llm_registry().stats()
+
+@app.get("/code/review/stats", tags=["Health"])
+async def code_review_stats():
+    """리뷰 방식별 건수 (정적 분석/로컬 채점/리뷰 캐시로 생략한 LLM 호출 수)"""
+    return await run_in_threadpool(get_review_agent().stats)
+
+@app.get("/problems/bank/stats", tags=["Health"])
+async def problem_bank_stats():
+    """문제 은행 히트율과 버킷별 재고"""
+    if not settings.problem_bank_enabled:
+        return {"enabled": False}
+    return {"enabled": True, **await run_in_threadpool(get_problem_bank().stats)}
+
 # 사용자 관리
 @app.post("/users", response_model=UserResponse, tags=["Users"])
 async def create_user(user: UserCreate):
@@ -152,12 +223,48 @@ async def get_user_stats(user_id: str):
         raise HTTPException(status_code=404, detail=str(e))
 
 # 학습 기능
+def save_chat_exchange(request: QuestionRequest, response: str):
+    """질문과 응답을 채팅 기록에 저장"""
+    db = get_db_manager()
+    db.save_chat_message(
+        user_id=request.user_id,
+        role="user",
+        content=request.question,
+        topic=request.topic.value
+    )
+    db.save_chat_message(
+        user_id=request.user_id,
+        role="assistant",
+        content=response,
+        topic=request.topic.value
+    )
+
+def to_problem_response(problem) -> ProblemResponse:
+    """Problem을 API 응답 모델로 변환"""
+    return ProblemResponse(
+        id=problem.id,  # 문제 은행 문제는 "bank-..." (코드 리뷰 시 테스트 케이스 조회에 사용)
+        topic=problem.topic.value,
+        difficulty=problem.difficulty.value,
+        problem_type=problem.problem_type.value,
+        question=problem.question,
+        options=problem.options,
+        answer=problem.answer,
+        explanation=problem.explanation,
+        hints=problem.hints,
+        function_name=problem.function_name
+    )
+
+def sse_event(data: dict, event: str = None) -> str:
+    """Server-Sent Events 메시지 포맷"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @app.post("/teach", response_model=TeachResponse, tags=["Teaching"])
 async def teach(request: QuestionRequest):
     """질문에 대한 교육 응답"""
     try:
         teacher = get_teacher_agent()
-        response = teacher.teach_sync(
+        response = await teacher.teach(
             question=request.question,
             topic=request.topic,
             difficulty=request.difficulty,
@@ -165,19 +272,7 @@ async def teach(request: QuestionRequest):
         )
 
         # 채팅 기록 저장
-        db = get_db_manager()
-        db.save_chat_message(
-            user_id=request.user_id,
-            role="user",
-            content=request.question,
-            topic=request.topic.value
-        )
-        db.save_chat_message(
-            user_id=request.user_id,
-            role="assistant",
-            content=response,
-            topic=request.topic.value
-        )
+        await run_in_threadpool(save_chat_exchange, request, response)
 
         return TeachResponse(
             response=response,
@@ -187,36 +282,115 @@ async def teach(request: QuestionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/teach/stream", tags=["Teaching"])
+async def teach_stream(request: QuestionRequest):
+    """
+    질문에 대한 교육 응답 스트리밍 (Server-Sent Events)
+
+    - `data: {"token": "..."}`: 생성된 텍스트 조각
+    - `event: done`: 응답 완료 (채팅 기록 저장 후 전송)
+    - `event: error`: 생성 중 오류
+    """
+    teacher = get_teacher_agent()
+
+    async def event_stream():
+        parts = []
+        try:
+            async for token in teacher.astream_teach(
+                question=request.question,
+                topic=request.topic,
+                difficulty=request.difficulty,
+                chat_history=[]
+            ):
+                parts.append(token)
+                yield sse_event({"token": token})
+
+            # 스트림이 끝까지 완료된 경우에만 채팅 기록 저장
+            await run_in_threadpool(save_chat_exchange, request, "".join(parts))
+        except Exception as e:
+            yield sse_event({"detail": str(e)}, event="error")
+            return
+
+        yield sse_event(
+            {"topic": request.topic.value, "difficulty": request.difficulty.value},
+            event="done",
+        )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # 문제 생성 및 풀이
 @app.post("/problems/generate", response_model=List[ProblemResponse], tags=["Problems"])
 async def generate_problems(request: ProblemGenerateRequest):
     """문제 생성"""
     try:
-        problem_agent = get_problem_agent()
-        problems = problem_agent.generate_problems_sync(
-            topic=request.topic,
-            difficulty=request.difficulty,
-            problem_type=request.problem_type,
-            count=request.count
-        )
+        if settings.problem_bank_enabled and request.count == 1:
+            # 미리 생성해 둔 문제가 있으면 LLM 호출 없이 바로 출제
+            problem = await run_in_threadpool(
+                get_problem_bank().serve,
+                request.topic, request.difficulty, request.problem_type, request.user_id
+            )
+            if problem is not None:
+                return [to_problem_response(problem)]
 
-        return [
-            ProblemResponse(
-                id=str(hash(p.question)),  # 임시 ID 생성
-                topic=p.topic.value,
-                difficulty=p.difficulty.value,
-                problem_type=p.problem_type.value,
-                question=p.question,
-                options=p.options,
-                answer=p.answer,
-                explanation=p.explanation,
-                hints=p.hints
+        problem_agent = get_problem_agent()
+        if request.count > settings.problem_batch_size:
+            # 많은 문제는 작은 묶음으로 나눠 병렬 생성 + 중복 제거
+            problems = await problem_agent.generate_problems_batch_list(
+                topic=request.topic,
+                difficulty=request.difficulty,
+                problem_type=request.problem_type,
+                count=request.count
+            )
+        else:
+            problems = await problem_agent.generate_problems(
+                topic=request.topic,
+                difficulty=request.difficulty,
+                problem_type=request.problem_type,
+                count=request.count
             )
-            for p in problems
-        ]
+
+        return [to_problem_response(p) for p in problems]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/problems/generate/stream", tags=["Problems"])
+async def generate_problems_stream(request: ProblemGenerateRequest):
+    """
+    문제 생성 스트리밍 (Server-Sent Events, 묶음 단위 병렬 생성)
+
+    - `data: {...}`: 생성된 문제 하나 (ProblemResponse 형식)
+    - `event: done`: 생성 완료 (생성된 문제 수)
+    - `event: error`: 생성 중 오류
+    """
+    problem_agent = get_problem_agent()
+
+    async def event_stream():
+        produced = 0
+        try:
+            async for problem in problem_agent.generate_problems_batch(
+                topic=request.topic,
+                difficulty=request.difficulty,
+                problem_type=request.problem_type,
+                count=request.count
+            ):
+                produced += 1
+                yield sse_event(to_problem_response(problem).model_dump())
+        except Exception as e:
+            yield sse_event({"detail": str(e)}, event="error")
+            return
+
+        yield sse_event({"count": produced}, event="done")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.post("/problems/submit", tags=["Problems"])
 async def submit_problem_attempt(request: ProblemAttemptRequest):
     """문제 풀이 제출 (객관식/단답형)"""
@@ -257,14 +431,31 @@ async def review_code(request: CodeReviewRequest):
     """코드 리뷰"""
     try:
         review_agent = get_review_agent()
-        result = review_agent.review_submission_sync(code=request.code)
+        # 샌드박스 실행/DB 조회/LLM 호출이 이벤트 루프를 막지 않도록 비동기 경로로
+        problem = (
+            await run_in_threadpool(get_problem_bank().get, request.problem_id)
+            if request.problem_id else None
+        )
+        result = await review_agent.review_submission(
+            code=request.code,
+            problem=problem,
+            llm_feedback=request.llm_feedback,
+            profile=request.profile,
+        )
 
+        tests = result.test_results
         return CodeReviewResponse(
             is_correct=result.is_correct,
             score=result.score,
             feedback=result.feedback,
             suggestions=result.suggestions or [],
-            improved_code=result.improved_code
+            improved_code=result.improved_code,
+            graded_by=result.graded_by,
+            cached=result.cached,
+            tests_passed=sum(1 for t in tests if t.passed) if tests else None,
+            tests_total=len(tests) if tests else None,
+            performance=result.performance.model_dump() if result.performance else None,
+            static_analysis=result.static_analysis.model_dump() if result.static_analysis else None
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
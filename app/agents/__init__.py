@@ -1,6 +1,7 @@
 from .teacher_agent import TeacherAgent, get_teacher_agent
 from .problem_agent import ProblemAgent, get_problem_agent
 from .review_agent import CodeReviewAgent, get_review_agent
+from .problem_bank import ProblemBank, get_problem_bank
 
 __all__ = [
     "TeacherAgent",
@@ -9,4 +10,6 @@ __all__ = [
     "get_problem_agent",
     "CodeReviewAgent",
     "get_review_agent",
+    "ProblemBank",
+    "get_problem_bank",
 ]
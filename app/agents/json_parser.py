@@ -0,0 +1,252 @@
+"""LLM 응답에서 문제 JSON 객체를 관대하게 추출하는 파서
+
+LLM은 JSON 앞뒤에 설명을 붙이거나, 코드 블록을 덧붙이거나, 출력 길이
+제한에 걸려 중간에 끊기거나, 끝에 쉼표를 남기는 등 엄격한 json.loads로는
+읽을 수 없는 응답을 자주 돌려줍니다. 여기서는 문자열/이스케이프를 추적하며
+중괄호 짝을 맞춰, 완성된 문제 객체("question" 키를 가진 객체)를 토큰이
+도착하는 대로 하나씩 꺼냅니다. 응답이 잘리더라도 마지막 미완성 객체 이전의
+문제는 모두 건집니다.
+"""
+import ast
+import io
+import json
+import re
+from typing import Any, Optional
+
+
+_CODE_FENCE = re.compile(r"```[a-zA-Z]*")
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_INVALID_ESCAPE = re.compile(r'\\(?![\\"/bfnrtu])')
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"'})
+
+# 문자열 안의 따옴표가 이스케이프되지 않은 경우, 닫는 따옴표 뒤에는 이 문자들만 올 수 있음
+_STRING_TERMINATORS = ",:}]"
+
+
+def _next_char(text: str, index: int) -> str:
+    """index 이후 첫 공백이 아닌 문자 (없으면 빈 문자열)"""
+    for ch in text[index:index + 64]:
+        if not ch.isspace():
+            return ch
+    rest = text[index + 64:].lstrip()
+    return rest[0] if rest else ""
+
+
+def _escape_inner_quotes(text: str) -> str:
+    """문자열 값 안의 이스케이프되지 않은 따옴표를 \\" 로 바꿈 (닫는 따옴표는 유지)"""
+    out = []
+    in_string = False
+    escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                following = _next_char(text, i + 1)
+                if following and following not in _STRING_TERMINATORS:
+                    out.append('\\"')
+                    continue
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        out.append(ch)
+    return "".join(out)
+
+
+def _strip_line_comments(text: str) -> str:
+    """문자열 밖의 // 주석을 줄 끝까지 제거"""
+    out = []
+    in_string = False
+    escape = False
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif text.startswith("//", i):
+            newline = text.find("\n", i)
+            i = len(text) if newline == -1 else newline
+            continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def loads_lenient(text: str) -> Any:
+    """
+    json.loads가 실패하면 흔한 결함을 고쳐 다시 시도
+
+    순서대로 시도: 원문 -> 끝 쉼표/잘못된 이스케이프 제거 -> 문자열 안 따옴표
+    이스케이프 -> // 주석 제거 -> Python 리터럴(작은따옴표, True/None) -> 둥근
+    따옴표 치환.
+    문자열 안의 줄바꿈/탭 같은 제어 문자는 strict=False로 허용합니다.
+
+    Raises:
+        ValueError: 모든 복구 시도가 실패한 경우
+    """
+    repaired = _INVALID_ESCAPE.sub(r"\\\\", _TRAILING_COMMA.sub(r"\1", text))
+    for candidate in (text, repaired, _escape_inner_quotes(repaired)):
+        try:
+            return json.loads(candidate, strict=False)
+        except json.JSONDecodeError:
+            pass
+
+    if "//" in text:
+        uncommented = _TRAILING_COMMA.sub(r"\1", _strip_line_comments(text))
+        try:
+            return json.loads(_INVALID_ESCAPE.sub(r"\\\\", uncommented), strict=False)
+        except json.JSONDecodeError:
+            pass
+
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        pass
+
+    try:
+        return json.loads(repaired.translate(_SMART_QUOTES), strict=False)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON을 복구할 수 없음: {e}") from e
+
+
+def _extract_objects(data: Any, required_key: str) -> list[dict]:
+    """파싱된 값에서 문제 객체 목록 추출 ({"problems": [...]}, [...], 단일 객체)"""
+    if isinstance(data, dict):
+        if required_key in data:
+            return [data]
+        for value in data.values():
+            if isinstance(value, list):
+                return [item for item in value if isinstance(item, dict) and required_key in item]
+        return []
+    if isinstance(data, list):
+        return [item for item in data if isinstance(item, dict) and required_key in item]
+    return []
+
+
+class ProblemStreamParser:
+    """스트리밍 텍스트에서 완성된 문제 객체를 도착하는 대로 추출"""
+
+    def __init__(self, required_key: str = "question"):
+        """
+        Args:
+            required_key: 문제 객체로 인정할 필수 키
+        """
+        self.required_key = required_key
+        self.objects = []
+        self.failed = 0
+        self._buffer = io.StringIO()  # 지금까지 받은 전체 텍스트 (append 전용)
+        self._length = 0
+        self._pos = 0
+        self._stack = []  # 열린 '{' 위치
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> list[dict]:
+        """
+        텍스트 조각을 추가하고 이번에 새로 완성된 문제 객체 반환
+
+        객체 밖(설명 문장 등)의 따옴표는 무시하고, 문자열 안의 이스케이프되지
+        않은 따옴표는 뒤따르는 문자로 닫는 따옴표인지 판단합니다. 판단에 필요한
+        뒤 문자가 아직 도착하지 않았으면 다음 조각을 기다립니다.
+        """
+        self._buffer.seek(0, io.SEEK_END)
+        self._buffer.write(chunk)
+        self._length += len(chunk)
+
+        # 이미 훑은 부분은 다시 보지 않음: 판단을 미뤄 둔 꼬리 + 새 조각만 스캔
+        base = self._pos
+        text = self._read(base, self._length)
+        found = []
+
+        i = 0
+        while i < len(text):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    following = _next_char(text, i + 1)
+                    if not following:
+                        break  # 닫는 따옴표인지 알 수 없음 -> 다음 조각 대기
+                    if following in _STRING_TERMINATORS:
+                        self._in_string = False
+            elif ch == '"':
+                if self._stack:
+                    self._in_string = True
+            elif ch == "{":
+                self._stack.append(base + i)
+            elif ch == "}" and self._stack:
+                start = self._stack.pop()
+                obj = self._load(self._read(start, base + i + 1))
+                if obj is not None:
+                    found.append(obj)
+            i += 1
+        self._pos = base + i
+
+        self.objects.extend(found)
+        return found
+
+    def _read(self, start: int, end: int) -> str:
+        """버퍼에서 [start, end) 구간만 읽음 (전체 텍스트를 복사하지 않음)"""
+        self._buffer.seek(start)
+        return self._buffer.read(end - start)
+
+    def _load(self, fragment: str) -> Optional[dict]:
+        try:
+            data = loads_lenient(fragment)
+        except ValueError:
+            # 문제 객체처럼 시작하는 조각만 집계 (바깥 객체 실패는 안쪽 실패의 결과)
+            if fragment[1:].lstrip().startswith(f'"{self.required_key}"'):
+                self.failed += 1
+            return None
+        if isinstance(data, dict) and self.required_key in data:
+            return data
+        return None
+
+    def close(self) -> list[dict]:
+        """
+        스트림 종료 처리
+
+        객체를 하나도 찾지 못했으면(작은따옴표 Python dict 등 중괄호 추적이 안 되는
+        형식) 코드 블록 표시를 걷어낸 전체 텍스트를 한 번에 복구해 봅니다.
+        """
+        if self._pos < self._length:
+            # 마지막 따옴표 판단을 미뤄 둔 경우 문자열 끝으로 보고 마저 처리
+            self._in_string = False
+            self._pos += 1
+            self.feed("")
+        if self.objects:
+            return []
+
+        stripped = _CODE_FENCE.sub("", self._buffer.getvalue())
+        start, end = stripped.find("{"), stripped.rfind("}")
+        candidates = [stripped.strip()]
+        if start != -1 and end > start:
+            candidates.append(stripped[start:end + 1])
+        for candidate in candidates:
+            try:
+                found = _extract_objects(loads_lenient(candidate), self.required_key)
+            except ValueError:
+                continue
+            self.objects.extend(found)
+            return found
+        return []
+
+
+def parse_problem_objects(text: str, required_key: str = "question") -> list[dict]:
+    """전체 응답 텍스트에서 문제 객체 목록 추출 (스트리밍이 아닌 경우)"""
+    parser = ProblemStreamParser(required_key)
+    parser.feed(text)
+    parser.close()
+    return parser.objects
@@ -0,0 +1,162 @@
+"""테스트 케이스 기반 로컬 채점
+
+코딩/알고리즘 문제에 함수 이름과 테스트 케이스가 있으면, 학생 코드를 샌드박스
+워커에서 실행해 함수를 테스트별로 호출하고 기대값과 비교합니다. 모두 통과한
+제출은 LLM 호출 없이 수 ms 안에 채점되고, LLM은 실패했거나 피드백을 요청한
+경우에만 호출됩니다.
+"""
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.config import get_settings
+from app.models.schemas import PerformanceProfile, Problem, TestCase, TestCaseResult
+from app.sandbox import get_sandbox_pool, is_sandbox_failure
+
+
+logger = logging.getLogger(__name__)
+
+_CODE_BLOCK = re.compile(r"```(?:python|py)?\s*\n(.*?)```", re.DOTALL)
+
+
+@dataclass
+class JudgeResult:
+    """테스트 케이스 채점 결과"""
+    results: list[TestCaseResult] = field(default_factory=list)
+    output: str = ""
+    error: str = ""  # 함수 정의 전 코드 실행 자체가 실패한 경우
+    performance: Optional[PerformanceProfile] = None  # 모두 통과한 경우의 성능 측정
+    sandbox_failure: bool = False  # 크래시/시간·메모리 한도 등 다시 실행하면 달라질 수 있는 실패
+
+    @property
+    def passed(self) -> int:
+        return sum(1 for result in self.results if result.passed)
+
+    @property
+    def total(self) -> int:
+        return len(self.results)
+
+    @property
+    def all_passed(self) -> bool:
+        return not self.error and self.total > 0 and self.passed == self.total
+
+    @property
+    def score(self) -> int:
+        return round(self.passed / self.total * 100) if self.total else 0
+
+
+def extract_code(text: str) -> str:
+    """정답 텍스트에서 코드만 추출 (```python 블록이 있으면 블록 내용)"""
+    match = _CODE_BLOCK.search(text or "")
+    return match.group(1).strip() if match else (text or "").strip()
+
+
+def normalize_test_cases(data) -> list[TestCase]:
+    """
+    LLM이 만든 테스트 케이스 목록을 TestCase로 변환
+
+    input이 리스트가 아니면 인자 하나로 보고 감쌉니다. 형식이 잘못된 항목은 버립니다.
+    """
+    if not isinstance(data, list):
+        return []
+    cases = []
+    for item in data:
+        if not isinstance(item, dict) or "expected" not in item:
+            continue
+        args = item.get("input", [])
+        if not isinstance(args, list):
+            args = [args]
+        time_limit = item.get("time_limit_ms")
+        try:
+            cases.append(TestCase(
+                input=args,
+                expected=item["expected"],
+                time_limit_ms=int(time_limit) if time_limit else None,
+            ))
+        except (TypeError, ValueError):
+            continue
+    return cases
+
+
+def judge_submission(code: str, problem: Optional[Problem], pool=None) -> Optional[JudgeResult]:
+    """
+    문제의 테스트 케이스로 코드 채점
+
+    Args:
+        code: 학생 코드
+        problem: 문제 (함수 이름과 테스트 케이스가 있어야 채점)
+        pool: 샌드박스 풀 (None이면 공용 풀)
+
+    Returns:
+        채점 결과 (채점할 수 없는 문제면 None)
+    """
+    if not problem or not problem.function_name or not problem.test_cases:
+        return None
+
+    settings = get_settings()
+    raw = (pool or get_sandbox_pool()).judge(
+        code,
+        problem.function_name,
+        [case.model_dump() for case in problem.test_cases],
+        default_time_limit_ms=settings.judge_time_limit_ms,
+    )
+
+    error = "" if raw["success"] else raw["error"]
+    results = []
+    for index, case in enumerate(problem.test_cases):
+        if index < len(raw["tests"]):
+            outcome = raw["tests"][index]
+        else:
+            # 함수 정의 전에 실패했거나 워커가 중단된 경우 남은 테스트는 실패 처리
+            outcome = {"passed": False, "error": error.splitlines()[0] if error else "실행되지 않음"}
+        results.append(TestCaseResult(input=case.input, expected=case.expected, **outcome))
+
+    return JudgeResult(
+        results=results,
+        output=raw.get("output", ""),
+        error=error,
+        sandbox_failure=is_sandbox_failure(raw),
+    )
+
+
+def verify_test_cases(problem: Problem, pool=None) -> Problem:
+    """
+    정답 코드로 테스트 케이스를 검증해 정답 코드가 통과하지 못하는 케이스를 제거
+
+    LLM이 만든 기대값이 틀린 경우 올바른 제출이 오답 처리되는 것을 막습니다.
+    정답 코드가 실행되지 않으면 테스트 케이스를 모두 버려 LLM 채점으로 넘깁니다.
+    """
+    if not problem.function_name or not problem.test_cases:
+        return problem
+
+    result = judge_submission(extract_code(problem.answer), problem, pool=pool)
+    verified = [
+        case for case, outcome in zip(problem.test_cases, result.results)
+        if outcome.passed
+    ]
+    if len(verified) < len(problem.test_cases):
+        logger.info(
+            "정답 코드와 맞지 않는 테스트 케이스 제거: %d/%d개 유지 (%s)",
+            len(verified), len(problem.test_cases), problem.function_name,
+        )
+    problem.test_cases = verified
+    if not verified:
+        problem.function_name = None
+    return problem
+
+
+def format_judge_result(result: JudgeResult, max_failures: int = 3) -> str:
+    """LLM 리뷰 프롬프트에 넣을 채점 결과 요약 (실패한 테스트 위주)"""
+    lines = [f"테스트 케이스: {result.passed}/{result.total}개 통과"]
+    if result.error:
+        lines.append(f"실행 에러:\n{result.error}")
+        return "\n".join(lines)
+
+    failures = [r for r in result.results if not r.passed]
+    for failure in failures[:max_failures]:
+        detail = failure.error or f"실제 반환값 {failure.actual}"
+        lines.append(f"- 입력 {failure.input!r} -> 기대값 {failure.expected!r}, {detail}")
+    if len(failures) > max_failures:
+        lines.append(f"- 외 {len(failures) - max_failures}개 실패")
+    return "\n".join(lines)
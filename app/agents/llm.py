@@ -0,0 +1,433 @@
+"""공유 LLM 클라이언트 레지스트리
+
+에이전트마다 ChatOllama / ChatAnthropic 인스턴스를 따로 만들면 HTTP 연결
+풀도 따로 생기고, 프로바이더 전체의 동시 요청 수를 제어할 수 없습니다.
+여기서는 프로바이더별로 클라이언트를 하나만 만들어 공유하고, 에이전트별
+temperature는 .bind()로 적용합니다. 모든 호출은 프로바이더별 제한기
+(최대 동시 실행 수 + 초당 요청 수)를 거치며, 한도를 넘는 요청은 실패하지
+않고 대기합니다.
+
+정적인 시스템 지시문은 static_system_message()로 만들어 프롬프트 맨 앞에 두면
+Anthropic 프롬프트 캐시(cache_control)와 Ollama의 프롬프트 접두부 재사용
+(keep_alive로 모델을 메모리에 유지)의 대상이 됩니다. 호출마다 캐시된/캐시되지
+않은 입력 토큰 수를 PromptCacheMetrics가 기록합니다.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import SystemMessage
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_anthropic import ChatAnthropic
+
+from app.config import get_settings
+from app.rag.context import estimate_tokens
+
+try:
+    # 인스턴스마다 httpx 클라이언트(연결 풀)를 유지하는 공식 통합 패키지
+    from langchain_ollama import ChatOllama
+except ImportError:
+    from langchain_community.chat_models import ChatOllama
+
+
+logger = logging.getLogger(__name__)
+
+
+def static_system_message(text: str, provider: str = None) -> SystemMessage:
+    """
+    호출마다 바뀌지 않는 시스템 지시문 메시지 (프롬프트 캐시 대상 접두부)
+
+    템플릿이 아닌 메시지이므로 text의 중괄호는 그대로 전달됩니다. Anthropic이면
+    cache_control을 붙여 도구 정의부터 이 블록까지를 캐시합니다.
+    """
+    settings = get_settings()
+    provider = provider or settings.llm_provider
+    if provider == "anthropic" and settings.anthropic_prompt_caching:
+        return SystemMessage(content=[
+            {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}},
+        ])
+    return SystemMessage(content=text)
+
+
+def _message_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") for block in content
+        if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+
+class PromptCacheMetrics(BaseCallbackHandler):
+    """
+    LLM 호출별 캐시된/캐시되지 않은 입력 토큰 기록
+
+    - Anthropic: usage의 cache_read / cache_creation 토큰 (정확한 값)
+    - Ollama: prompt_eval_count가 실제로 평가한(캐시되지 않은) 토큰 수이고,
+      캐시된 토큰은 전체 프롬프트 추정 토큰에서 이를 뺀 추정치
+    """
+
+    run_inline = True
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self._lock = threading.Lock()
+        self._prompt_tokens = {}  # run_id -> 프롬프트 추정 토큰 (Ollama용)
+        self.calls = 0
+        self.input_tokens = 0
+        self.cached_tokens = 0
+        self.cache_write_tokens = 0
+        self.output_tokens = 0
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        if self.provider == "ollama" and messages:
+            tokens = sum(estimate_tokens(_message_text(m.content)) for m in messages[0])
+            with self._lock:
+                self._prompt_tokens[run_id] = tokens
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        with self._lock:
+            self._prompt_tokens.pop(run_id, None)
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs) -> None:
+        with self._lock:
+            estimated_prompt = self._prompt_tokens.pop(run_id, 0)
+        if not response.generations or not response.generations[0]:
+            return
+        generation = response.generations[0][0]
+        message = getattr(generation, "message", None)
+        usage = getattr(message, "usage_metadata", None) or {}
+
+        if self.provider == "ollama":
+            info = {**(generation.generation_info or {}), **getattr(message, "response_metadata", {})}
+            uncached = info.get("prompt_eval_count", usage.get("input_tokens", 0)) or 0
+            input_tokens = max(uncached, estimated_prompt)
+            cached = input_tokens - uncached
+            cache_write = 0
+            output = info.get("eval_count", usage.get("output_tokens", 0)) or 0
+        else:
+            details = usage.get("input_token_details") or {}
+            input_tokens = usage.get("input_tokens", 0)
+            cached = details.get("cache_read") or 0
+            cache_write = details.get("cache_creation") or 0
+            uncached = input_tokens - cached - cache_write
+            output = usage.get("output_tokens", 0)
+
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.cached_tokens += cached
+            self.cache_write_tokens += cache_write
+            self.output_tokens += output
+        logger.info(
+            "llm call: provider=%s input=%d cached=%d cache_write=%d uncached=%d output=%d",
+            self.provider, input_tokens, cached, cache_write, uncached, output,
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "input_tokens": self.input_tokens,
+                "cached_input_tokens": self.cached_tokens,
+                "cache_write_tokens": self.cache_write_tokens,
+                "cached_ratio": self.cached_tokens / self.input_tokens if self.input_tokens else 0.0,
+                "output_tokens": self.output_tokens,
+                "estimated": self.provider == "ollama",
+            }
+
+
+class ProviderLimiter:
+    """
+    프로바이더별 동시 실행 수와 초당 요청 수 제한 (스레드/이벤트 루프 공용)
+
+    빈 슬롯이 없으면 FIFO 대기열에 들어가고, 슬롯을 반납하는 쪽이 다음 대기자에게
+    직접 넘겨줍니다. 스레드는 threading.Event로, 코루틴은 자기 이벤트 루프의 Future로
+    기다리므로 폴링 없이 깨어나고 대기 중에 스레드를 점유하지 않습니다.
+    """
+
+    def __init__(self, max_concurrency: int, requests_per_second: float = 0):
+        """
+        Args:
+            max_concurrency: 동시에 진행 중인 요청 최대 수
+            requests_per_second: 초당 요청 시작 수 상한 (0이면 제한 없음)
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_second = requests_per_second
+        self._lock = threading.Lock()
+        self._available = self.max_concurrency
+        # threading.Event(스레드) 또는 (이벤트 루프, Future)(코루틴)
+        self._waiters = deque()
+        self._next_slot = 0.0
+        self.in_flight = 0
+        self.waiting = 0
+
+    def _reserve_slot(self) -> float:
+        """요청 시작 시각을 1/rps 간격으로 예약하고 기다릴 시간 반환"""
+        if self.requests_per_second <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.requests_per_second
+        return slot - now
+
+    def _take_or_wait(self, waiter) -> bool:
+        """빈 슬롯이 있고 앞선 대기자가 없으면 바로 차지 (True), 아니면 대기열에 추가"""
+        with self._lock:
+            if self._available and not self._waiters:
+                self._available -= 1
+                return True
+            self._waiters.append(waiter)
+            self.waiting += 1
+            return False
+
+    def _release(self) -> None:
+        """슬롯을 다음 대기자에게 넘기거나 (대기자가 없으면) 반납"""
+        while True:
+            with self._lock:
+                if not self._waiters:
+                    self._available += 1
+                    return
+                waiter = self._waiters.popleft()
+                self.waiting -= 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+                return
+            loop, future = waiter
+            try:
+                loop.call_soon_threadsafe(self._wake, future)
+                return
+            except RuntimeError:
+                # 대기자의 이벤트 루프가 이미 닫힘: 다음 대기자에게
+                continue
+
+    def _wake(self, future: asyncio.Future) -> None:
+        """(대기자의 이벤트 루프에서) 넘겨받은 슬롯 전달, 그새 취소됐으면 다시 넘김"""
+        if future.cancelled():
+            self._release()
+        else:
+            future.set_result(None)
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._release()
+
+    @contextmanager
+    def acquire(self):
+        event = threading.Event()
+        if not self._take_or_wait(event):
+            event.wait()
+        self._enter()
+        try:
+            delay = self._reserve_slot()
+            if delay > 0:
+                time.sleep(delay)
+            yield
+        finally:
+            self._exit()
+
+    @asynccontextmanager
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future())
+        if not self._take_or_wait(waiter):
+            try:
+                await waiter[1]
+            except asyncio.CancelledError:
+                with self._lock:
+                    queued = waiter in self._waiters
+                    if queued:
+                        self._waiters.remove(waiter)
+                        self.waiting -= 1
+                # 슬롯을 이미 넘겨받은 뒤 취소됐으면 반납 (전달 전에 취소됐으면 _wake가 반납)
+                if not queued and waiter[1].done() and not waiter[1].cancelled():
+                    self._release()
+                raise
+        self._enter()
+        try:
+            delay = self._reserve_slot()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield
+        finally:
+            self._exit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "requests_per_second": self.requests_per_second,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+            }
+
+
+class LimitedChatModel(Runnable):
+    """
+    호출마다 ProviderLimiter를 거치는 채팅 모델 래퍼
+
+    Runnable이므로 `prompt | llm | parser` 체인과 .bind()를 그대로 쓸 수 있고,
+    스트리밍 호출은 스트림이 끝날 때까지 슬롯을 점유합니다.
+    """
+
+    def __init__(
+        self,
+        model: Runnable,
+        limiter: ProviderLimiter,
+        provider: str,
+        metrics: PromptCacheMetrics = None,
+    ):
+        self.model = model
+        self.limiter = limiter
+        self.provider = provider
+        self.metrics = metrics
+
+    @property
+    def InputType(self) -> Any:
+        return self.model.InputType
+
+    @property
+    def OutputType(self) -> Any:
+        return self.model.OutputType
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        with self.limiter.acquire():
+            return self.model.invoke(input, config, **kwargs)
+
+    async def ainvoke(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Any:
+        async with self.limiter.aacquire():
+            return await self.model.ainvoke(input, config, **kwargs)
+
+    def stream(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Iterator[Any]:
+        with self.limiter.acquire():
+            yield from self.model.stream(input, config, **kwargs)
+
+    async def astream(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        async with self.limiter.aacquire():
+            async for chunk in self.model.astream(input, config, **kwargs):
+                yield chunk
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> "LimitedChatModel":
+        """구조화 출력 모델도 같은 제한기를 거치도록 래핑"""
+        return LimitedChatModel(
+            self.model.with_structured_output(schema, **kwargs),
+            self.limiter, self.provider, self.metrics,
+        )
+
+
+class LLMRegistry:
+    """프로바이더별 공유 클라이언트와 제한기"""
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def _create_model(self, provider: str) -> LimitedChatModel:
+        settings = self.settings
+        metrics = PromptCacheMetrics(provider)
+        if provider == "ollama":
+            model = ChatOllama(
+                model=settings.ollama_model,
+                base_url=settings.ollama_base_url,
+                # 모델을 메모리에 유지해야 같은 접두부의 KV 캐시를 재사용할 수 있음
+                keep_alive=settings.ollama_keep_alive,
+                callbacks=[metrics],
+            )
+            limiter = ProviderLimiter(
+                settings.ollama_max_concurrency, settings.ollama_requests_per_second
+            )
+        else:
+            model = ChatAnthropic(
+                model=settings.anthropic_model,
+                anthropic_api_key=settings.anthropic_api_key,
+                max_tokens=4096,
+                max_retries=settings.anthropic_max_retries,
+                callbacks=[metrics],
+            )
+            limiter = ProviderLimiter(
+                settings.anthropic_max_concurrency, settings.anthropic_requests_per_second
+            )
+        return LimitedChatModel(model, limiter, provider, metrics)
+
+    def get_model(self, provider: str = None) -> LimitedChatModel:
+        """프로바이더의 공유 모델 (temperature 미지정)"""
+        provider = provider or self.settings.llm_provider
+        with self._lock:
+            if provider not in self._models:
+                self._models[provider] = self._create_model(provider)
+            return self._models[provider]
+
+    def get_chat_model(self, temperature: float, provider: str = None) -> Runnable:
+        """temperature를 바인딩한 공유 모델"""
+        provider = provider or self.settings.llm_provider
+        model = self.get_model(provider)
+        if provider == "ollama":
+            # Ollama는 샘플링 파라미터를 요청의 options로 받음
+            return model.bind(options={"temperature": temperature})
+        return model.bind(temperature=temperature)
+
+    def get_json_model(self, temperature: float, tool_schema: dict, provider: str = None) -> Runnable:
+        """
+        JSON 출력을 강제한 공유 모델
+
+        Ollama는 JSON 모드(format="json"), Anthropic은 tool_schema 도구 호출을
+        강제합니다. Anthropic 응답의 JSON은 메시지 본문이 아니라 tool call 인자로
+        오며, 스트리밍 시에는 tool_call_chunks에 조각으로 도착합니다.
+
+        Args:
+            tool_schema: Anthropic 도구 정의 (name, description, input_schema)
+        """
+        provider = provider or self.settings.llm_provider
+        model = self.get_model(provider)
+        if provider == "ollama":
+            return model.bind(options={"temperature": temperature}, format="json")
+        return model.bind(
+            temperature=temperature,
+            tools=[tool_schema],
+            tool_choice={"type": "tool", "name": tool_schema["name"]},
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                provider: {**model.limiter.stats(), "prompt_cache": model.metrics.stats()}
+                for provider, model in self._models.items()
+            }
+
+
+# 싱글톤 인스턴스
+_llm_registry = None
+_llm_registry_lock = threading.Lock()
+
+
+def get_llm_registry() -> LLMRegistry:
+    global _llm_registry
+    if _llm_registry is None:
+        with _llm_registry_lock:
+            if _llm_registry is None:
+                _llm_registry = LLMRegistry()
+    return _llm_registry
+
+
+def get_llm(temperature: float) -> Runnable:
+    """설정된 프로바이더의 공유 LLM (에이전트별 temperature 적용)"""
+    return get_llm_registry().get_chat_model(temperature)
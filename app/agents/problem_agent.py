@@ -1,11 +1,16 @@
+import asyncio
 import json
+import logging
 import uuid
+from typing import AsyncIterator
+
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_community.chat_models import ChatOllama
-from langchain_anthropic import ChatAnthropic
 
 from app.config import get_settings
+from app.agents.llm import get_llm, get_llm_registry, static_system_message
+from app.agents.json_parser import ProblemStreamParser, parse_problem_objects
+from app.agents.problem_dedup import ProblemDeduplicator
+from app.agents.judge import normalize_test_cases, verify_test_cases
 from app.rag.retriever import get_retriever
 from app.models.schemas import (
     TopicCategory,
@@ -15,13 +20,12 @@ from app.models.schemas import (
 )
 
 
-PROBLEM_GENERATION_PROMPT = """당신은 컴퓨터공학과 학생들을 위한 Python 문제 출제 전문가입니다.
+logger = logging.getLogger(__name__)
 
-## 출제 조건
-- 주제: {topic}
-- 난이도: {difficulty}
-- 문제 유형: {problem_type}
-- 출제 개수: {count}개
+
+# 호출마다 같은 지시문 (프롬프트 캐시 대상 접두부, 템플릿 변수 없음)
+PROBLEM_GENERATION_PROMPT = """당신은 컴퓨터공학과 학생들을 위한 Python 문제 출제 전문가입니다.
+사용자가 제시하는 출제 조건과 참고 자료에 맞춰 문제를 만듭니다.
 
 ## 문제 유형별 형식
 
@@ -39,6 +43,7 @@ PROBLEM_GENERATION_PROMPT = """당신은 컴퓨터공학과 학생들을 위한
 - **제약 조건**: 입력값의 범위, 시간/공간 제한
 - **입출력 예시**: 최소 2-3개의 예시 (입력 -> 출력)
 - **예시 설명**: 각 예시가 어떻게 동작하는지 설명
+- 채점용 "function_name"과 "test_cases" (아래 응답 형식 참고)
 
 ### 디버깅 (debugging)
 - 실제로 실행 가능한 버그가 있는 코드 제시 (완전한 코드)
@@ -55,56 +60,104 @@ PROBLEM_GENERATION_PROMPT = """당신은 컴퓨터공학과 학생들을 위한
 - **입출력 예시**: 최소 3개 이상의 다양한 테스트 케이스
 - **예시 설명**: 각 예시의 동작 과정 설명
 - 요구되는 시간/공간 복잡도
+- 채점용 "function_name"과 "test_cases" (아래 응답 형식 참고)
 
 ### 단답형 (short_answer)
 - 개념이나 결과를 묻는 문제
 - 짧은 답변 요구
 
-## 참고 자료
-{context}
-
 ## 응답 형식
 반드시 다음 JSON 형식으로만 응답하세요. 다른 텍스트는 포함하지 마세요:
 
 ```json
-{{
+{
   "problems": [
-    {{
+    {
       "question": "문제 내용 (코딩/알고리즘의 경우 입출력 예시 포함)",
       "options": ["선택지1", "선택지2", "선택지3", "선택지4"],
       "answer": "정답 (코딩/알고리즘은 완전한 정답 코드)",
       "explanation": "상세한 해설 (풀이 과정, 시간복잡도 분석 등)",
-      "hints": ["힌트1", "힌트2", "힌트3"]
-    }}
+      "hints": ["힌트1", "힌트2", "힌트3"],
+      "function_name": "정답 코드의 함수 이름",
+      "test_cases": [
+        {"input": [인자1, 인자2], "expected": 기대 반환값},
+        {"input": [인자1, 인자2], "expected": 기대 반환값, "time_limit_ms": 1000}
+      ]
+    }
   ]
-}}
+}
 ```
 
 **중요**:
 - 객관식이 아닌 경우 "options" 필드는 생략
+- 코딩/알고리즘 문제는 answer가 하나의 함수로 답하도록 출제하고, "function_name"과
+  5-8개의 "test_cases"(경계값 포함)를 반드시 포함. "input"은 함수에 넘길 위치 인자의
+  JSON 배열, "expected"는 정답 함수의 반환값 (print 출력이 아닌 return 값)
+- 그 외 유형은 "function_name"과 "test_cases" 필드를 생략
 - 코딩/알고리즘 문제의 question에는 반드시 입출력 예시를 포함
 - answer에는 완전히 실행 가능한 정답 코드를 포함
 - explanation에는 풀이 접근법과 핵심 로직 설명을 포함
 """
 
+# 호출마다 바뀌는 출제 조건
+PROBLEM_REQUEST_PROMPT = """## 출제 조건
+- 주제: {topic}
+- 난이도: {difficulty}
+- 문제 유형: {problem_type}
+- 출제 개수: {count}개
 
-def get_llm():
-    """설정에 따라 LLM 인스턴스 반환"""
-    settings = get_settings()
+## 참고 자료
+{context}
 
-    if settings.llm_provider == "ollama":
-        return ChatOllama(
-            model=settings.ollama_model,
-            base_url=settings.ollama_base_url,
-            temperature=0.8,
-        )
-    else:
-        return ChatAnthropic(
-            model=settings.anthropic_model,
-            anthropic_api_key=settings.anthropic_api_key,
-            temperature=0.8,
-            max_tokens=4096,
-        )
+{request}"""
+
+# Anthropic 구조화 출력용 도구 정의 (프롬프트의 응답 형식과 동일한 구조)
+PROBLEM_SET_TOOL = {
+    "name": "submit_problems",
+    "description": "출제한 문제 목록을 제출합니다.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "problems": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "question": {"type": "string"},
+                        "options": {"type": "array", "items": {"type": "string"}},
+                        "answer": {"type": "string"},
+                        "explanation": {"type": "string"},
+                        "hints": {"type": "array", "items": {"type": "string"}},
+                        "function_name": {"type": "string"},
+                        "test_cases": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "input": {"type": "array"},
+                                    "expected": {},
+                                    "time_limit_ms": {"type": "integer"},
+                                },
+                                "required": ["input", "expected"],
+                            },
+                        },
+                    },
+                    "required": ["question", "answer", "explanation"],
+                },
+            },
+        },
+        "required": ["problems"],
+    },
+}
+
+DEFAULT_REQUEST = "위 조건에 맞는 문제를 생성해주세요."
+
+# 병렬 묶음끼리는 서로의 결과를 모르므로 묶음마다 다른 방향을 요청
+BATCH_REQUEST = (
+    DEFAULT_REQUEST
+    + " 이 요청은 전체 {total}문제 중 {index}번째 묶음입니다."
+    " 다른 묶음과 겹치지 않도록 서로 다른 세부 개념, 상황, 예시를 사용하세요."
+)
 
 
 class ProblemAgent:
@@ -112,15 +165,97 @@ class ProblemAgent:
 
     def __init__(self):
         self.settings = get_settings()
-        self.llm = get_llm()
+        if self.settings.llm_structured_output:
+            # Ollama JSON 모드 / Anthropic 도구 호출로 JSON 형식 강제
+            self.llm = get_llm_registry().get_json_model(0.8, PROBLEM_SET_TOOL)
+        else:
+            self.llm = get_llm(temperature=0.8)
         self.retriever = get_retriever()
 
     def _get_prompt(self) -> ChatPromptTemplate:
         return ChatPromptTemplate.from_messages([
-            ("system", PROBLEM_GENERATION_PROMPT),
-            ("human", "위 조건에 맞는 문제를 생성해주세요."),
+            static_system_message(PROBLEM_GENERATION_PROMPT),
+            ("human", PROBLEM_REQUEST_PROMPT),
         ])
 
+    def _build_inputs(
+        self,
+        topic: TopicCategory,
+        difficulty: DifficultyLevel,
+        problem_type: ProblemType,
+        count: int,
+        documents: list,
+        request: str = DEFAULT_REQUEST,
+    ) -> dict:
+        """검색 문서로 컨텍스트를 만들고 프롬프트 입력값 구성"""
+        context = self.retriever.get_context_string(
+            documents, max_tokens=self.settings.problem_context_tokens
+        )
+        return {
+            "topic": self._get_topic_korean(topic),
+            "difficulty": self._get_difficulty_korean(difficulty),
+            "problem_type": self._get_problem_type_korean(problem_type),
+            "count": count,
+            "context": context,
+            "request": request,
+        }
+
+    @staticmethod
+    def _response_text(message) -> str:
+        """모델 출력(메시지 또는 스트리밍 조각)에서 JSON 텍스트 추출"""
+        # Anthropic 도구 호출: 스트리밍 조각은 tool_call_chunks, 전체 메시지는 tool_calls
+        chunks = getattr(message, "tool_call_chunks", None)
+        if chunks:
+            return "".join(chunk.get("args") or "" for chunk in chunks)
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            return json.dumps(tool_calls[0]["args"], ensure_ascii=False)
+
+        content = message.content
+        if isinstance(content, list):
+            return "".join(
+                block.get("text", "") for block in content
+                if isinstance(block, dict) and block.get("type") == "text"
+            )
+        return content
+
+    def _to_problem(
+        self,
+        data: dict,
+        topic: TopicCategory,
+        difficulty: DifficultyLevel,
+        problem_type: ProblemType,
+    ) -> Problem:
+        """문제 딕셔너리를 Problem으로 변환 (선택지/힌트 형식 보정, 테스트 케이스 검증)"""
+        options = data.get("options")
+        if isinstance(options, dict):
+            options = list(options.values())
+        elif isinstance(options, str):
+            options = [options]
+        hints = data.get("hints") or []
+        if isinstance(hints, str):
+            hints = [hints]
+
+        function_name = data.get("function_name")
+        test_cases = normalize_test_cases(data.get("test_cases"))
+
+        problem = Problem(
+            id=str(uuid.uuid4()),
+            topic=topic,
+            difficulty=difficulty,
+            problem_type=problem_type,
+            question=str(data.get("question", "")),
+            options=[str(option) for option in options] if options else None,
+            answer=str(data.get("answer", "")),
+            explanation=str(data.get("explanation", "")),
+            hints=[str(hint) for hint in hints],
+            function_name=str(function_name) if function_name and test_cases else None,
+            test_cases=test_cases if function_name else [],
+        )
+        if problem.test_cases and self.settings.judge_enabled:
+            problem = verify_test_cases(problem)
+        return problem
+
     def _parse_response(
         self,
         response: str,
@@ -128,38 +263,39 @@ class ProblemAgent:
         difficulty: DifficultyLevel,
         problem_type: ProblemType,
     ) -> list[Problem]:
-        """LLM 응답을 Problem 객체로 파싱"""
-        try:
-            # JSON 부분 추출
-            json_start = response.find("{")
-            json_end = response.rfind("}") + 1
-            if json_start == -1 or json_end == 0:
-                raise ValueError("JSON not found in response")
-
-            json_str = response[json_start:json_end]
-            data = json.loads(json_str)
-
-            problems = []
-            for p in data.get("problems", []):
-                problem = Problem(
-                    id=str(uuid.uuid4()),
-                    topic=topic,
-                    difficulty=difficulty,
-                    problem_type=problem_type,
-                    question=p.get("question", ""),
-                    options=p.get("options"),
-                    answer=p.get("answer", ""),
-                    explanation=p.get("explanation", ""),
-                    hints=p.get("hints", []),
-                )
-                problems.append(problem)
-
-            return problems
-
-        except (json.JSONDecodeError, KeyError) as e:
-            # 파싱 실패 시 빈 리스트 반환
-            print(f"Failed to parse response: {e}")
-            return []
+        """LLM 응답을 Problem 객체로 파싱 (설명/코드 블록/잘린 응답에서도 완성된 문제는 복구)"""
+        problems = [
+            self._to_problem(data, topic, difficulty, problem_type)
+            for data in parse_problem_objects(response)
+            if data.get("question")
+        ]
+        if not problems:
+            logger.warning("문제 응답 파싱 실패 (%d자): %.200s", len(response), response)
+        return problems
+
+    async def _astream_problems(
+        self,
+        inputs: dict,
+        topic: TopicCategory,
+        difficulty: DifficultyLevel,
+        problem_type: ProblemType,
+    ) -> AsyncIterator[Problem]:
+        """
+        LLM 출력을 스트리밍으로 받으며 완성된 문제부터 차례로 반환
+
+        테스트 케이스 검증은 샌드박스 응답을 기다리므로 이벤트 루프를 막지 않도록 스레드에서
+        """
+        parser = ProblemStreamParser()
+        chain = self._get_prompt() | self.llm
+        async for chunk in chain.astream(inputs):
+            for data in parser.feed(self._response_text(chunk)):
+                if data.get("question"):
+                    yield await asyncio.to_thread(self._to_problem, data, topic, difficulty, problem_type)
+        for data in parser.close():
+            if data.get("question"):
+                yield await asyncio.to_thread(self._to_problem, data, topic, difficulty, problem_type)
+        if parser.failed:
+            logger.warning("문제 객체 %d개 복구 실패", parser.failed)
 
     async def generate_problems(
         self,
@@ -180,27 +316,20 @@ class ProblemAgent:
         Returns:
             생성된 문제 리스트
         """
-        # RAG로 관련 문서 검색
-        documents = self.retriever.retrieve_for_problem(
+        # RAG로 관련 문서 검색 (이벤트 루프를 막지 않도록 스레드 풀에서)
+        documents = await self.retriever.aretrieve_for_problem(
             topic, difficulty, problem_type.value
         )
-        context = self.retriever.get_context_string(documents)
-
-        # 프롬프트 생성
-        prompt = self._get_prompt()
+        inputs = self._build_inputs(topic, difficulty, problem_type, count, documents)
 
         # 체인 실행
-        chain = prompt | self.llm | StrOutputParser()
+        chain = self._get_prompt() | self.llm
+        response = await chain.ainvoke(inputs)
 
-        response = await chain.ainvoke({
-            "topic": self._get_topic_korean(topic),
-            "difficulty": self._get_difficulty_korean(difficulty),
-            "problem_type": self._get_problem_type_korean(problem_type),
-            "count": count,
-            "context": context,
-        })
-
-        return self._parse_response(response, topic, difficulty, problem_type)
+        # 파싱 중 테스트 케이스 검증(샌드박스 채점)이 이벤트 루프를 막지 않도록 스레드에서
+        return await asyncio.to_thread(
+            self._parse_response, self._response_text(response), topic, difficulty, problem_type
+        )
 
     def generate_problems_sync(
         self,
@@ -214,23 +343,113 @@ class ProblemAgent:
         documents = self.retriever.retrieve_for_problem(
             topic, difficulty, problem_type.value
         )
-        context = self.retriever.get_context_string(documents)
-
-        # 프롬프트 생성
-        prompt = self._get_prompt()
+        inputs = self._build_inputs(topic, difficulty, problem_type, count, documents)
 
         # 체인 실행
-        chain = prompt | self.llm | StrOutputParser()
+        chain = self._get_prompt() | self.llm
+        response = chain.invoke(inputs)
 
-        response = chain.invoke({
-            "topic": self._get_topic_korean(topic),
-            "difficulty": self._get_difficulty_korean(difficulty),
-            "problem_type": self._get_problem_type_korean(problem_type),
-            "count": count,
-            "context": context,
-        })
+        return self._parse_response(self._response_text(response), topic, difficulty, problem_type)
+
+    async def generate_problems_batch(
+        self,
+        topic: TopicCategory,
+        difficulty: DifficultyLevel,
+        problem_type: ProblemType,
+        count: int,
+        batch_size: int = None,
+        max_concurrency: int = None,
+    ) -> AsyncIterator[Problem]:
+        """
+        많은 문제를 작은 묶음으로 나눠 병렬 생성 (완성되는 문제부터 차례로 반환)
+
+        검색은 한 번만 하고 모든 묶음이 같은 컨텍스트를 사용합니다.
+        묶음 사이에 겹치는 문제는 버리고, 중복이나 파싱 실패로 모자라면
+        부족한 만큼 한 번 더 요청합니다.
+
+        Args:
+            topic: 주제
+            difficulty: 난이도
+            problem_type: 문제 유형
+            count: 생성할 문제 수
+            batch_size: LLM 호출 한 번에 요청할 문제 수 (None이면 설정값)
+            max_concurrency: 동시에 진행할 LLM 호출 수 (None이면 설정값)
+
+        Yields:
+            중복이 제거된 문제 (최대 count개)
+        """
+        batch_size = max(1, batch_size or self.settings.problem_batch_size)
+        semaphore = asyncio.Semaphore(
+            max(1, max_concurrency or self.settings.problem_batch_concurrency)
+        )
+
+        documents = await self.retriever.aretrieve_for_problem(
+            topic, difficulty, problem_type.value
+        )
+        dedup = ProblemDeduplicator(
+            self.retriever.vectorstore_manager.embed_query,
+            threshold=self.settings.problem_dedup_threshold,
+        )
+        # 묶음들이 스트리밍으로 만든 문제를 모으는 큐 (None은 묶음 하나가 끝났다는 표시)
+        queue = asyncio.Queue()
+
+        async def run_batch(size: int, index: int, total: int) -> None:
+            request = BATCH_REQUEST.format(total=total, index=index) if total > 1 else DEFAULT_REQUEST
+            inputs = self._build_inputs(topic, difficulty, problem_type, size, documents, request)
+            try:
+                async with semaphore:
+                    async for problem in self._astream_problems(
+                        inputs, topic, difficulty, problem_type
+                    ):
+                        await queue.put(problem)
+            except Exception as e:
+                # 실패 전까지 완성된 문제는 이미 큐에 들어가 있음
+                logger.warning("문제 묶음 생성 실패: %s", e)
+            finally:
+                await queue.put(None)
+
+        produced = 0
+        # 첫 라운드 + 모자란 만큼 보충하는 라운드 1회
+        for _ in range(2):
+            remaining = count - produced
+            if remaining <= 0:
+                break
+            sizes = [batch_size] * (remaining // batch_size)
+            if remaining % batch_size:
+                sizes.append(remaining % batch_size)
+            tasks = [
+                asyncio.ensure_future(run_batch(size, i + 1, len(sizes)))
+                for i, size in enumerate(sizes)
+            ]
+            try:
+                running = len(tasks)
+                while running and produced < count:
+                    problem = await queue.get()
+                    if problem is None:
+                        running -= 1
+                    elif await asyncio.to_thread(dedup.add, problem):
+                        produced += 1
+                        yield problem
+            finally:
+                for task in tasks:
+                    task.cancel()
+                # 취소된 묶음이 남긴 문제/종료 표시는 다음 라운드에 섞이지 않도록 비움
+                await asyncio.gather(*tasks, return_exceptions=True)
+                while not queue.empty():
+                    queue.get_nowait()
+
+        logger.info(
+            "batch problem generation: requested=%d produced=%d duplicates=%d",
+            count, produced, dedup.duplicates,
+        )
+
+    async def generate_problems_batch_list(self, *args, **kwargs) -> list[Problem]:
+        """generate_problems_batch 결과를 모두 모아 리스트로 반환"""
+        return [problem async for problem in self.generate_problems_batch(*args, **kwargs)]
 
-        return self._parse_response(response, topic, difficulty, problem_type)
+    def generate_problems_batch_sync(self, *args, **kwargs) -> list[Problem]:
+        """동기 버전의 병렬 문제 생성 (이벤트 루프가 없는 Streamlit/CLI용)"""
+        return asyncio.run(self.generate_problems_batch_list(*args, **kwargs))
 
     def _get_topic_korean(self, topic: TopicCategory) -> str:
         mapping = {
@@ -0,0 +1,291 @@
+"""미리 생성해 둔 문제 은행
+
+문제 생성은 LLM 호출 때문에 수 초가 걸립니다. (주제, 난이도, 유형) 버킷별로
+문제를 DB(SQLite/Supabase)에 미리 쌓아 두고, 요청 시에는 인덱스 조회 한 번으로
+사용자가 아직 받지 않은 문제를 꺼냅니다. 백그라운드 스레드가 버킷별 미출제
+문제 수를 워터마크 이상으로 유지하되, 버킷 크기는 최대 문제 수를 넘기지 않습니다.
+API/Streamlit 등 여러 프로세스가 떠 있어도 보충은 DB 임대를 가진 프로세스 하나만 합니다.
+"""
+import logging
+import os
+import socket
+import threading
+import uuid
+from typing import Optional
+
+from app.config import get_settings
+from app.database import get_db_manager
+from app.agents.problem_agent import get_problem_agent
+from app.rag.warmup import wait_until_ready
+from app.models.schemas import (
+    TopicCategory,
+    DifficultyLevel,
+    ProblemType,
+    Problem,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# 보충을 맡은 프로세스를 정하는 DB 임대 이름
+REFILL_LEASE = "problem_bank_refill"
+
+
+def _bucket_key(topic: str, difficulty: str, problem_type: str) -> tuple:
+    return (topic, difficulty, problem_type)
+
+
+class ProblemBank:
+    """버킷별 문제 은행 (조회 + 보충)"""
+
+    def __init__(
+        self,
+        db=None,
+        problem_agent=None,
+        watermark: int = None,
+        max_per_bucket: int = None,
+    ):
+        """
+        Args:
+            db: DB 매니저 (None이면 설정된 SQLite/Supabase)
+            problem_agent: 보충에 사용할 ProblemAgent (None이면 첫 보충 때 공용 에이전트)
+            watermark: 버킷별로 유지할 미출제 문제 수
+            max_per_bucket: 버킷별 최대 문제 수 (출제된 문제 포함)
+        """
+        self.settings = get_settings()
+        self.db = db or get_db_manager()
+        # ProblemAgent는 리트리버(임베딩 모델, Chroma)를 로드하므로 첫 보충 때 만듦
+        self._problem_agent = problem_agent
+        self.watermark = watermark if watermark is not None else self.settings.problem_bank_watermark
+        self.max_per_bucket = (
+            max_per_bucket if max_per_bucket is not None else self.settings.problem_bank_max_per_bucket
+        )
+
+        # 보충 임대: 주인이 죽으면 만료 후 다른 프로세스가 넘겨받음 (보충 주기보다 길게)
+        self._lease_owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lease_ttl = self.settings.problem_bank_refill_interval * 2 + 60
+
+        self._lock = threading.Lock()
+        # 요청이 들어온 적 있는 버킷 (DB에 이미 있는 버킷과 함께 보충 대상)
+        self._demanded = set()
+        self._refill_lock = threading.Lock()
+        self._refiller = None
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+
+    @property
+    def problem_agent(self):
+        if self._problem_agent is None:
+            self._problem_agent = get_problem_agent()
+        return self._problem_agent
+
+    def _to_problem(self, row: dict) -> Problem:
+        return Problem(
+            id=f"bank-{row['id']}",
+            topic=TopicCategory(row["topic"]),
+            difficulty=DifficultyLevel(row["difficulty"]),
+            problem_type=ProblemType(row["problem_type"]),
+            question=row["question"],
+            options=row.get("options"),
+            answer=row.get("answer") or "",
+            explanation=row.get("explanation") or "",
+            hints=row.get("hints") or [],
+            function_name=row.get("function_name"),
+            test_cases=row.get("test_cases") or [],
+        )
+
+    def get(self, problem_id: str) -> Optional[Problem]:
+        """serve가 돌려준 문제 ID("bank-<id>")로 문제 조회 (은행 문제가 아니면 None)"""
+        if not problem_id or not problem_id.startswith("bank-"):
+            return None
+        bank_id = problem_id[len("bank-"):]
+        if bank_id.isdigit():
+            bank_id = int(bank_id)
+        row = self.db.get_bank_problem(bank_id)
+        return self._to_problem(row) if row is not None else None
+
+    def serve(
+        self,
+        topic: TopicCategory,
+        difficulty: DifficultyLevel,
+        problem_type: ProblemType,
+        user_id=None,
+    ) -> Optional[Problem]:
+        """
+        은행에서 사용자가 아직 받지 않은 문제 하나를 꺼냄
+
+        Returns:
+            문제 (버킷이 비었으면 None, 이때는 호출 측이 직접 생성)
+        """
+        key = _bucket_key(topic.value, difficulty.value, problem_type.value)
+        row = self.db.serve_bank_problem(*key, user_id=user_id)
+
+        with self._lock:
+            self._demanded.add(key)
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        # 꺼낸 만큼 (또는 비어 있는 버킷을) 백그라운드에서 보충
+        self.request_refill()
+
+        return self._to_problem(row) if row is not None else None
+
+    def refill_bucket(
+        self,
+        topic: str,
+        difficulty: str,
+        problem_type: str,
+        unserved: int = 0,
+        total: int = 0,
+    ) -> int:
+        """미출제 문제가 워터마크보다 적으면 부족한 만큼 생성해 저장 (버킷 최대 문제 수까지만)"""
+        missing = min(self.watermark - unserved, self.max_per_bucket - total)
+        if missing <= 0:
+            return 0
+
+        problems = self.problem_agent.generate_problems_batch_sync(
+            topic=TopicCategory(topic),
+            difficulty=DifficultyLevel(difficulty),
+            problem_type=ProblemType(problem_type),
+            count=missing,
+        )
+        if not problems:
+            return 0
+
+        saved = self.db.save_bank_problems(topic, difficulty, problem_type, [
+            {
+                "question": p.question,
+                "options": p.options,
+                "answer": p.answer,
+                "explanation": p.explanation,
+                "hints": p.hints,
+                "function_name": p.function_name,
+                "test_cases": [case.model_dump() for case in p.test_cases],
+            }
+            for p in problems
+        ])
+        with self._lock:
+            self.generated += saved
+        logger.info("problem bank refill: %s/%s/%s +%d", topic, difficulty, problem_type, saved)
+        return saved
+
+    def _hold_refill_lease(self) -> bool:
+        """보충 임대 획득/연장 (다른 프로세스가 가졌거나 DB 오류면 False)"""
+        try:
+            return self.db.acquire_lease(REFILL_LEASE, self._lease_owner, self._lease_ttl)
+        except Exception:
+            logger.warning("problem bank 보충 임대 획득 실패", exc_info=True)
+            return False
+
+    def refill(self) -> int:
+        """요청된 버킷과 DB에 있는 버킷을 모두 워터마크까지 보충 (임대를 가진 프로세스만)"""
+        # 여러 스레드가 동시에 같은 버킷을 채우지 않도록 한 번에 하나만
+        with self._refill_lock:
+            if not self._hold_refill_lease():
+                return 0
+            stock = {
+                _bucket_key(row["topic"], row["difficulty"], row["problem_type"]): row
+                for row in self.db.get_bank_stock()
+            }
+            with self._lock:
+                buckets = set(stock) | self._demanded
+
+            saved = 0
+            for key in sorted(buckets):
+                # 버킷마다 LLM 호출이 길어질 수 있어 임대를 연장하며 진행
+                if not self._hold_refill_lease():
+                    break
+                row = stock.get(key, {})
+                try:
+                    saved += self.refill_bucket(
+                        *key,
+                        unserved=row.get("unserved") or 0,
+                        total=row.get("total") or 0,
+                    )
+                except Exception:
+                    logger.exception("problem bank refill 실패: %s", "/".join(key))
+            return saved
+
+    def request_refill(self) -> None:
+        """백그라운드 보충 스레드를 즉시 깨움 (스레드가 없으면 무시)"""
+        if self._refiller is not None:
+            self._refiller.wake()
+
+    def start_refiller(self) -> Optional["ProblemBankRefiller"]:
+        """
+        백그라운드 보충 스레드 시작 (이미 실행 중이면 그대로 반환)
+
+        problem_bank_refiller 설정이 꺼진 프로세스에서는 시작하지 않습니다 (None).
+        """
+        if not self.settings.problem_bank_refiller:
+            return None
+        with self._lock:
+            if self._refiller is None:
+                self._refiller = ProblemBankRefiller(
+                    self, self.settings.problem_bank_refill_interval
+                )
+                self._refiller.start()
+            return self._refiller
+
+    def stats(self) -> dict:
+        stock = self.db.get_bank_stock()
+        with self._lock:
+            served = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / served if served else 0.0,
+                "generated": self.generated,
+                "watermark": self.watermark,
+                "max_per_bucket": self.max_per_bucket,
+                "refiller": self._refiller is not None,
+                "buckets": stock,
+            }
+
+
+class ProblemBankRefiller(threading.Thread):
+    """주기적으로(또는 문제를 꺼낼 때마다) 문제 은행을 워터마크까지 보충"""
+
+    def __init__(self, bank: ProblemBank, interval: float):
+        super().__init__(name="problem-bank-refiller", daemon=True)
+        self.bank = bank
+        self.interval = interval
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        # 문제 생성은 RAG 검색을 쓰므로 warm-up(모델/인덱스 로드)이 끝난 뒤 시작
+        # (warm-up이 재시도까지 실패하면 잠시 뒤 warm-up부터 다시)
+        while not self._stop_event.is_set() and not wait_until_ready():
+            self._stop_event.wait(min(self.interval, 60))
+
+        while not self._stop_event.is_set():
+            try:
+                self.bank.refill()
+            except Exception:
+                logger.exception("problem bank refill 실패")
+            self._wake_event.wait(self.interval)
+            self._wake_event.clear()
+
+    def wake(self) -> None:
+        self._wake_event.set()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake_event.set()
+
+
+# 싱글톤 인스턴스
+_problem_bank = None
+_problem_bank_lock = threading.Lock()
+
+
+def get_problem_bank() -> ProblemBank:
+    global _problem_bank
+    if _problem_bank is None:
+        with _problem_bank_lock:
+            if _problem_bank is None:
+                _problem_bank = ProblemBank()
+    return _problem_bank
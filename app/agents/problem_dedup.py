@@ -0,0 +1,60 @@
+"""생성된 문제 중복 제거
+
+병렬로 생성한 문제 묶음끼리는 서로의 결과를 모르기 때문에 같은 문제가
+자주 나옵니다. 정규화한 문제 텍스트가 같거나, 문제 임베딩의 코사인
+유사도가 임계값 이상이면 중복으로 봅니다.
+"""
+import re
+from typing import Callable
+
+import numpy as np
+
+from app.models.schemas import Problem
+
+
+# 한글/영문/숫자만 남김 (공백, 구두점, 코드 기호 차이 무시)
+_NON_WORD_PATTERN = re.compile(r"[^0-9a-z가-힣]+")
+
+
+def normalize_question(question: str) -> str:
+    return _NON_WORD_PATTERN.sub("", question.lower())
+
+
+class ProblemDeduplicator:
+    """이미 받아들인 문제와 겹치는 문제를 걸러냄"""
+
+    def __init__(self, embed_query: Callable[[str], list[float]] = None, threshold: float = 0.92):
+        """
+        Args:
+            embed_query: 문제 임베딩 함수 (None이면 텍스트 비교만 수행)
+            threshold: 중복으로 볼 최소 코사인 유사도
+        """
+        self.embed_query = embed_query
+        self.threshold = threshold
+        self._texts = set()
+        self._vectors = []
+        self.duplicates = 0
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def add(self, problem: Problem) -> bool:
+        """중복이 아니면 기록하고 True, 중복이면 False"""
+        text = normalize_question(problem.question)
+        if not text or text in self._texts:
+            self.duplicates += 1
+            return False
+
+        vector = None
+        if self.embed_query is not None:
+            vector = self._embed(problem.question)
+            if self._vectors and float(np.max(np.stack(self._vectors) @ vector)) >= self.threshold:
+                self.duplicates += 1
+                return False
+
+        self._texts.add(text)
+        if vector is not None:
+            self._vectors.append(vector)
+        return True
@@ -0,0 +1,225 @@
+"""제출 코드 성능 측정과 실측 시간 복잡도 추정
+
+테스트 케이스 입력을 기준으로 입력 크기를 늘려 가며 샌드박스에서
+함수를 실행하고, 크기별 실행 시간/최대 메모리/함수 호출 수를 기록합니다 (크기는 √2배씩).
+측정된 시간에 대표적인 복잡도 함수(1, log n, n, n log n, n², n³, cⁿ)를 맞춰
+가장 잘 맞는 것을 실측 시간 복잡도로 보고, LLM 리뷰가 Big-O를 추측하지 않고
+측정값을 근거로 평가하게 합니다.
+"""
+import logging
+import math
+from typing import Callable, Optional
+
+from app.config import get_settings
+from app.models.schemas import PerformanceProfile, Problem, ProfileSample
+from app.sandbox import get_sandbox_pool
+
+
+logger = logging.getLogger(__name__)
+
+# 복잡도 이름 -> 크기 n에 대한 증가 함수
+COMPLEXITY_CLASSES: dict[str, Callable[[int], float]] = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: math.log2(n),
+    "O(n)": lambda n: float(n),
+    "O(n log n)": lambda n: n * math.log2(n),
+    "O(n^2)": lambda n: float(n) ** 2,
+    "O(n^3)": lambda n: float(n) ** 3,
+}
+
+# 지수 시간은 밑을 고정하지 않고 log t = α + βn 으로 맞춤 (피보나치 재귀는 약 1.6ⁿ)
+EXPONENTIAL = "O(c^n)"
+
+# 이보다 짧은 측정값은 타이머/캐시 잡음이 커서 추정에 쓰지 않음
+MIN_FIT_TIME_MS = 0.005
+MIN_FIT_SAMPLES = 3
+
+# 측정할 테스트 입력 수 (입력 크기가 큰 것부터)
+PROFILE_TEMPLATES = 3
+
+# n이 수천 이상인데도 이 시간 안에 끝나면 선형 시간일 수 없음 (Python 선형 순회는 ms 단위)
+SUBLINEAR_SIZE = 4096
+SUBLINEAR_MAX_TIME_MS = 0.02
+
+
+def _fit_error(sizes: list[int], times: list[float], growth: Callable[[int], float]) -> float:
+    """
+    time ≈ a + b·f(n) (b ≥ 0) 을 상대 오차 기준 최소제곱으로 맞춘 잔차
+
+    실행 시간이 크기에 따라 자릿수 단위로 달라지므로 각 점을 측정값으로 나눠
+    큰 n의 점이 적합을 독점하지 않게 합니다.
+    """
+    xs = [growth(n) for n in sizes]
+    weights = [1 / (t * t) for t in times]
+
+    # 가중 최소제곱: [Σw Σwx; Σwx Σwx²] [a b]ᵀ = [Σwt Σwxt]ᵀ
+    sw = sum(weights)
+    swx = sum(w * x for w, x in zip(weights, xs))
+    swxx = sum(w * x * x for w, x in zip(weights, xs))
+    swt = sum(w * t for w, t in zip(weights, times))
+    swxt = sum(w * x * t for w, x, t in zip(weights, xs, times))
+    det = sw * swxx - swx * swx
+    if abs(det) < 1e-12 * max(1.0, sw * swxx):
+        # f가 상수(O(1))인 경우: time ≈ a
+        a, b = swt / sw, 0.0
+    else:
+        b = (sw * swxt - swx * swt) / det
+        a = (swt - b * swx) / sw
+        if b < 0:
+            a, b = swt / sw, 0.0
+    return sum(w * (t - a - b * x) ** 2 for w, x, t in zip(weights, xs, times))
+
+
+def _exponential_fit(sizes: list[int], times: list[float]) -> tuple[float, float]:
+    """log t = α + βn 최소제곱 적합 -> (상대 오차 잔차, 밑 e^β)"""
+    logs = [math.log(t) for t in times]
+    count = len(sizes)
+    mean_n = sum(sizes) / count
+    mean_log = sum(logs) / count
+    var_n = sum((n - mean_n) ** 2 for n in sizes)
+    if var_n == 0:
+        return math.inf, 1.0
+    beta = sum((n - mean_n) * (y - mean_log) for n, y in zip(sizes, logs)) / var_n
+    alpha = mean_log - beta * mean_n
+    error = 0.0
+    for n, t in zip(sizes, times):
+        exponent = alpha + beta * n
+        if exponent > 700:  # exp 오버플로: 측정값과 동떨어진 적합
+            return math.inf, 1.0
+        error += ((t - math.exp(exponent)) / t) ** 2
+    return error, math.exp(beta)
+
+
+def fit_complexity(sizes: list[int], times: list[float]) -> Optional[str]:
+    """
+    크기별 실행 시간에 가장 잘 맞는 복잡도 클래스
+
+    잔차가 가장 작은 클래스를 고르되, 더 단순한 클래스의 잔차가 최소 잔차의
+    1.5배 이내면 단순한 쪽을 택합니다. 큰 n에서도 잡음 수준으로 빠르면 O(1)과
+    O(log n)을 구분할 수 없으므로 "O(log n) 이하", 잡음 수준의 측정값을 빼고
+    MIN_FIT_SAMPLES개 미만이면 None.
+    """
+    measured = [(n, t) for n, t in zip(sizes, times) if t is not None]
+    if measured and max(n for n, _ in measured) >= SUBLINEAR_SIZE:
+        if max(t for _, t in measured) < SUBLINEAR_MAX_TIME_MS:
+            return "O(log n) 이하"
+
+    points = [(n, t) for n, t in zip(sizes, times) if t is not None and t >= MIN_FIT_TIME_MS and n > 1]
+    if len(points) < MIN_FIT_SAMPLES:
+        return None
+    fit_sizes = [n for n, _ in points]
+    fit_times = [t for _, t in points]
+
+    errors = {
+        name: _fit_error(fit_sizes, fit_times, growth)
+        for name, growth in COMPLEXITY_CLASSES.items()
+    }
+    errors[EXPONENTIAL], base = _exponential_fit(fit_sizes, fit_times)
+    best = min(errors.values())
+    for name in errors:  # 단순한 클래스부터
+        if errors[name] <= best * 1.5 + 1e-9:
+            return f"O({base:.1f}^n)" if name == EXPONENTIAL else name
+    return None
+
+
+def measurement_sizes(max_size: int, start: int = 8) -> list[int]:
+    """start부터 max_size까지 √2배씩 늘린 입력 크기 목록 (지수 시간 함수도 여러 점을 얻도록)"""
+    sizes = []
+    size = float(start)
+    while round(size) <= max_size:
+        if not sizes or round(size) != sizes[-1]:
+            sizes.append(round(size))
+        size *= math.sqrt(2)
+    return sizes
+
+
+def _input_size(args: list) -> int:
+    """테스트 입력의 크기 (시퀀스 길이 합, 없으면 정수 값 합)"""
+    sequences = [len(arg) for arg in args if isinstance(arg, (list, str))]
+    if sequences:
+        return sum(sequences)
+    return sum(abs(arg) for arg in args if isinstance(arg, int) and not isinstance(arg, bool))
+
+
+def _to_profile(raw: dict) -> Optional[PerformanceProfile]:
+    if not raw["success"]:
+        logger.debug("성능 측정 실패: %s", raw["error"][:200])
+        return None
+    samples = [ProfileSample(**sample) for sample in raw["samples"]]
+    if not samples:
+        return None
+    return PerformanceProfile(
+        samples=samples,
+        time_complexity=fit_complexity(
+            [s.size for s in samples], [s.time_ms for s in samples]
+        ),
+        stopped_reason=raw["stopped"],
+    )
+
+
+def _slowest(profiles: list[PerformanceProfile]) -> PerformanceProfile:
+    """모두가 측정한 가장 큰 크기에서 가장 느린 프로파일 (최악의 경우에 가까운 입력)"""
+    common = min(profile.samples[-1].size for profile in profiles)
+
+    def time_at_common(profile):
+        return max(s.time_ms for s in profile.samples if s.size <= common)
+
+    # 더 작은 크기에서 시간 제한으로 멈춘 프로파일이 가장 느린 것
+    stopped_early = [p for p in profiles if p.samples[-1].size == common and p.stopped_reason]
+    return max(stopped_early or profiles, key=time_at_common)
+
+
+def profile_submission(code: str, problem: Optional[Problem], pool=None) -> Optional[PerformanceProfile]:
+    """
+    테스트 입력을 기준으로 입력 크기를 늘려 가며 성능 측정
+
+    입력에 따라 일찍 끝나는 함수(중복 검사 등)가 있으므로 가장 큰 테스트 입력
+    PROFILE_TEMPLATES개를 각각 늘려 측정하고, 가장 느린 결과를 돌려줍니다.
+
+    Args:
+        code: 학생 코드
+        problem: 문제 (함수 이름과 테스트 케이스가 있어야 측정)
+        pool: 샌드박스 풀 (None이면 공용 풀)
+
+    Returns:
+        성능 프로파일 (측정할 수 없는 문제면 None)
+    """
+    if not problem or not problem.function_name or not problem.test_cases:
+        return None
+
+    settings = get_settings()
+    templates = []
+    for case in sorted(problem.test_cases, key=lambda c: _input_size(c.input), reverse=True):
+        if case.input not in templates:
+            templates.append(case.input)
+    templates = templates[:PROFILE_TEMPLATES]
+
+    pool = pool or get_sandbox_pool()
+    sizes = measurement_sizes(settings.profile_max_size)
+    profiles = []
+    for template in templates:
+        profile = _to_profile(pool.profile(
+            code,
+            problem.function_name,
+            template,
+            sizes,
+            run_limit_ms=settings.profile_run_limit_ms,
+            budget_ms=settings.profile_budget_ms // len(templates),
+        ))
+        if profile is not None:
+            profiles.append(profile)
+    return _slowest(profiles) if profiles else None
+
+
+def format_profile(profile: PerformanceProfile) -> str:
+    """LLM 리뷰 프롬프트와 결과 화면에 넣을 측정 결과 요약"""
+    lines = ["| n | 실행 시간(ms) | 최대 메모리(KB) | 함수 호출 수 |", "|---|---|---|---|"]
+    for s in profile.samples:
+        memory = f"{s.peak_memory_kb:.1f}" if s.peak_memory_kb is not None else "-"
+        calls = str(s.calls) if s.calls is not None else "-"
+        lines.append(f"| {s.size} | {s.time_ms:.3f} | {memory} | {calls} |")
+    complexity = profile.time_complexity or "추정 불가 (측정값 부족)"
+    lines.append(f"실측 시간 복잡도 추정: {complexity}")
+    if profile.stopped_reason:
+        lines.append(f"측정 중단: {profile.stopped_reason}")
+    return "\n".join(lines)
@@ -1,39 +1,37 @@
-import sys
-import io
-import traceback
-from contextlib import redirect_stdout, redirect_stderr
+import asyncio
+import threading
+from typing import Optional
+
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_community.chat_models import ChatOllama
-from langchain_anthropic import ChatAnthropic
 
 from app.config import get_settings
-from app.models.schemas import CodeReviewResult, Problem
+from app.agents.llm import get_llm, static_system_message
+from app.agents.judge import JudgeResult, format_judge_result, judge_submission
+from app.agents.profiler import format_profile, profile_submission
+from app.agents.review_cache import get_review_cache, review_cache_key
+from app.agents.static_analysis import analyze_code, format_static_hints
+from app.models.schemas import CodeReviewResult, Problem, StaticAnalysisResult
+from app.sandbox import get_sandbox_pool, is_sandbox_failure
 
 
+# 호출마다 같은 지시문 (프롬프트 캐시 대상 접두부, 템플릿 변수 없음)
 CODE_REVIEW_PROMPT = """당신은 Python 코드 리뷰 전문가입니다.
 
 ## 역할
-학생이 제출한 코드를 분석하고 피드백을 제공합니다.
-
-## 문제 정보
-{problem_info}
-
-## 학생이 제출한 코드
-```python
-{submitted_code}
-```
-
-## 코드 실행 결과
-{execution_result}
+학생이 제출한 코드를 문제 정보와 실행 결과에 비추어 분석하고 피드백을 제공합니다.
 
 ## 리뷰 기준
 1. **정확성**: 코드가 문제의 요구사항을 충족하는가?
-2. **효율성**: 시간/공간 복잡도가 적절한가?
+2. **효율성**: 시간/공간 복잡도가 적절한가? (실행 결과에 성능 측정이 있으면 추측하지 말고
+   측정값과 실측 시간 복잡도를 근거로, 문제가 요구한 복잡도와 비교해 평가)
 3. **가독성**: 코드가 읽기 쉽고 이해하기 쉬운가?
 4. **파이썬다움**: Python의 관용적 표현(Pythonic)을 사용했는가?
 5. **에러 처리**: 예외 상황을 적절히 처리했는가?
 
+실행 결과의 "정적 분석" 항목은 AST로 확인된 사실입니다. 코드를 다시 분석해 찾지 말고
+근거로 사용하세요.
+
 ## 응답 형식
 다음 형식으로 응답하세요:
 
@@ -59,15 +57,7 @@ CODE_REVIEW_PROMPT = """당신은 Python 코드 리뷰 전문가입니다.
 GENERAL_REVIEW_PROMPT = """당신은 Python 코드 리뷰 전문가입니다.
 
 ## 역할
-학생이 제출한 코드를 분석하고 피드백을 제공합니다.
-
-## 학생이 제출한 코드
-```python
-{submitted_code}
-```
-
-## 코드 실행 결과
-{execution_result}
+학생이 제출한 코드를 실행 결과와 함께 분석하고 피드백을 제공합니다.
 
 ## 리뷰 기준
 1. **정확성**: 코드가 의도한 대로 동작하는가?
@@ -77,6 +67,9 @@ GENERAL_REVIEW_PROMPT = """당신은 Python 코드 리뷰 전문가입니다.
 5. **에러 처리**: 예외 상황을 적절히 처리했는가?
 6. **보안**: 보안 취약점이 있는가?
 
+실행 결과의 "정적 분석" 항목은 AST로 확인된 사실입니다. 코드를 다시 분석해 찾지 말고
+근거로 사용하세요.
+
 ## 응답 형식
 다음 형식으로 응답하세요:
 
@@ -103,24 +96,29 @@ GENERAL_REVIEW_PROMPT = """당신은 Python 코드 리뷰 전문가입니다.
 [관련 개념이나 학습 자료 제안]
 """
 
+# 호출마다 바뀌는 리뷰 대상
+CODE_REVIEW_REQUEST = """## 문제 정보
+{problem_info}
 
-def get_llm():
-    """설정에 따라 LLM 인스턴스 반환"""
-    settings = get_settings()
+## 학생이 제출한 코드
+```python
+{submitted_code}
+```
 
-    if settings.llm_provider == "ollama":
-        return ChatOllama(
-            model=settings.ollama_model,
-            base_url=settings.ollama_base_url,
-            temperature=0.3,
-        )
-    else:
-        return ChatAnthropic(
-            model=settings.anthropic_model,
-            anthropic_api_key=settings.anthropic_api_key,
-            temperature=0.3,
-            max_tokens=4096,
-        )
+## 코드 실행 결과
+{execution_result}
+
+위 코드를 리뷰해주세요."""
+
+GENERAL_REVIEW_REQUEST = """## 학생이 제출한 코드
+```python
+{submitted_code}
+```
+
+## 코드 실행 결과
+{execution_result}
+
+위 코드를 리뷰해주세요."""
 
 
 class CodeReviewAgent:
@@ -128,74 +126,78 @@ class CodeReviewAgent:
 
     def __init__(self):
         self.settings = get_settings()
-        self.llm = get_llm()
+        self.llm = get_llm(temperature=0.3)
+
+        self.cache = get_review_cache() if self.settings.review_cache_enabled else None
+
+        # 리뷰 방식별 건수 (llm, judge, static, cache): LLM 호출을 얼마나 피했는지 집계
+        self._lock = threading.Lock()
+        self.reviews = {"llm": 0, "judge": 0, "static": 0, "cache": 0}
+
+    def _record(self, graded_by: str) -> None:
+        with self._lock:
+            self.reviews[graded_by] = self.reviews.get(graded_by, 0) + 1
+
+    def stats(self) -> dict:
+        """리뷰 방식별 건수와 LLM 호출을 생략한 비율"""
+        with self._lock:
+            reviews = dict(self.reviews)
+        total = sum(reviews.values())
+        avoided = total - reviews.get("llm", 0)
+        return {
+            "reviews": total,
+            "llm_calls": reviews.get("llm", 0),
+            "llm_calls_avoided": avoided,
+            "avoided_ratio": avoided / total if total else 0.0,
+            "by_grader": reviews,
+            "cache": self.cache.stats() if self.cache else {"enabled": False},
+        }
 
-    def _safe_execute_code(self, code: str, timeout: int = 5) -> dict:
+    def _cache_key(
+        self,
+        code: str,
+        problem: Optional[Problem],
+        llm_feedback: bool,
+        profile: bool,
+    ) -> Optional[str]:
+        """리뷰 캐시 키 (캐시를 쓰지 않으면 None)"""
+        if self.cache is None:
+            return None
+        return review_cache_key(code, problem.id if problem else None, llm_feedback, profile)
+
+    def _lookup_cache(self, cache_key: Optional[str]) -> Optional[CodeReviewResult]:
+        if cache_key is None:
+            return None
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self._record("cache")
+        return cached
+
+    def _store_cache(
+        self,
+        cache_key: Optional[str],
+        problem: Optional[Problem],
+        result: CodeReviewResult,
+        execution_str: str,
+        cacheable: bool,
+    ) -> None:
+        # 샌드박스 쪽 실패(크래시, 시간/메모리 한도)는 서버 상태에 따라 달라지므로 코드의 결과로 저장하지 않음
+        if cache_key is None or not cacheable:
+            return
+        self.cache.put(cache_key, problem.id if problem else None, result, execution_str)
+
+    def _safe_execute_code(self, code: str, timeout: Optional[float] = None) -> dict:
         """
-        코드를 안전하게 실행하고 결과 반환
+        코드를 샌드박스 워커 프로세스에서 실행하고 결과 반환
 
         Args:
             code: 실행할 코드
-            timeout: 제한 시간 (초)
+            timeout: 제한 시간 (초, 없으면 settings.sandbox_timeout)
 
         Returns:
             실행 결과 딕셔너리
         """
-        result = {
-            "success": False,
-            "output": "",
-            "error": "",
-        }
-
-        # stdout, stderr 캡처
-        stdout_capture = io.StringIO()
-        stderr_capture = io.StringIO()
-
-        try:
-            # 제한된 전역 네임스페이스
-            restricted_globals = {
-                "__builtins__": {
-                    "print": print,
-                    "len": len,
-                    "range": range,
-                    "enumerate": enumerate,
-                    "zip": zip,
-                    "map": map,
-                    "filter": filter,
-                    "sorted": sorted,
-                    "reversed": reversed,
-                    "sum": sum,
-                    "min": min,
-                    "max": max,
-                    "abs": abs,
-                    "round": round,
-                    "int": int,
-                    "float": float,
-                    "str": str,
-                    "bool": bool,
-                    "list": list,
-                    "dict": dict,
-                    "set": set,
-                    "tuple": tuple,
-                    "type": type,
-                    "isinstance": isinstance,
-                    "input": lambda x="": "",  # input은 빈 문자열 반환
-                    "True": True,
-                    "False": False,
-                    "None": None,
-                },
-            }
-
-            with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
-                exec(code, restricted_globals)
-
-            result["success"] = True
-            result["output"] = stdout_capture.getvalue()
-
-        except Exception as e:
-            result["error"] = f"{type(e).__name__}: {str(e)}\n{traceback.format_exc()}"
-
-        return result
+        return get_sandbox_pool().execute(code, timeout=timeout)
 
     def _parse_review_response(self, response: str) -> CodeReviewResult:
         """리뷰 응답 파싱"""
@@ -261,94 +263,213 @@ class CodeReviewAgent:
             improved_code=improved_code,
         )
 
+    def _build_prompt(
+        self,
+        code: str,
+        problem: Optional[Problem],
+        execution_str: str,
+    ) -> tuple[ChatPromptTemplate, dict]:
+        """문제 유무에 맞는 프롬프트(정적 지시문 + 리뷰 대상)와 입력값"""
+        if problem:
+            prompt = ChatPromptTemplate.from_messages([
+                static_system_message(CODE_REVIEW_PROMPT),
+                ("human", CODE_REVIEW_REQUEST),
+            ])
+            problem_info = f"""
+문제: {problem.question}
+정답: {problem.answer}
+난이도: {problem.difficulty.value}
+주제: {problem.topic.value}
+"""
+        else:
+            prompt = ChatPromptTemplate.from_messages([
+                static_system_message(GENERAL_REVIEW_PROMPT),
+                ("human", GENERAL_REVIEW_REQUEST),
+            ])
+            problem_info = "일반 코드 리뷰 (특정 문제 없음)"
+
+        return prompt, {
+            "problem_info": problem_info,
+            "submitted_code": code,
+            "execution_result": execution_str,
+        }
+
+    def _syntax_error_result(self, analysis: StaticAnalysisResult) -> CodeReviewResult:
+        """문법 오류 제출의 결과 (실행/채점/LLM 호출 없이)"""
+        return CodeReviewResult(
+            is_correct=False,
+            score=0,
+            feedback=f"❌ 문법 오류로 코드를 실행할 수 없습니다.\n\n```\n{analysis.syntax_error}\n```",
+            suggestions=["표시된 행과 바로 앞 행의 괄호, 따옴표, 콜론(:), 들여쓰기를 확인하세요."],
+            static_analysis=analysis,
+            graded_by="static",
+        )
+
+    def _run_checks(
+        self,
+        code: str,
+        problem: Optional[Problem],
+        llm_feedback: bool,
+        profile: bool,
+    ) -> tuple[Optional[CodeReviewResult], str, Optional[JudgeResult], Optional[StaticAnalysisResult], bool]:
+        """
+        LLM 호출 전 단계: 정적 분석(문법 오류면 바로 반환) 후 테스트 케이스가 있으면
+        채점(모두 통과하고 요청했으면 성능 측정)하고, 없으면 코드 실행
+
+        Returns:
+            (LLM 없이 확정된 결과 또는 None, 실행 결과 요약, 채점 결과, 정적 분석 결과,
+             캐시에 저장해도 되는지: 샌드박스 쪽 실패가 없었는지)
+        """
+        analysis = analyze_code(code) if self.settings.static_analysis_enabled else None
+        if analysis is not None and analysis.syntax_error:
+            return self._syntax_error_result(analysis), "", None, analysis, True
+        hints = format_static_hints(analysis) if analysis is not None else ""
+        hints = f"\n\n## 정적 분석\n{hints}" if hints else ""
+
+        judge = judge_submission(code, problem) if self.settings.judge_enabled else None
+        if judge is None:
+            execution_result = self._safe_execute_code(code)
+            return (
+                None,
+                self._format_execution_result(execution_result) + hints,
+                None,
+                analysis,
+                not is_sandbox_failure(execution_result),
+            )
+
+        # 요청한 경우 정답인 제출만 입력 크기를 늘려 가며 성능 측정 (1초 안팎 걸림)
+        if judge.all_passed and profile:
+            judge.performance = profile_submission(code, problem)
+
+        execution_str = format_judge_result(judge)
+        if judge.output:
+            execution_str += f"\n출력:\n{judge.output}"
+        if judge.performance:
+            execution_str += f"\n\n## 성능 측정 (입력 크기 n별)\n{format_profile(judge.performance)}"
+
+        if judge.all_passed and not llm_feedback:
+            feedback = f"✅ 테스트 케이스 {judge.total}개를 모두 통과했습니다."
+            if judge.performance and judge.performance.time_complexity:
+                feedback += f" (실측 시간 복잡도: {judge.performance.time_complexity})"
+            return CodeReviewResult(
+                is_correct=True,
+                score=100,
+                feedback=feedback,
+                test_results=judge.results,
+                performance=judge.performance,
+                static_analysis=analysis,
+                graded_by="judge",
+            ), execution_str, judge, analysis, not judge.sandbox_failure
+
+        return None, execution_str + hints, judge, analysis, not judge.sandbox_failure
+
+    def _finish_review(
+        self,
+        response: str,
+        judge: Optional[JudgeResult],
+        analysis: Optional[StaticAnalysisResult],
+    ) -> CodeReviewResult:
+        """LLM 응답 파싱 후 채점/정적 분석 결과 반영 (정답 여부는 테스트 결과 기준)"""
+        result = self._parse_review_response(response)
+        result.static_analysis = analysis
+        if judge is not None:
+            result.is_correct = judge.all_passed
+            result.test_results = judge.results
+            result.performance = judge.performance
+        return result
+
     async def review_submission(
         self,
         code: str,
         problem: Problem = None,
+        llm_feedback: Optional[bool] = None,
+        profile: Optional[bool] = None,
     ) -> CodeReviewResult:
         """
         제출된 코드 리뷰
 
+        같은 코드(공백/주석 차이 무시)와 문제의 리뷰가 캐시에 있으면 그대로 반환하고,
+        문법 오류가 있으면 바로, 테스트 케이스가 있는 문제는 샌드박스에서 먼저
+        채점해 모두 통과하면 LLM을 호출하지 않습니다.
+
         Args:
             code: 제출된 코드
             problem: 문제 정보 (선택)
+            llm_feedback: 테스트를 모두 통과해도 LLM 피드백을 받을지 (None이면 설정값)
+            profile: 테스트를 모두 통과하면 입력 크기별 성능을 측정할지 (None이면 설정값)
 
         Returns:
             코드 리뷰 결과
         """
-        # 코드 실행
-        execution_result = self._safe_execute_code(code)
-        execution_str = self._format_execution_result(execution_result)
+        if llm_feedback is None:
+            llm_feedback = self.settings.judge_llm_feedback
+        if profile is None:
+            profile = self.settings.review_profiling
+
+        # 캐시 조회 (DB/워커 응답을 기다리는 동안 이벤트 루프를 막지 않도록 스레드에서)
+        cache_key = self._cache_key(code, problem, llm_feedback, profile)
+        cached = await asyncio.to_thread(self._lookup_cache, cache_key)
+        if cached is not None:
+            return cached
+
+        # 채점/코드 실행
+        judged, execution_str, judge, analysis, cacheable = await asyncio.to_thread(
+            self._run_checks, code, problem, llm_feedback, profile
+        )
+        if judged is not None:
+            self._record(judged.graded_by)
+            await asyncio.to_thread(self._store_cache, cache_key, problem, judged, execution_str, cacheable)
+            return judged
 
         # 프롬프트 선택
-        if problem:
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", CODE_REVIEW_PROMPT),
-                ("human", "위 코드를 리뷰해주세요."),
-            ])
-            problem_info = f"""
-문제: {problem.question}
-정답: {problem.answer}
-난이도: {problem.difficulty.value}
-주제: {problem.topic.value}
-"""
-        else:
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", GENERAL_REVIEW_PROMPT),
-                ("human", "위 코드를 리뷰해주세요."),
-            ])
-            problem_info = "일반 코드 리뷰 (특정 문제 없음)"
+        prompt, inputs = self._build_prompt(code, problem, execution_str)
 
         # 체인 실행
         chain = prompt | self.llm | StrOutputParser()
+        response = await chain.ainvoke(inputs)
+        self._record("llm")
 
-        response = await chain.ainvoke({
-            "problem_info": problem_info,
-            "submitted_code": code,
-            "execution_result": execution_str,
-        })
-
-        return self._parse_review_response(response)
+        result = self._finish_review(response, judge, analysis)
+        await asyncio.to_thread(self._store_cache, cache_key, problem, result, execution_str, cacheable)
+        return result
 
     def review_submission_sync(
         self,
         code: str,
         problem: Problem = None,
+        llm_feedback: Optional[bool] = None,
+        profile: Optional[bool] = None,
     ) -> CodeReviewResult:
         """동기 버전의 코드 리뷰"""
-        # 코드 실행
-        execution_result = self._safe_execute_code(code)
-        execution_str = self._format_execution_result(execution_result)
+        if llm_feedback is None:
+            llm_feedback = self.settings.judge_llm_feedback
+        if profile is None:
+            profile = self.settings.review_profiling
+
+        # 캐시 조회
+        cache_key = self._cache_key(code, problem, llm_feedback, profile)
+        cached = self._lookup_cache(cache_key)
+        if cached is not None:
+            return cached
+
+        # 채점/코드 실행
+        judged, execution_str, judge, analysis, cacheable = self._run_checks(code, problem, llm_feedback, profile)
+        if judged is not None:
+            self._record(judged.graded_by)
+            self._store_cache(cache_key, problem, judged, execution_str, cacheable)
+            return judged
 
         # 프롬프트 선택
-        if problem:
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", CODE_REVIEW_PROMPT),
-                ("human", "위 코드를 리뷰해주세요."),
-            ])
-            problem_info = f"""
-문제: {problem.question}
-정답: {problem.answer}
-난이도: {problem.difficulty.value}
-주제: {problem.topic.value}
-"""
-        else:
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", GENERAL_REVIEW_PROMPT),
-                ("human", "위 코드를 리뷰해주세요."),
-            ])
-            problem_info = "일반 코드 리뷰 (특정 문제 없음)"
+        prompt, inputs = self._build_prompt(code, problem, execution_str)
 
         # 체인 실행
         chain = prompt | self.llm | StrOutputParser()
+        response = chain.invoke(inputs)
+        self._record("llm")
 
-        response = chain.invoke({
-            "problem_info": problem_info,
-            "submitted_code": code,
-            "execution_result": execution_str,
-        })
-
-        return self._parse_review_response(response)
+        result = self._finish_review(response, judge, analysis)
+        self._store_cache(cache_key, problem, result, execution_str, cacheable)
+        return result
 
     def _format_execution_result(self, result: dict) -> str:
         """실행 결과 포맷팅"""
@@ -0,0 +1,160 @@
+"""코드 리뷰 결과 캐시 (내용 주소 기반)
+
+학생이 같은 코드(공백/주석만 다른 코드 포함)를 다시 제출하거나 강사가 같은
+예시 답안을 붙여 넣으면, 코드 실행과 LLM 호출 없이 저장된 리뷰를 반환합니다.
+키는 정규화한 AST(ast.dump: 공백, 주석, 행 번호 제외)의 sha256과 문제 ID입니다.
+저장소는 설정된 데이터베이스(SQLite 또는 Supabase)의 code_review_cache 테이블입니다.
+"""
+import ast
+import hashlib
+import logging
+import threading
+from typing import Optional
+
+from app.config import get_settings
+from app.database import get_db_manager
+from app.models.schemas import CodeReviewResult
+
+
+logger = logging.getLogger(__name__)
+
+# 채점/리뷰 방식이 바뀌어 저장된 결과를 더 쓸 수 없을 때 올림
+REVIEW_CACHE_VERSION = 1
+
+
+def review_cache_key(
+    code: str,
+    problem_id: Optional[str],
+    llm_feedback: bool,
+    profile: bool = False,
+) -> Optional[str]:
+    """
+    정규화한 AST와 문제 ID로 만든 캐시 키
+
+    Args:
+        code: 학생 코드
+        problem_id: 문제 ID (일반 코드 리뷰면 None)
+        llm_feedback: 테스트를 모두 통과해도 LLM 피드백을 받는지 (결과가 달라지므로 키에 포함)
+        profile: 성능 측정 결과를 포함하는지 (같은 이유로 키에 포함)
+
+    Returns:
+        sha256 hex (파싱할 수 없는 코드면 None: 정적 분석이 바로 처리)
+    """
+    try:
+        normalized = ast.dump(ast.parse(code))
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+    payload = "\0".join([
+        str(REVIEW_CACHE_VERSION),
+        problem_id or "",
+        "llm" if llm_feedback else "",
+        "profile" if profile else "",
+        normalized,
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReviewCache:
+    """캐시 키 -> (CodeReviewResult, 실행 결과) 저장소"""
+
+    def __init__(
+        self,
+        db=None,
+        ttl: int = 7 * 24 * 3600,
+        max_entries: int = 5000,
+        trim_interval: int = 100,
+    ):
+        """
+        Args:
+            db: 데이터베이스 매니저 (None이면 설정된 데이터베이스)
+            ttl: 항목 유효 기간 (초, 0이면 만료 없음)
+            max_entries: 최대 항목 수 (정리할 때 넘은 만큼 오래 안 쓰인 항목부터 삭제)
+            trim_interval: 만료/초과 항목 정리 주기 (저장 횟수, 첫 저장 때도 정리)
+        """
+        self.db = db or get_db_manager()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.trim_interval = max(1, trim_interval)
+
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self._writes = 0
+
+    def get(self, cache_key: str) -> Optional[CodeReviewResult]:
+        """저장된 리뷰 결과 (없거나 조회에 실패하면 None)"""
+        try:
+            row = self.db.get_cached_review(cache_key, self.ttl)
+        except Exception:
+            logger.warning("code review cache 조회 실패", exc_info=True)
+            row = None
+
+        with self._lock:
+            self.lookups += 1
+            if row is not None:
+                self.hits += 1
+        if row is None:
+            return None
+
+        logger.info("code review cache hit: %s", cache_key[:12])
+        return CodeReviewResult(**row["result"], cached=True)
+
+    def put(
+        self,
+        cache_key: str,
+        problem_id: Optional[str],
+        result: CodeReviewResult,
+        execution_output: str,
+    ) -> None:
+        """리뷰 결과와 LLM에 보낸 실행 결과 저장 (실패해도 리뷰에는 영향 없음)"""
+        try:
+            self.db.save_cached_review(
+                cache_key,
+                problem_id,
+                result.model_dump(exclude={"cached"}),
+                execution_output,
+            )
+        except Exception:
+            logger.warning("code review cache 저장 실패", exc_info=True)
+            return
+
+        # 저장할 때마다 정리하면 쓰기마다 정렬/삭제 쿼리가 돌아 trim_interval번에 한 번만
+        with self._lock:
+            trim = self._writes % self.trim_interval == 0
+            self._writes += 1
+        if trim:
+            try:
+                self.db.trim_review_cache(self.ttl, self.max_entries)
+            except Exception:
+                logger.warning("code review cache 정리 실패", exc_info=True)
+
+    def stats(self) -> dict:
+        """히트율 (현재 프로세스 기준) + 캐시 항목 수와 누적 히트 수 (조회에 실패하면 None)"""
+        try:
+            stored = self.db.get_review_cache_stats()
+        except Exception:
+            logger.warning("code review cache 통계 조회 실패", exc_info=True)
+            stored = {"entries": None, "hits": None}
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_ratio": self.hits / self.lookups if self.lookups else 0.0,
+                "entries": stored["entries"],
+                "lifetime_hits": stored["hits"],
+            }
+
+
+# 싱글톤 인스턴스
+_review_cache = None
+
+
+def get_review_cache() -> ReviewCache:
+    global _review_cache
+    if _review_cache is None:
+        settings = get_settings()
+        _review_cache = ReviewCache(
+            ttl=settings.review_cache_ttl,
+            max_entries=settings.review_cache_max_entries,
+        )
+    return _review_cache
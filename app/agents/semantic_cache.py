@@ -0,0 +1,242 @@
+"""TeacherAgent 응답 의미 기반 캐시
+
+같은 주제/난이도에서 의미가 같은 질문("리스트와 튜플 차이가 뭐예요?",
+"튜플이랑 리스트 뭐가 달라요")은 LLM을 다시 호출하지 않고 저장된 답변을
+반환합니다. 질문 임베딩의 코사인 유사도가 임계값 이상이면 같은 질문으로
+봅니다. 저장소는 로컬 SQLite 파일입니다.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.rag.context import estimate_tokens
+from app.rag.vectorstore import get_vectorstore_manager
+
+
+logger = logging.getLogger(__name__)
+
+# 캐시 파일 경로
+DB_PATH = Path(__file__).parent.parent.parent / "data" / "semantic_cache.db"
+
+
+@dataclass
+class CacheHit:
+    """캐시 조회 결과"""
+    response: str
+    question: str
+    similarity: float
+
+
+class SemanticCache:
+    """(임베딩 모델, 주제, 난이도) 버킷별 질문 임베딩 -> 응답 캐시"""
+
+    def __init__(
+        self,
+        embed_query: Callable[[str], list[float]],
+        namespace: str,
+        db_path: Path = DB_PATH,
+        threshold: float = 0.92,
+        ttl: int = 7 * 24 * 3600,
+        max_entries: int = 5000,
+    ):
+        """
+        Args:
+            embed_query: 질문 임베딩 함수
+            namespace: 임베딩 모델 이름 (모델이 다르면 벡터를 비교할 수 없음)
+            threshold: 같은 질문으로 볼 최소 코사인 유사도
+            ttl: 항목 유효 기간 (초, 0이면 만료 없음)
+            max_entries: 최대 항목 수 (초과 시 오래 안 쓰인 항목부터 삭제)
+        """
+        self.embed_query = embed_query
+        self.namespace = namespace
+        self.db_path = Path(db_path)
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.tokens_saved = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_db()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._get_connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS semantic_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                namespace TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                question TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                response TEXT NOT NULL,
+                tokens INTEGER DEFAULT 0,
+                hits INTEGER DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_semantic_cache_bucket
+            ON semantic_cache (namespace, topic, difficulty)
+        """)
+        conn.commit()
+        conn.close()
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self, question: str, topic: str, difficulty: str) -> Optional[CacheHit]:
+        """가장 비슷한 저장 질문이 임계값 이상이면 그 응답 반환"""
+        vector = self._embed(question)
+        now = time.time()
+
+        conn = self._get_connection()
+        try:
+            query = """
+                SELECT id, question, embedding, response, tokens FROM semantic_cache
+                WHERE namespace = ? AND topic = ? AND difficulty = ?
+            """
+            params = [self.namespace, topic, difficulty]
+            if self.ttl > 0:
+                query += " AND created_at >= ?"
+                params.append(now - self.ttl)
+            rows = conn.execute(query, params).fetchall()
+
+            best = None
+            if rows:
+                matrix = np.stack([np.frombuffer(row["embedding"], dtype=np.float32) for row in rows])
+                similarities = matrix @ vector
+                index = int(np.argmax(similarities))
+                if similarities[index] >= self.threshold:
+                    best = (rows[index], float(similarities[index]))
+
+            if best is not None:
+                conn.execute(
+                    "UPDATE semantic_cache SET hits = hits + 1, last_used_at = ? WHERE id = ?",
+                    (now, best[0]["id"]),
+                )
+                conn.commit()
+        finally:
+            conn.close()
+
+        with self._lock:
+            self.lookups += 1
+            if best is not None:
+                self.hits += 1
+                self.tokens_saved += best[0]["tokens"]
+
+        if best is None:
+            return None
+        row, similarity = best
+        logger.info(
+            "semantic cache hit: similarity=%.3f hit_ratio=%.2f tokens_saved=%d",
+            similarity, self.hits / self.lookups, self.tokens_saved,
+        )
+        return CacheHit(response=row["response"], question=row["question"], similarity=similarity)
+
+    def store(
+        self,
+        question: str,
+        topic: str,
+        difficulty: str,
+        response: str,
+        tokens: int = None,
+    ) -> None:
+        """
+        응답 저장
+
+        Args:
+            tokens: 이 응답을 만드는 데 쓴 입력+출력 토큰 수 (히트 시 절약량으로 집계)
+        """
+        vector = self._embed(question)
+        now = time.time()
+        if tokens is None:
+            tokens = estimate_tokens(question) + estimate_tokens(response)
+
+        conn = self._get_connection()
+        try:
+            conn.execute("""
+                INSERT INTO semantic_cache
+                (namespace, topic, difficulty, question, embedding, response, tokens,
+                 created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (self.namespace, topic, difficulty, question, vector.tobytes(),
+                  response, tokens, now, now))
+            self._evict(conn, now)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """만료 항목과 최대 개수 초과분(오래 안 쓰인 순) 삭제"""
+        if self.ttl > 0:
+            conn.execute("DELETE FROM semantic_cache WHERE created_at < ?", (now - self.ttl,))
+        conn.execute("""
+            DELETE FROM semantic_cache WHERE id IN (
+                SELECT id FROM semantic_cache
+                ORDER BY last_used_at DESC
+                LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def clear(self) -> None:
+        conn = self._get_connection()
+        conn.execute("DELETE FROM semantic_cache")
+        conn.commit()
+        conn.close()
+
+    def stats(self) -> dict:
+        """히트율과 절약 토큰 (현재 프로세스 기준 + 캐시 전체 누적)"""
+        conn = self._get_connection()
+        row = conn.execute(
+            "SELECT COUNT(*) AS entries, COALESCE(SUM(hits * tokens), 0) AS saved "
+            "FROM semantic_cache"
+        ).fetchone()
+        conn.close()
+
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_ratio": self.hits / self.lookups if self.lookups else 0.0,
+                "tokens_saved": self.tokens_saved,
+                "entries": row["entries"],
+                "lifetime_tokens_saved": row["saved"],
+            }
+
+
+# 싱글톤 인스턴스
+_semantic_cache = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    global _semantic_cache
+    if _semantic_cache is None:
+        settings = get_settings()
+        manager = get_vectorstore_manager()
+        _semantic_cache = SemanticCache(
+            embed_query=manager.embed_query,
+            namespace=manager.embedding_model_name,
+            threshold=settings.semantic_cache_threshold,
+            ttl=settings.semantic_cache_ttl,
+            max_entries=settings.semantic_cache_max_entries,
+        )
+    return _semantic_cache
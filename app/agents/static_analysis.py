@@ -0,0 +1,233 @@
+"""제출 코드 정적 사전 분석 (AST)
+
+코드를 실행하거나 LLM에 보내기 전에 AST로 확인할 수 있는 문제를 찾습니다.
+
+- 문법 오류: 실행/채점/LLM 호출 없이 바로 결과를 돌려줍니다.
+- 정의되지 않은 이름(샌드박스의 제한된 builtins 기준), import(샌드박스에는 __import__가
+  없어 모두 실패), 금지된 호출, 같은 컬렉션을 중첩 순회하는 반복문,
+  함수별 순환 복잡도: LLM 리뷰 프롬프트에 한 줄짜리 힌트로 넣어, LLM이 코드를
+  처음부터 다시 분석하지 않고 확인된 사실을 근거로 리뷰하게 합니다.
+"""
+import ast
+import builtins
+from typing import Optional
+
+from app.models.schemas import StaticAnalysisResult, StaticFinding
+from app.sandbox.worker import SAFE_BUILTINS
+
+
+# 샌드박스 밖으로 나가거나 인터프리터를 조작할 수 있는 builtins 호출
+# (샌드박스 builtins에도 없지만 정의되지 않은 이름 대신 이 종류로 표시)
+FORBIDDEN_CALLS = frozenset({
+    "eval", "exec", "compile", "open", "__import__", "globals", "vars",
+    "getattr", "setattr", "delattr", "breakpoint",
+})
+
+# 순환 복잡도를 1씩 늘리는 분기 노드
+_BRANCH_NODES = (
+    ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While,
+    ast.ExceptHandler, ast.Assert, ast.match_case,
+)
+
+# 인자를 그대로 순회하는 래퍼 (enumerate(xs)는 xs를 순회)
+_ITERATION_WRAPPERS = frozenset({"enumerate", "sorted", "reversed", "list", "tuple", "set"})
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+
+
+def _bound_names(tree: ast.AST) -> set[str]:
+    """코드 어디에서든 바인딩되는 이름 (스코프는 구분하지 않아 오탐 대신 미탐 쪽으로)"""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, ast.alias):
+            names.add((node.asname or node.name).split(".")[0])
+        elif isinstance(node, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)) and node.name:
+            names.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            names.add(node.rest)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            names.update(node.names)
+    return names
+
+
+def _undefined_names(tree: ast.AST) -> list[StaticFinding]:
+    """샌드박스에서 NameError가 나는 이름 (Python builtins라도 SAFE_BUILTINS에 없으면 포함)"""
+    bound = _bound_names(tree) | set(SAFE_BUILTINS) | FORBIDDEN_CALLS
+    findings = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in bound:
+            findings.setdefault(node.id, node.lineno)
+    return [
+        StaticFinding(
+            kind="undefined_name",
+            message=f"{name} (샌드박스에서 제공하지 않는 builtins)" if hasattr(builtins, name) else name,
+            line=line,
+        )
+        for name, line in sorted(findings.items(), key=lambda item: item[1])
+    ]
+
+
+def _forbidden_usage(tree: ast.AST) -> list[StaticFinding]:
+    """import 문 전부(샌드박스에 __import__가 없음)와 금지된 builtins 호출"""
+    findings = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                findings.append(StaticFinding(kind="forbidden_import", message=alias.name, line=node.lineno))
+        elif isinstance(node, ast.ImportFrom):
+            module = "." * node.level + (node.module or "")
+            findings.append(StaticFinding(kind="forbidden_import", message=module, line=node.lineno))
+        elif (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id in FORBIDDEN_CALLS
+        ):
+            findings.append(StaticFinding(kind="forbidden_call", message=f"{node.func.id}()", line=node.lineno))
+    return findings
+
+
+def _iterated_collection(iterable: ast.expr) -> Optional[str]:
+    """
+    반복문이 순회하는 컬렉션의 식 (비교용 문자열)
+
+    xs, enumerate(xs), sorted(xs), range(len(xs)), range(i + 1, len(xs)) 모두 xs로 봅니다.
+    """
+    if isinstance(iterable, (ast.Name, ast.Attribute, ast.Subscript)):
+        return ast.unparse(iterable)
+    if not isinstance(iterable, ast.Call) or not isinstance(iterable.func, ast.Name):
+        return None
+    name = iterable.func.id
+    if name in _ITERATION_WRAPPERS and iterable.args:
+        return _iterated_collection(iterable.args[0])
+    if name == "range":
+        for arg in reversed(iterable.args):
+            for node in ast.walk(arg):
+                if (
+                    isinstance(node, ast.Call)
+                    and isinstance(node.func, ast.Name)
+                    and node.func.id == "len"
+                    and node.args
+                ):
+                    return ast.unparse(node.args[0])
+    return None
+
+
+def _loops(node: ast.AST):
+    """node가 반복문/컴프리헨션이면 순회하는 식과 행: (순회 대상 식, 행)"""
+    if isinstance(node, (ast.For, ast.AsyncFor)):
+        yield node.iter, node.lineno
+    elif isinstance(node, (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)):
+        for generator in node.generators:
+            yield generator.iter, node.lineno
+
+
+def _nested_loops(tree: ast.AST) -> list[StaticFinding]:
+    """같은 컬렉션을 바깥/안쪽 반복문에서 모두 순회하는 곳 (O(n²) 후보)"""
+    findings = []
+    seen = set()
+
+    def visit(node: ast.AST, outer: dict[str, int]) -> None:
+        current = dict(outer)
+        for iterable, line in _loops(node):
+            collection = _iterated_collection(iterable)
+            if collection is None:
+                continue
+            if collection in current and (collection, line) not in seen:
+                seen.add((collection, line))
+                findings.append(StaticFinding(
+                    kind="nested_loop",
+                    message=f"{collection} ({current[collection]}행 반복 안에서 다시 순회)",
+                    line=line,
+                ))
+            current.setdefault(collection, line)
+        for child in ast.iter_child_nodes(node):
+            # 중첩 함수는 정의될 때 실행되지 않으므로 바깥 반복과 분리
+            visit(child, {} if isinstance(child, _FUNCTION_NODES) else current)
+
+    visit(tree, {})
+    return findings
+
+
+def _complexity(node: ast.AST) -> int:
+    """McCabe 순환 복잡도 (중첩 함수/클래스는 따로 계산)"""
+    score = 1
+    stack = list(ast.iter_child_nodes(node))
+    while stack:
+        child = stack.pop()
+        if isinstance(child, (*_FUNCTION_NODES, ast.ClassDef)):
+            continue
+        if isinstance(child, _BRANCH_NODES):
+            score += 1
+        elif isinstance(child, ast.BoolOp):
+            score += len(child.values) - 1
+        elif isinstance(child, ast.comprehension):
+            score += 1 + len(child.ifs)
+        if isinstance(child, (ast.For, ast.AsyncFor, ast.While, ast.Try)) and child.orelse:
+            score += 1
+        stack.extend(ast.iter_child_nodes(child))
+    return score
+
+
+def _function_complexity(tree: ast.Module) -> dict[str, int]:
+    complexity = {}
+    module_score = _complexity(tree)
+    if module_score > 1:
+        complexity["<module>"] = module_score
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            complexity[node.name] = _complexity(node)
+    return complexity
+
+
+def _format_syntax_error(error: SyntaxError) -> str:
+    message = f"{error.msg} ({error.lineno}행)" if error.lineno else error.msg
+    if error.text and error.text.strip():
+        message += f"\n    {error.text.strip()}"
+    return message
+
+
+def analyze_code(code: str) -> StaticAnalysisResult:
+    """
+    제출 코드를 파싱해 정적 분석 결과 반환
+
+    Args:
+        code: 학생 코드
+
+    Returns:
+        정적 분석 결과 (문법 오류가 있으면 syntax_error만 채워짐)
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        return StaticAnalysisResult(syntax_error=_format_syntax_error(e))
+    except (ValueError, RecursionError, MemoryError) as e:
+        # 널 문자, 지나치게 깊은 중첩 등 인터프리터도 컴파일하지 못하는 코드
+        return StaticAnalysisResult(syntax_error=f"{type(e).__name__}: {e}")
+
+    return StaticAnalysisResult(
+        findings=_undefined_names(tree) + _forbidden_usage(tree) + _nested_loops(tree),
+        complexity=_function_complexity(tree),
+    )
+
+
+_FINDING_LABELS = {
+    "undefined_name": "정의되지 않은 이름",
+    "forbidden_import": "import (샌드박스에서 사용 불가)",
+    "forbidden_call": "금지된 호출",
+    "nested_loop": "같은 컬렉션 중첩 순회",
+}
+
+
+def format_static_hints(analysis: StaticAnalysisResult) -> str:
+    """LLM 리뷰 프롬프트에 넣을 정적 분석 요약 (발견 사항 한 줄씩)"""
+    lines = [f"- {_FINDING_LABELS.get(f.kind, f.kind)} {f.line}행: {f.message}" for f in analysis.findings]
+    if analysis.complexity:
+        scores = ", ".join(f"{name}={score}" for name, score in analysis.complexity.items())
+        lines.append(f"- 순환 복잡도: {scores}")
+    return "\n".join(lines)
@@ -1,13 +1,23 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Iterator, Optional
+
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage
-from langchain_community.chat_models import ChatOllama
-from langchain_anthropic import ChatAnthropic
+from langchain_core.output_parsers import StrOutputParser
 
 from app.config import get_settings
+from app.agents.llm import get_llm, static_system_message
+from app.rag.context import estimate_tokens
 from app.rag.retriever import get_retriever
+from app.agents.semantic_cache import get_semantic_cache
 from app.models.schemas import TopicCategory, DifficultyLevel
 
 
+logger = logging.getLogger(__name__)
+
+
+# 호출마다 같은 지시문 (프롬프트 캐시 대상 접두부, 템플릿 변수 없음)
 TEACHER_SYSTEM_PROMPT = """당신은 컴퓨터공학과 학생들을 위한 Python 교육 전문가입니다.
 
 ## 역할
@@ -15,19 +25,11 @@ TEACHER_SYSTEM_PROMPT = """당신은 컴퓨터공학과 학생들을 위한 Pyth
 - 실용적인 예제 코드를 제공합니다.
 - 학생들이 이해하기 쉽도록 단계별로 설명합니다.
 
-## 교육 스타일
-- 난이도: {difficulty}
-- 주제: {topic}
-
 ## 난이도별 설명 방식
 - beginner (입문): 기초 개념부터 차근차근, 많은 예제와 비유 사용
 - intermediate (중급): 핵심 개념 위주, 실무 활용 예제 포함
 - advanced (고급): 심화 내용, 최적화, 베스트 프랙티스 중심
 
-## 참고 자료
-다음은 관련 교육 자료입니다:
-{context}
-
 ## 응답 형식
 1. 개념 설명
 2. 예제 코드 (```python 코드블록 사용)
@@ -37,24 +39,15 @@ TEACHER_SYSTEM_PROMPT = """당신은 컴퓨터공학과 학생들을 위한 Pyth
 항상 한국어로 응답하세요.
 """
 
+# 호출마다 바뀌는 교육 스타일과 참고 자료
+TEACHER_CONTEXT_PROMPT = """## 교육 스타일
+- 난이도: {difficulty}
+- 주제: {topic}
 
-def get_llm():
-    """설정에 따라 LLM 인스턴스 반환"""
-    settings = get_settings()
-
-    if settings.llm_provider == "ollama":
-        return ChatOllama(
-            model=settings.ollama_model,
-            base_url=settings.ollama_base_url,
-            temperature=0.7,
-        )
-    else:
-        return ChatAnthropic(
-            model=settings.anthropic_model,
-            anthropic_api_key=settings.anthropic_api_key,
-            temperature=0.7,
-            max_tokens=4096,
-        )
+## 참고 자료
+다음은 관련 교육 자료입니다:
+{context}
+"""
 
 
 class TeacherAgent:
@@ -62,12 +55,14 @@ class TeacherAgent:
 
     def __init__(self):
         self.settings = get_settings()
-        self.llm = get_llm()
+        self.llm = get_llm(temperature=0.7)
         self.retriever = get_retriever()
+        self.semantic_cache = get_semantic_cache() if self.settings.semantic_cache_enabled else None
 
     def _get_prompt(self) -> ChatPromptTemplate:
         return ChatPromptTemplate.from_messages([
-            ("system", TEACHER_SYSTEM_PROMPT),
+            static_system_message(TEACHER_SYSTEM_PROMPT),
+            ("system", TEACHER_CONTEXT_PROMPT),
             MessagesPlaceholder(variable_name="chat_history"),
             ("human", "{question}"),
         ])
@@ -82,6 +77,72 @@ class TeacherAgent:
                 messages.append(AIMessage(content=msg["content"]))
         return messages
 
+    def _cache_applies(self, chat_history: list[dict]) -> bool:
+        """대화 맥락에 의존하지 않는 질문(히스토리가 없거나 짧을 때)만 캐시"""
+        return (
+            self.semantic_cache is not None
+            and len(chat_history) <= self.settings.semantic_cache_max_history
+        )
+
+    def _cache_lookup(
+        self,
+        question: str,
+        topic: TopicCategory,
+        difficulty: DifficultyLevel,
+        chat_history: list[dict],
+    ) -> Optional[str]:
+        """의미가 같은 이전 질문의 응답 (없으면 None)"""
+        if not self._cache_applies(chat_history):
+            return None
+        try:
+            hit = self.semantic_cache.lookup(question, topic.value, difficulty.value)
+        except Exception as e:
+            logger.warning("semantic cache lookup 실패: %s", e)
+            return None
+        return hit.response if hit else None
+
+    def _cache_store(
+        self,
+        question: str,
+        topic: TopicCategory,
+        difficulty: DifficultyLevel,
+        chat_history: list[dict],
+        context: str,
+        response: str,
+    ) -> None:
+        """응답과 이를 만드는 데 든 토큰 수(시스템 프롬프트 + 컨텍스트 + 질문 + 응답) 저장"""
+        if not self._cache_applies(chat_history) or not response:
+            return
+        tokens = (
+            estimate_tokens(TEACHER_SYSTEM_PROMPT) + estimate_tokens(TEACHER_CONTEXT_PROMPT)
+            + estimate_tokens(context)
+            + estimate_tokens(question) + estimate_tokens(response)
+        )
+        try:
+            self.semantic_cache.store(question, topic.value, difficulty.value, response, tokens)
+        except Exception as e:
+            logger.warning("semantic cache store 실패: %s", e)
+
+    def _build_inputs(
+        self,
+        question: str,
+        topic: TopicCategory,
+        difficulty: DifficultyLevel,
+        chat_history: list[dict],
+        documents: list,
+    ) -> dict:
+        """검색 문서로 컨텍스트를 만들고 프롬프트 입력값 구성"""
+        context = self.retriever.get_context_string(
+            documents, max_tokens=self.settings.teacher_context_tokens
+        )
+        return {
+            "topic": self._get_topic_korean(topic),
+            "difficulty": self._get_difficulty_korean(difficulty),
+            "context": context,
+            "chat_history": self._format_chat_history(chat_history),
+            "question": question,
+        }
+
     async def teach(
         self,
         question: str,
@@ -104,24 +165,24 @@ class TeacherAgent:
         if chat_history is None:
             chat_history = []
 
-        # RAG로 관련 문서 검색
-        documents = self.retriever.retrieve_for_explanation(topic, question)
-        context = self.retriever.get_context_string(documents)
+        cached = await asyncio.to_thread(
+            self._cache_lookup, question, topic, difficulty, chat_history
+        )
+        if cached is not None:
+            return cached
 
-        # 프롬프트 생성
-        prompt = self._get_prompt()
+        # RAG로 관련 문서 검색 (이벤트 루프를 막지 않도록 스레드 풀에서)
+        documents = await self.retriever.aretrieve_for_explanation(topic, question)
+        inputs = self._build_inputs(question, topic, difficulty, chat_history, documents)
 
         # 체인 실행
-        chain = prompt | self.llm
-
-        response = await chain.ainvoke({
-            "topic": self._get_topic_korean(topic),
-            "difficulty": self._get_difficulty_korean(difficulty),
-            "context": context,
-            "chat_history": self._format_chat_history(chat_history),
-            "question": question,
-        })
+        chain = self._get_prompt() | self.llm
+        response = await chain.ainvoke(inputs)
 
+        await asyncio.to_thread(
+            self._cache_store, question, topic, difficulty, chat_history,
+            inputs["context"], response.content,
+        )
         return response.content
 
     def teach_sync(
@@ -135,26 +196,89 @@ class TeacherAgent:
         if chat_history is None:
             chat_history = []
 
+        cached = self._cache_lookup(question, topic, difficulty, chat_history)
+        if cached is not None:
+            return cached
+
         # RAG로 관련 문서 검색
         documents = self.retriever.retrieve_for_explanation(topic, question)
-        context = self.retriever.get_context_string(documents)
-
-        # 프롬프트 생성
-        prompt = self._get_prompt()
+        inputs = self._build_inputs(question, topic, difficulty, chat_history, documents)
 
         # 체인 실행
-        chain = prompt | self.llm
-
-        response = chain.invoke({
-            "topic": self._get_topic_korean(topic),
-            "difficulty": self._get_difficulty_korean(difficulty),
-            "context": context,
-            "chat_history": self._format_chat_history(chat_history),
-            "question": question,
-        })
+        chain = self._get_prompt() | self.llm
+        response = chain.invoke(inputs)
 
+        self._cache_store(
+            question, topic, difficulty, chat_history, inputs["context"], response.content
+        )
         return response.content
 
+    def stream_teach(
+        self,
+        question: str,
+        topic: TopicCategory = TopicCategory.BASICS,
+        difficulty: DifficultyLevel = DifficultyLevel.BEGINNER,
+        chat_history: list[dict] = None,
+    ) -> Iterator[str]:
+        """
+        teach_sync의 스트리밍 버전 (생성되는 텍스트 조각을 차례로 반환)
+
+        응답이 끝까지 생성된 경우에만 semantic cache에 저장합니다.
+        캐시 히트 시에는 저장된 응답 전체를 한 번에 반환합니다.
+        """
+        if chat_history is None:
+            chat_history = []
+
+        cached = self._cache_lookup(question, topic, difficulty, chat_history)
+        if cached is not None:
+            yield cached
+            return
+
+        documents = self.retriever.retrieve_for_explanation(topic, question)
+        inputs = self._build_inputs(question, topic, difficulty, chat_history, documents)
+
+        chain = self._get_prompt() | self.llm | StrOutputParser()
+        parts = []
+        for chunk in chain.stream(inputs):
+            parts.append(chunk)
+            yield chunk
+
+        self._cache_store(
+            question, topic, difficulty, chat_history, inputs["context"], "".join(parts)
+        )
+
+    async def astream_teach(
+        self,
+        question: str,
+        topic: TopicCategory = TopicCategory.BASICS,
+        difficulty: DifficultyLevel = DifficultyLevel.BEGINNER,
+        chat_history: list[dict] = None,
+    ) -> AsyncIterator[str]:
+        """teach의 스트리밍 버전 (stream_teach와 동작 동일)"""
+        if chat_history is None:
+            chat_history = []
+
+        cached = await asyncio.to_thread(
+            self._cache_lookup, question, topic, difficulty, chat_history
+        )
+        if cached is not None:
+            yield cached
+            return
+
+        documents = await self.retriever.aretrieve_for_explanation(topic, question)
+        inputs = self._build_inputs(question, topic, difficulty, chat_history, documents)
+
+        chain = self._get_prompt() | self.llm | StrOutputParser()
+        parts = []
+        async for chunk in chain.astream(inputs):
+            parts.append(chunk)
+            yield chunk
+
+        await asyncio.to_thread(
+            self._cache_store, question, topic, difficulty, chat_history,
+            inputs["context"], "".join(parts),
+        )
+
     def _get_topic_korean(self, topic: TopicCategory) -> str:
         """주제를 한국어로 변환"""
         mapping = {
@@ -16,9 +16,114 @@ class Settings(BaseSettings):
     anthropic_api_key: str = ""
     anthropic_model: str = "claude-3-5-haiku-20241022"
 
+    # LLM 요청 제한 (프로바이더별 공유 클라이언트, 초과 요청은 대기)
+    # requests_per_second 0이면 제한 없음
+    ollama_max_concurrency: int = 4
+    ollama_requests_per_second: float = 0
+    anthropic_max_concurrency: int = 8
+    anthropic_requests_per_second: float = 0.8
+    anthropic_max_retries: int = 3
+
+    # Prompt caching: 정적 시스템 지시문 접두부 재사용
+    # Anthropic cache_control 사용 여부, Ollama 모델 메모리 유지 시간 (예: "30m", 음수면 무기한)
+    anthropic_prompt_caching: bool = True
+    ollama_keep_alive: str = "30m"
+
     # ChromaDB
     chroma_persist_directory: str = "./chroma_db"
 
+    # Vector snapshot: 공유 스냅샷 루트 (설정 시 Chroma 대신 읽기 전용 스냅샷 사용)
+    vector_snapshot_path: str = ""
+    snapshot_poll_interval: int = 30
+
+    # Embedding model: 컬렉션 메타데이터에 기록되며, 바꾸면 재임베딩 필요
+    embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+    # Embedding backend: "torch" 또는 "onnx" (int8 양자화, PyTorch 불필요)
+    embedding_backend: str = "torch"
+    onnx_model_dir: str = "./models/onnx"
+
+    # Ingest: 파일 로드 프로세스 수 (0이면 자동), 임베딩 배치 크기
+    ingest_workers: int = 0
+    ingest_batch_size: int = 64
+
+    # Retrieval mode: "vector" 또는 "hybrid" (BM25 + 벡터, RRF 결합)
+    retrieval_mode: str = "hybrid"
+
+    # Async retrieval: 임베딩/검색을 실행하는 스레드 수 (초과 요청은 대기열)
+    retrieval_max_concurrency: int = 4
+
+    # Problem retrieval: 검색 문서 수와 MMR 다양화 (lambda 1.0이면 순수 유사도)
+    problem_retrieval_k: int = 6
+    problem_retrieval_diversify: bool = True
+    mmr_lambda: float = 0.5
+
+    # Structured output: 문제 생성 시 Ollama JSON 모드 / Anthropic 도구 호출로 JSON 강제
+    llm_structured_output: bool = True
+
+    # Batch problem generation: 호출당 문제 수, 동시 호출 수, 중복 판정 코사인 유사도
+    problem_batch_size: int = 5
+    problem_batch_concurrency: int = 4
+    problem_dedup_threshold: float = 0.92
+
+    # Problem bank: 버킷별로 미리 생성해 둘 미출제 문제 수, 버킷당 최대 문제 수, 보충 주기 (초)
+    problem_bank_enabled: bool = True
+    problem_bank_watermark: int = 3
+    problem_bank_max_per_bucket: int = 30
+    problem_bank_refill_interval: int = 300
+    # 이 프로세스에서 보충 스레드를 띄울지 (띄운 프로세스 중에서도 DB 임대를 가진 하나만 보충)
+    problem_bank_refiller: bool = True
+
+    # Sandbox: 제출 코드 실행용 워커 프로세스 수와 실행당 CPU(초)/메모리(MB)/벽시계(초)/출력(자) 한도
+    sandbox_pool_size: int = 2
+    sandbox_cpu_seconds: int = 2
+    sandbox_memory_mb: int = 256
+    sandbox_timeout: float = 5.0
+    sandbox_max_output: int = 10000
+    # 학생 코드 실행 사용자 (웹 앱이 root일 때 setuid), 워커당 최대 작업 수 (넘으면 교체)
+    sandbox_user: str = "nobody"
+    sandbox_max_jobs: int = 1000
+    # sandbox_user로 낮출 수 없을 때(root가 아닐 때) 웹 앱과 같은 사용자로 실행할지 (API 키 노출 위험)
+    sandbox_allow_same_user: bool = False
+
+    # Judge: 테스트 케이스 기본 시간 제한 (ms), 모두 통과해도 LLM 피드백을 받을지
+    judge_enabled: bool = True
+    judge_time_limit_ms: int = 1000
+    judge_llm_feedback: bool = False
+
+    # Static analysis: 리뷰 전 AST 사전 분석 (문법 오류는 LLM 호출 없이 바로 반환)
+    static_analysis_enabled: bool = True
+
+    # Review cache: 정규화한 AST 해시 + 문제 ID로 리뷰 결과 재사용 (ttl 초, 0이면 만료 없음)
+    review_cache_enabled: bool = True
+    review_cache_ttl: int = 604800
+    review_cache_max_entries: int = 5000
+
+    # Profiling: 테스트를 통과한 제출의 입력 크기별 성능 측정 (최대 크기, 호출당 제한/전체 예산 ms)
+    # 리뷰마다 1초 이상 걸리므로 기본은 요청(profile=true)할 때만
+    review_profiling: bool = False
+    profile_max_size: int = 65536
+    profile_run_limit_ms: int = 500
+    profile_budget_ms: int = 1000
+
+    # Rerank: 로컬 cross-encoder 모델 (비어 있으면 rerank 비활성화)
+    rerank_model: str = ""
+
+    # Semantic cache: TeacherAgent 응답 캐시 (히스토리가 max_history개 이하일 때만 적용)
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_ttl: int = 604800
+    semantic_cache_max_entries: int = 5000
+    semantic_cache_max_history: int = 0
+
+    # Context budget: 에이전트별 RAG 컨텍스트 토큰 상한
+    teacher_context_tokens: int = 1200
+    problem_context_tokens: int = 2000
+
+    # Query cache: 쿼리 벡터/검색 결과 LRU 크기와 TTL (초, 0이면 만료 없음)
+    query_cache_size: int = 256
+    query_cache_ttl: int = 0
+
     # Supabase
     supabase_url: str = ""
     supabase_key: str = ""
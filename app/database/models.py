@@ -1,5 +1,7 @@
 """SQLite 데이터베이스 모델"""
+import json
 import sqlite3
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -136,9 +138,87 @@ class DatabaseManager:
             )
         """)
 
+        # 문제 은행 테이블 (미리 생성해 둔 문제)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS problem_bank (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                topic TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                problem_type TEXT NOT NULL,
+                question TEXT NOT NULL,
+                options TEXT,
+                answer TEXT NOT NULL,
+                explanation TEXT,
+                hints TEXT,
+                function_name TEXT,
+                test_cases TEXT,
+                served_count INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # 채점용 컬럼이 없던 기존 DB에 컬럼 추가
+        self._add_missing_columns(cursor, "problem_bank", {
+            "function_name": "TEXT",
+            "test_cases": "TEXT",
+        })
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_problem_bank_bucket
+            ON problem_bank (topic, difficulty, problem_type, served_count, id)
+        """)
+
+        # 사용자별로 이미 받은 문제 은행 문제
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS problem_bank_seen (
+                user_id INTEGER NOT NULL,
+                problem_id INTEGER NOT NULL,
+                seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (user_id, problem_id),
+                FOREIGN KEY (problem_id) REFERENCES problem_bank (id)
+            )
+        """)
+
+        # 여러 프로세스 중 하나만 맡는 백그라운드 작업의 임대 (만료 시각은 epoch 초)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS background_leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+
+        # 코드 리뷰 결과 캐시 (정규화한 AST 해시 + 문제 ID -> 리뷰 결과, 시각은 epoch 초)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS code_review_cache (
+                cache_key TEXT PRIMARY KEY,
+                problem_id TEXT,
+                result TEXT NOT NULL,
+                execution_output TEXT,
+                hits INTEGER DEFAULT 0,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_code_review_cache_last_used
+            ON code_review_cache (last_used_at)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_code_review_cache_created
+            ON code_review_cache (created_at)
+        """)
+
         conn.commit()
         conn.close()
 
+    @staticmethod
+    def _add_missing_columns(cursor: sqlite3.Cursor, table: str, columns: dict[str, str]):
+        """테이블에 없는 컬럼만 ALTER TABLE로 추가"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row["name"] for row in cursor.fetchall()}
+        for name, column_type in columns.items():
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
     # ========== 사용자 관련 ==========
     def create_user(self, username: str) -> int:
         """사용자 생성"""
@@ -297,6 +377,231 @@ class DatabaseManager:
         conn.close()
         return [dict(row) for row in rows]
 
+    # ========== 문제 은행 관련 ==========
+    def save_bank_problems(
+        self,
+        topic: str,
+        difficulty: str,
+        problem_type: str,
+        problems: list[dict],
+    ) -> int:
+        """문제 은행에 문제 추가 (question/options/answer/explanation/hints/function_name/test_cases 딕셔너리)"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.executemany(
+            """INSERT INTO problem_bank
+               (topic, difficulty, problem_type, question, options, answer, explanation, hints,
+                function_name, test_cases)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (topic, difficulty, problem_type, p["question"],
+                 json.dumps(p.get("options"), ensure_ascii=False), p.get("answer", ""),
+                 p.get("explanation", ""), json.dumps(p.get("hints") or [], ensure_ascii=False),
+                 p.get("function_name"), json.dumps(p.get("test_cases") or [], ensure_ascii=False))
+                for p in problems
+            ]
+        )
+        conn.commit()
+        conn.close()
+        return len(problems)
+
+    def serve_bank_problem(
+        self,
+        topic: str,
+        difficulty: str,
+        problem_type: str,
+        user_id: Optional[int] = None,
+    ) -> Optional[dict]:
+        """
+        문제 은행에서 문제 하나를 꺼냄
+
+        덜 출제된 문제부터, 사용자가 이미 받은 문제는 제외합니다.
+        꺼낸 문제는 출제 횟수를 올리고 사용자의 받은 문제로 기록합니다.
+        조회부터 기록까지 한 쓰기 트랜잭션(BEGIN IMMEDIATE)이라 동시에 꺼내도
+        같은 사용자가 같은 문제를 두 번 받지 않습니다.
+
+        Returns:
+            문제 딕셔너리 (없으면 None)
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(
+                """SELECT * FROM problem_bank
+                   WHERE topic = ? AND difficulty = ? AND problem_type = ?
+                     AND id NOT IN (
+                         SELECT problem_id FROM problem_bank_seen WHERE user_id = ?
+                     )
+                   ORDER BY served_count, id
+                   LIMIT 1""",
+                (topic, difficulty, problem_type, user_id)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                conn.rollback()
+                return None
+
+            cursor.execute(
+                "UPDATE problem_bank SET served_count = served_count + 1 WHERE id = ?",
+                (row["id"],)
+            )
+            if user_id is not None:
+                cursor.execute(
+                    "INSERT OR IGNORE INTO problem_bank_seen (user_id, problem_id) VALUES (?, ?)",
+                    (user_id, row["id"])
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+        return self._bank_row_to_dict(row)
+
+    @staticmethod
+    def _bank_row_to_dict(row: sqlite3.Row) -> dict:
+        """문제 은행 행의 JSON 컬럼을 풀어 딕셔너리로 변환"""
+        problem = dict(row)
+        problem["options"] = json.loads(problem["options"]) if problem["options"] else None
+        problem["hints"] = json.loads(problem["hints"]) if problem["hints"] else []
+        problem["test_cases"] = json.loads(problem["test_cases"]) if problem.get("test_cases") else []
+        return problem
+
+    def get_bank_problem(self, problem_id: int) -> Optional[dict]:
+        """문제 은행 문제 조회 (출제 기록은 남기지 않음)"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM problem_bank WHERE id = ?", (problem_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return self._bank_row_to_dict(row) if row is not None else None
+
+    def get_bank_stock(self) -> list[dict]:
+        """버킷(주제, 난이도, 유형)별 전체 문제 수와 아직 출제되지 않은 문제 수"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            """SELECT topic, difficulty, problem_type,
+                COUNT(*) as total,
+                SUM(CASE WHEN served_count = 0 THEN 1 ELSE 0 END) as unserved
+               FROM problem_bank
+               GROUP BY topic, difficulty, problem_type"""
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """
+        백그라운드 작업 임대 획득/연장 (비어 있거나 만료됐거나 이미 owner가 가진 경우만)
+
+        Returns:
+            owner가 임대를 가졌는지
+        """
+        now = time.time()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """INSERT INTO background_leases (name, owner, expires_at) VALUES (?, ?, ?)
+                   ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                   WHERE background_leases.owner = excluded.owner OR background_leases.expires_at < ?""",
+                (name, owner, now + ttl, now)
+            )
+            acquired = cursor.rowcount > 0
+            conn.commit()
+        finally:
+            conn.close()
+        return acquired
+
+    # ========== 코드 리뷰 캐시 관련 ==========
+    def get_cached_review(self, cache_key: str, ttl: int) -> Optional[dict]:
+        """
+        캐시된 코드 리뷰 조회 (조회되면 히트 수와 마지막 사용 시각 갱신)
+
+        Args:
+            ttl: 유효 기간 (초, 0이면 만료 없음)
+
+        Returns:
+            {"result": 리뷰 결과 딕셔너리, "execution_output": 실행 결과} (없으면 None)
+        """
+        now = time.time()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            query = "SELECT result, execution_output FROM code_review_cache WHERE cache_key = ?"
+            params = [cache_key]
+            if ttl > 0:
+                query += " AND created_at >= ?"
+                params.append(now - ttl)
+            cursor.execute(query, params)
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            cursor.execute(
+                "UPDATE code_review_cache SET hits = hits + 1, last_used_at = ? WHERE cache_key = ?",
+                (now, cache_key)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return {"result": json.loads(row["result"]), "execution_output": row["execution_output"] or ""}
+
+    def save_cached_review(
+        self,
+        cache_key: str,
+        problem_id: Optional[str],
+        result: dict,
+        execution_output: str,
+    ):
+        """코드 리뷰 결과 저장"""
+        now = time.time()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """INSERT OR REPLACE INTO code_review_cache
+                   (cache_key, problem_id, result, execution_output, hits, created_at, last_used_at)
+                   VALUES (?, ?, ?, ?, 0, ?, ?)""",
+                (cache_key, problem_id, json.dumps(result, ensure_ascii=False),
+                 execution_output, now, now)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def trim_review_cache(self, ttl: int, max_entries: int):
+        """만료 항목 삭제 후 최대 개수를 넘었을 때만 초과분(오래 안 쓰인 순) 삭제"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            if ttl > 0:
+                cursor.execute("DELETE FROM code_review_cache WHERE created_at < ?", (time.time() - ttl,))
+            cursor.execute("SELECT COUNT(*) FROM code_review_cache")
+            excess = cursor.fetchone()[0] - max_entries
+            if excess > 0:
+                cursor.execute(
+                    """DELETE FROM code_review_cache WHERE cache_key IN (
+                           SELECT cache_key FROM code_review_cache
+                           ORDER BY last_used_at
+                           LIMIT ?
+                       )""",
+                    (excess,)
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_review_cache_stats(self) -> dict:
+        """코드 리뷰 캐시 항목 수와 누적 히트 수"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*) AS entries, COALESCE(SUM(hits), 0) AS hits FROM code_review_cache"
+        )
+        row = cursor.fetchone()
+        conn.close()
+        return dict(row)
+
     # ========== 통계 관련 ==========
     def get_user_statistics(self, user_id: int) -> dict:
         """사용자 학습 통계 조회"""
@@ -1,6 +1,6 @@
 """Supabase 데이터베이스 어댑터"""
 from typing import Optional, Dict, List, Union
-from datetime import datetime
+from datetime import datetime, timezone
 import uuid
 import os
 from supabase import create_client, Client
@@ -159,6 +159,118 @@ class SupabaseAdapter:
         self._handle_error(response)
         return response.data
 
+    # ========== 문제 은행 관련 ==========
+    def save_bank_problems(
+        self,
+        topic: str,
+        difficulty: str,
+        problem_type: str,
+        problems: List[Dict],
+    ) -> int:
+        """문제 은행에 문제 추가"""
+        response = self.supabase.table("problem_bank").insert([
+            {
+                "topic": topic,
+                "difficulty": difficulty,
+                "problem_type": problem_type,
+                "question": p["question"],
+                "options": p.get("options"),
+                "answer": p.get("answer", ""),
+                "explanation": p.get("explanation", ""),
+                "hints": p.get("hints") or [],
+                "function_name": p.get("function_name"),
+                "test_cases": p.get("test_cases") or []
+            }
+            for p in problems
+        ]).execute()
+        self._handle_error(response)
+        return len(response.data)
+
+    def serve_bank_problem(
+        self,
+        topic: str,
+        difficulty: str,
+        problem_type: str,
+        user_id: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """문제 은행에서 문제 하나를 꺼냄 (사용자가 이미 받은 문제 제외)"""
+        response = self.supabase.rpc("serve_bank_problem", {
+            "p_topic": topic,
+            "p_difficulty": difficulty,
+            "p_problem_type": problem_type,
+            "p_user_id": user_id
+        }).execute()
+        self._handle_error(response)
+        return response.data[0] if response.data else None
+
+    def get_bank_problem(self, problem_id: str) -> Optional[Dict]:
+        """문제 은행 문제 조회 (출제 기록은 남기지 않음)"""
+        response = self.supabase.table("problem_bank").select("*").eq(
+            "id", problem_id
+        ).limit(1).execute()
+        self._handle_error(response)
+        return response.data[0] if response.data else None
+
+    def get_bank_stock(self) -> List[Dict]:
+        """버킷(주제, 난이도, 유형)별 전체 문제 수와 아직 출제되지 않은 문제 수"""
+        response = self.supabase.rpc("get_bank_stock", {}).execute()
+        self._handle_error(response)
+        return response.data or []
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """백그라운드 작업 임대 획득/연장 (비어 있거나 만료됐거나 이미 owner가 가진 경우만)"""
+        response = self.supabase.rpc("acquire_lease", {
+            "p_name": name,
+            "p_owner": owner,
+            "p_ttl_seconds": ttl
+        }).execute()
+        self._handle_error(response)
+        return bool(response.data)
+
+    # ========== 코드 리뷰 캐시 관련 ==========
+    def get_cached_review(self, cache_key: str, ttl: int) -> Optional[Dict]:
+        """캐시된 코드 리뷰 조회 (조회되면 히트 수와 마지막 사용 시각 갱신)"""
+        response = self.supabase.rpc("get_cached_review", {
+            "p_cache_key": cache_key,
+            "p_ttl_seconds": ttl
+        }).execute()
+        self._handle_error(response)
+        return response.data[0] if response.data else None
+
+    def save_cached_review(
+        self,
+        cache_key: str,
+        problem_id: Optional[str],
+        result: Dict,
+        execution_output: str,
+    ):
+        """코드 리뷰 결과 저장"""
+        now = datetime.now(timezone.utc).isoformat()
+        response = self.supabase.table("code_review_cache").upsert({
+            "cache_key": cache_key,
+            "problem_id": problem_id,
+            "result": result,
+            "execution_output": execution_output,
+            "hits": 0,
+            "created_at": now,
+            "last_used_at": now
+        }).execute()
+        self._handle_error(response)
+
+    def trim_review_cache(self, ttl: int, max_entries: int):
+        """만료 항목 삭제 후 최대 개수를 넘었을 때만 초과분(오래 안 쓰인 순) 삭제"""
+        response = self.supabase.rpc("trim_code_review_cache", {
+            "p_ttl_seconds": ttl,
+            "p_max_entries": max_entries
+        }).execute()
+        self._handle_error(response)
+
+    def get_review_cache_stats(self) -> Dict:
+        """코드 리뷰 캐시 항목 수와 누적 히트 수"""
+        response = self.supabase.rpc("get_review_cache_stats", {}).execute()
+        self._handle_error(response)
+        return response.data[0] if response.data else {"entries": 0, "hits": 0}
+
     # ========== 통계 관련 ==========
     def get_user_statistics(self, user_id: str) -> Dict:
         """사용자 학습 통계 조회"""
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from enum import Enum
-from typing import Optional
+from typing import Any, Optional
 
 
 class DifficultyLevel(str, Enum):
@@ -43,6 +43,24 @@ class ProblemRequest(BaseModel):
     count: int = 1
 
 
+class TestCase(BaseModel):
+    """채점용 테스트 케이스 (함수 호출)"""
+    input: list[Any] = []  # 위치 인자 목록
+    expected: Any = None  # 기대 반환값
+    time_limit_ms: Optional[int] = None  # 없으면 settings.judge_time_limit_ms
+
+
+class TestCaseResult(BaseModel):
+    """테스트 케이스 채점 결과"""
+    input: list[Any] = []
+    expected: Any = None
+    actual: str = ""  # 반환값 repr
+    passed: bool
+    error: str = ""
+    timed_out: bool = False
+    duration_ms: float = 0.0
+
+
 class Problem(BaseModel):
     """문제"""
     id: str
@@ -54,6 +72,8 @@ class Problem(BaseModel):
     answer: str
     explanation: str
     hints: list[str] = []
+    function_name: Optional[str] = None  # 코딩/알고리즘: 채점할 함수 이름
+    test_cases: list[TestCase] = []  # 코딩/알고리즘: 로컬 채점용 테스트 케이스
 
 
 class CodeSubmission(BaseModel):
@@ -63,6 +83,35 @@ class CodeSubmission(BaseModel):
     language: str = "python"
 
 
+class ProfileSample(BaseModel):
+    """입력 크기별 성능 측정값"""
+    size: int
+    time_ms: float
+    peak_memory_kb: Optional[float] = None
+    calls: Optional[int] = None  # 제출 코드 안의 함수 호출 수
+
+
+class PerformanceProfile(BaseModel):
+    """입력 크기를 늘려 가며 측정한 성능과 실측 시간 복잡도"""
+    samples: list[ProfileSample] = []
+    time_complexity: Optional[str] = None  # 예: "O(n log n)" (측정값 부족 시 None)
+    stopped_reason: str = ""
+
+
+class StaticFinding(BaseModel):
+    """정적 분석 발견 사항"""
+    kind: str  # undefined_name, forbidden_import, forbidden_call, nested_loop
+    message: str
+    line: int
+
+
+class StaticAnalysisResult(BaseModel):
+    """제출 코드 AST 정적 분석 결과"""
+    syntax_error: Optional[str] = None
+    findings: list[StaticFinding] = []
+    complexity: dict[str, int] = {}  # 함수 이름 -> 순환 복잡도
+
+
 class CodeReviewResult(BaseModel):
     """코드 리뷰 결과"""
     is_correct: bool
@@ -70,6 +119,11 @@ class CodeReviewResult(BaseModel):
     feedback: str
     suggestions: list[str] = []
     improved_code: Optional[str] = None
+    test_results: list[TestCaseResult] = []
+    performance: Optional[PerformanceProfile] = None
+    static_analysis: Optional[StaticAnalysisResult] = None
+    graded_by: str = "llm"  # llm, judge (테스트 통과로 LLM 호출 없이 채점), static (문법 오류)
+    cached: bool = False  # 같은 코드의 저장된 리뷰 결과를 반환한 경우
 
 
 class LearningRequest(BaseModel):
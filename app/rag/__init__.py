@@ -1,9 +1,14 @@
 from .vectorstore import VectorStoreManager, get_vectorstore_manager
 from .retriever import PythonEducationRetriever, get_retriever
+from .warmup import start_background_warmup, is_ready, wait_until_ready, get_warmup_status
 
 __all__ = [
     "VectorStoreManager",
     "get_vectorstore_manager",
     "PythonEducationRetriever",
     "get_retriever",
+    "start_background_warmup",
+    "is_ready",
+    "wait_until_ready",
+    "get_warmup_status",
 ]
@@ -0,0 +1,202 @@
+"""BM25 역색인 (하이브리드 검색의 어휘 검색 단계)"""
+import heapq
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+
+# 파이썬 식별자(점 표기 포함), 숫자, 한글 연속 구간
+TOKEN_PATTERN = re.compile(
+    r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*|[0-9]+|[가-힣]+"
+)
+
+INDEX_FILENAME = "bm25_index.json"
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    BM25용 토큰화
+
+    - 식별자는 그대로 유지하고(`__init__`, `dict.get`), 점 표기는 각 부분도 추가
+    - 한글은 조사가 붙어도 매칭되도록 2글자 단위(bigram)로 분할
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text):
+        token = match.group().lower()
+        if "가" <= token[0] <= "힣":
+            if len(token) == 1:
+                tokens.append(token)
+            else:
+                tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            tokens.append(token)
+            if "." in token:
+                tokens.extend(token.split("."))
+    return tokens
+
+
+def matches_filter(metadata: dict, where: Optional[dict]) -> bool:
+    """Chroma where 필터의 부분집합(동등, $in, $and)을 메타데이터에 적용"""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            if "$in" in condition and metadata.get(key) not in condition["$in"]:
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def _filter_metadata(metadata: Optional[dict]) -> dict:
+    """필터에 필요한 메타데이터만 보관"""
+    return {key: (metadata or {}).get(key) for key in ("topic", "difficulty")}
+
+
+class BM25Index:
+    """청크 ID 기반 BM25 역색인"""
+
+    def __init__(
+        self,
+        chunk_ids: list[str],
+        metadatas: list[dict],
+        doc_lengths: list[int],
+        postings: dict[str, list[list[int]]],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.chunk_ids = chunk_ids
+        self.metadatas = metadatas
+        self.doc_lengths = doc_lengths
+        self.postings = postings
+        self.k1 = k1
+        self.b = b
+        self._refresh_stats()
+
+    def _refresh_stats(self) -> None:
+        """문서 수에 따라 달라지는 평균 문서 길이와 IDF 계산"""
+        doc_count = len(self.chunk_ids)
+        self.avg_doc_length = (sum(self.doc_lengths) / doc_count if doc_count else 0.0) or 1.0
+        self.idf = {
+            term: math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+
+    @classmethod
+    def build(
+        cls,
+        chunk_ids: list[str],
+        texts: list[str],
+        metadatas: list[dict],
+    ) -> "BM25Index":
+        """청크 텍스트로 역색인 생성"""
+        postings: dict[str, list[list[int]]] = {}
+        doc_lengths = []
+        for doc_index, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            for term, freq in Counter(tokens).items():
+                postings.setdefault(term, []).append([doc_index, freq])
+
+        filter_metadatas = [_filter_metadata(metadata) for metadata in metadatas]
+        return cls(list(chunk_ids), filter_metadatas, doc_lengths, postings)
+
+    def add(
+        self,
+        chunk_ids: list[str],
+        texts: list[str],
+        metadatas: list[dict],
+    ) -> int:
+        """
+        청크를 역색인에 추가 (컬렉션 전체를 다시 읽지 않는 증분 갱신)
+
+        청크 ID는 (출처, 내용) 해시라 이미 있는 ID는 같은 내용이므로 건너뜁니다.
+
+        Returns:
+            새로 추가한 청크 수
+        """
+        known = set(self.chunk_ids)
+        added = 0
+        for chunk_id, text, metadata in zip(chunk_ids, texts, metadatas):
+            if chunk_id in known:
+                continue
+            known.add(chunk_id)
+            doc_index = len(self.chunk_ids)
+            tokens = tokenize(text)
+            self.chunk_ids.append(chunk_id)
+            self.metadatas.append(_filter_metadata(metadata))
+            self.doc_lengths.append(len(tokens))
+            for term, freq in Counter(tokens).items():
+                self.postings.setdefault(term, []).append([doc_index, freq])
+            added += 1
+        if added:
+            self._refresh_stats()
+        return added
+
+    def search(
+        self,
+        query: str,
+        k: int = 4,
+        where: dict = None,
+    ) -> list[tuple[str, float]]:
+        """
+        BM25 점수 상위 k개 검색
+
+        Returns:
+            (청크 ID, 점수) 리스트
+        """
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = self.idf[term]
+            for doc_index, freq in posting:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_index] / self.avg_doc_length
+                score = idf * freq * (self.k1 + 1) / (freq + self.k1 * length_norm)
+                scores[doc_index] = scores.get(doc_index, 0.0) + score
+
+        if where:
+            scores = {
+                doc_index: score
+                for doc_index, score in scores.items()
+                if matches_filter(self.metadatas[doc_index], where)
+            }
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.chunk_ids[doc_index], score) for doc_index, score in top]
+
+    def save(self, path: Path) -> None:
+        """JSON으로 저장 (임시 파일에 쓴 뒤 교체)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "chunk_ids": self.chunk_ids,
+                "metadatas": self.metadatas,
+                "doc_lengths": self.doc_lengths,
+                "postings": self.postings,
+            }, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["BM25Index"]:
+        """저장된 역색인 로드 (없거나 손상되면 None)"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(
+                data["chunk_ids"],
+                data["metadatas"],
+                data["doc_lengths"],
+                data["postings"],
+            )
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
@@ -0,0 +1,220 @@
+"""마크다운 구조 기반 청크 분할기
+
+헤딩 계층을 따라 문서를 나누고, 코드 블록(``` / ~~~ 펜스)은 절대 중간에서
+자르지 않습니다. 각 청크에는 헤딩 경로("변수와 자료형 > 기본 자료형")와
+원문 내 시작 위치(start_index)가 메타데이터로 붙습니다.
+
+마크다운이 아닌 문서(PDF 등)는 fallback 분할기로 넘깁니다.
+"""
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+
+MARKDOWN_SUFFIXES = {".md", ".markdown"}
+HEADING_PATH_SEPARATOR = " > "
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$")
+FENCE_PATTERN = re.compile(r"^[ ]{0,3}(`{3,}|~{3,})")
+
+
+@dataclass
+class _Block:
+    """분할 불가능한 최소 단위 (빈 줄로 구분된 문단 또는 코드 블록 포함 문단)"""
+    start: int
+    end: int
+    heading_path: tuple
+    level: int = 0          # 헤딩으로 시작하는 블록이면 헤딩 레벨
+    has_fence: bool = False
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+
+@dataclass
+class _Chunk:
+    start: int
+    end: int
+    paths: list = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+
+def _common_prefix(paths: list) -> tuple:
+    prefix = paths[0]
+    for path in paths[1:]:
+        size = 0
+        while size < min(len(prefix), len(path)) and prefix[size] == path[size]:
+            size += 1
+        prefix = prefix[:size]
+    return prefix
+
+
+class MarkdownChunker:
+    """헤딩 계층 / 코드 펜스를 인식하는 마크다운 청커"""
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        min_chunk_size: int = 200,
+        split_level: int = 2,
+        fallback_splitter=None,
+    ):
+        """
+        Args:
+            chunk_size: 청크 최대 길이 (문자 수, 단일 코드 블록은 예외)
+            min_chunk_size: 이보다 작은 청크는 다음 섹션과 합침
+            split_level: 이 레벨 이하(#, ##)의 헤딩에서는 항상 새 청크 시작
+            fallback_splitter: 마크다운이 아닌 문서용 분할기
+        """
+        self.chunk_size = chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.split_level = split_level
+        self.fallback_splitter = fallback_splitter
+
+    def split_documents(self, documents: list[Document]) -> list[Document]:
+        """문서 리스트 분할 (TextSplitter.split_documents와 같은 인터페이스)"""
+        splits = []
+        fallback_documents = []
+        for doc in documents:
+            source = str(doc.metadata.get("source", ""))
+            if Path(source).suffix.lower() not in MARKDOWN_SUFFIXES:
+                fallback_documents.append(doc)
+                continue
+
+            for text, start, heading_path in self.split_text(doc.page_content):
+                metadata = dict(doc.metadata)
+                metadata["start_index"] = start
+                metadata["heading_path"] = heading_path
+                splits.append(Document(page_content=text, metadata=metadata))
+
+        if fallback_documents:
+            if self.fallback_splitter is None:
+                raise ValueError("마크다운이 아닌 문서를 분할할 fallback_splitter가 없습니다")
+            splits.extend(self.fallback_splitter.split_documents(fallback_documents))
+        return splits
+
+    def split_text(self, text: str) -> list[tuple[str, int, str]]:
+        """
+        마크다운 텍스트 분할
+
+        Returns:
+            (청크 텍스트, 원문 내 시작 위치, 헤딩 경로) 리스트
+        """
+        chunks = self._pack(self._split_oversized(self._parse_blocks(text), text))
+
+        results = []
+        for chunk in chunks:
+            raw = text[chunk.start:chunk.end]
+            content = raw.strip()
+            if not content:
+                continue
+            start = chunk.start + (len(raw) - len(raw.lstrip()))
+            heading_path = HEADING_PATH_SEPARATOR.join(_common_prefix(chunk.paths))
+            results.append((content, start, heading_path))
+        return results
+
+    def _parse_blocks(self, text: str) -> list[_Block]:
+        """줄 단위로 훑으며 헤딩 / 빈 줄 / 코드 펜스 경계로 블록 구성"""
+        blocks = []
+        headings = []       # (level, title) 스택
+        current = None
+        fence = None        # 열린 펜스 문자열 (예: "```")
+        offset = 0
+
+        for line in text.splitlines(keepends=True):
+            line_start = offset
+            offset += len(line)
+            stripped = line.strip()
+
+            if fence is not None:
+                current.end = offset
+                # 닫는 펜스: 같은 문자로만 이루어지고 여는 펜스 이상 길이
+                if len(stripped) >= len(fence) and not stripped.strip(fence[0]):
+                    fence = None
+                continue
+
+            heading = HEADING_PATTERN.match(line.rstrip("\r\n"))
+            if heading:
+                level = len(heading.group(1))
+                while headings and headings[-1][0] >= level:
+                    headings.pop()
+                headings.append((level, heading.group(2)))
+                current = _Block(
+                    start=line_start,
+                    end=offset,
+                    heading_path=tuple(title for _, title in headings),
+                    level=level,
+                )
+                blocks.append(current)
+                continue
+
+            if not stripped:
+                # 빈 줄은 직전 블록 끝에 붙이고 블록을 닫음
+                if current is not None:
+                    current.end = offset
+                current = None
+                continue
+
+            if current is None:
+                current = _Block(
+                    start=line_start,
+                    end=offset,
+                    heading_path=tuple(title for _, title in headings),
+                )
+                blocks.append(current)
+            current.end = offset
+
+            match = FENCE_PATTERN.match(line)
+            if match:
+                fence = match.group(1)
+                current.has_fence = True
+
+        return blocks
+
+    def _split_oversized(self, blocks: list[_Block], text: str) -> list[_Block]:
+        """코드 블록이 없는 너무 긴 문단만 줄 경계에서 나눔"""
+        results = []
+        for block in blocks:
+            if block.size <= self.chunk_size or block.has_fence:
+                results.append(block)
+                continue
+
+            piece = None
+            offset = block.start
+            for line in text[block.start:block.end].splitlines(keepends=True):
+                if piece is not None and offset + len(line) - piece.start > self.chunk_size:
+                    results.append(piece)
+                    piece = None
+                if piece is None:
+                    piece = _Block(
+                        start=offset,
+                        end=offset,
+                        heading_path=block.heading_path,
+                        level=block.level if offset == block.start else 0,
+                    )
+                offset += len(line)
+                piece.end = offset
+            results.append(piece)
+        return results
+
+    def _pack(self, blocks: list[_Block]) -> list[_Chunk]:
+        """블록을 chunk_size 이내로 순서대로 묶음"""
+        chunks = []
+        current = None
+        for block in blocks:
+            if current is not None:
+                fits = block.end - current.start <= self.chunk_size
+                major_heading = 0 < block.level <= self.split_level
+                if fits and (not major_heading or current.size < self.min_chunk_size):
+                    current.end = block.end
+                    current.paths.append(block.heading_path)
+                    continue
+            current = _Chunk(start=block.start, end=block.end, paths=[block.heading_path])
+            chunks.append(current)
+        return chunks
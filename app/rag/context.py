@@ -0,0 +1,185 @@
+"""검색 문서 -> LLM 컨텍스트 조립
+
+청크 분할 시 생긴 중복(overlap)을 제거하고, 같은 출처의 인접 청크를 하나로
+합친 뒤, 에이전트별 토큰 예산에 맞춰 잘라냅니다.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from langchain_core.documents import Document
+
+
+NO_CONTEXT_MESSAGE = "관련 문서를 찾을 수 없습니다."
+SECTION_SEPARATOR = "\n\n---\n\n"
+
+# 텍스트 기반 overlap 탐지 시 최소 겹침 길이 (우연한 일치 방지)
+MIN_TEXT_OVERLAP = 20
+
+# 청크 사이 공백(빈 줄)만 빠진 경우 맞닿은 것으로 간주하는 최대 간격
+MAX_MERGE_GAP = 4
+
+# 남은 예산이 이보다 적으면 섹션을 잘라 넣지 않음
+MIN_SECTION_TOKENS = 50
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토큰 수 근사치 (UTF-8 4바이트당 1토큰)
+
+    영어는 단어당 약 1.3토큰, 한글은 글자당 약 0.75토큰에 해당하며
+    별도 토크나이저 없이 예산 계산에 쓰기에 충분한 정도입니다.
+    """
+    if not text:
+        return 0
+    return max(1, len(text.encode("utf-8")) // 4)
+
+
+@dataclass
+class ContextStats:
+    """컨텍스트 조립 결과 통계"""
+    documents: int = 0
+    sections: int = 0
+    raw_tokens: int = 0
+    context_tokens: int = 0
+    budget: Optional[int] = None
+    truncated: bool = False
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.raw_tokens - self.context_tokens)
+
+
+@dataclass
+class _Section:
+    source: str
+    text: str
+    start: Optional[int]
+    rank: int
+
+    @property
+    def end(self) -> Optional[int]:
+        return None if self.start is None else self.start + len(self.text)
+
+
+def _format_section(index: int, source: str, text: str) -> str:
+    return f"[문서 {index}] (출처: {source})\n{text}"
+
+
+def _text_overlap(left: str, right: str) -> int:
+    """left의 끝과 right의 시작이 겹치는 길이 (없으면 0)"""
+    max_overlap = min(len(left), len(right))
+    for size in range(max_overlap, MIN_TEXT_OVERLAP - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def _try_merge(section: _Section, doc: Document, rank: int) -> bool:
+    """같은 출처의 문서를 section에 이어 붙일 수 있으면 병합"""
+    text = doc.page_content
+    start = doc.metadata.get("start_index")
+
+    if text in section.text:
+        section.rank = min(section.rank, rank)
+        return True
+
+    # 청크 시작 위치가 있으면 위치 기준으로 판단
+    if section.start is not None and start is not None:
+        if section.start <= start <= section.end:
+            section.text += text[section.end - start:]
+            section.rank = min(section.rank, rank)
+            return True
+        if 0 < start - section.end <= MAX_MERGE_GAP:
+            # 분할기가 청크 앞뒤 공백을 제거해 생긴 틈 (구조 기반 청크는 overlap이 없음)
+            section.text += "\n\n" + text
+            section.rank = min(section.rank, rank)
+            return True
+        return False
+
+    overlap = _text_overlap(section.text, text)
+    if overlap:
+        section.text += text[overlap:]
+        section.rank = min(section.rank, rank)
+        return True
+    return False
+
+
+def _merge_documents(documents: list[Document]) -> list[_Section]:
+    """출처별로 청크를 위치 순서대로 정렬해 겹치거나 맞닿은 청크를 병합"""
+    by_source: dict[str, list[tuple[int, Document]]] = {}
+    for rank, doc in enumerate(documents):
+        source = str(doc.metadata.get("source", "알 수 없음"))
+        by_source.setdefault(source, []).append((rank, doc))
+
+    sections = []
+    for source, ranked_docs in by_source.items():
+        ranked_docs.sort(key=lambda item: (
+            item[1].metadata.get("start_index") is None,
+            item[1].metadata.get("start_index") or 0,
+        ))
+
+        current = None
+        for rank, doc in ranked_docs:
+            if current is not None and _try_merge(current, doc, rank):
+                continue
+            current = _Section(
+                source=source,
+                text=doc.page_content,
+                start=doc.metadata.get("start_index"),
+                rank=rank,
+            )
+            sections.append(current)
+
+    # 검색 순위가 높은 청크를 포함한 섹션부터
+    sections.sort(key=lambda section: section.rank)
+    return sections
+
+
+def build_context(
+    documents: list[Document],
+    max_tokens: int = None,
+) -> tuple[str, ContextStats]:
+    """
+    검색 문서를 컨텍스트 문자열로 조립
+
+    Args:
+        documents: 검색 순위 순서의 문서 리스트
+        max_tokens: 컨텍스트 토큰 예산 (None이면 제한 없음)
+
+    Returns:
+        (컨텍스트 문자열, 통계)
+    """
+    stats = ContextStats(documents=len(documents), budget=max_tokens)
+    if not documents:
+        return NO_CONTEXT_MESSAGE, stats
+
+    # 중복 제거 전 기존 방식(문서별 그대로 연결)의 토큰 수
+    stats.raw_tokens = estimate_tokens(SECTION_SEPARATOR.join(
+        _format_section(i, str(doc.metadata.get("source", "알 수 없음")), doc.page_content)
+        for i, doc in enumerate(documents, 1)
+    ))
+
+    parts = []
+    used_tokens = 0
+    for section in _merge_documents(documents):
+        part = _format_section(len(parts) + 1, section.source, section.text)
+        part_tokens = estimate_tokens(part) + estimate_tokens(SECTION_SEPARATOR)
+
+        if max_tokens is not None and used_tokens + part_tokens > max_tokens:
+            stats.truncated = True
+            remaining = max_tokens - used_tokens
+            if remaining >= MIN_SECTION_TOKENS:
+                # 남은 예산만큼 앞부분만 줄 단위로 포함 (바이트 기준 근사)
+                cut = part[:int(len(part) * remaining / part_tokens)]
+                if "\n" in cut:
+                    cut = cut[:cut.rfind("\n")]
+                parts.append(cut.rstrip() + "\n...")
+            break
+
+        parts.append(part)
+        used_tokens += part_tokens
+
+    context = SECTION_SEPARATOR.join(parts) if parts else NO_CONTEXT_MESSAGE
+    stats.sections = len(parts)
+    stats.context_tokens = estimate_tokens(context)
+    return context, stats
@@ -0,0 +1,168 @@
+"""대용량 문서 적재 파이프라인
+
+파일 로드(프로세스 풀) -> 청크 분할 -> 고정 크기 배치 임베딩 -> Chroma 저장
+단계를 스트리밍으로 연결하여, 전체 문서를 메모리에 올리지 않고 적재합니다.
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from langchain_community.document_loaders import PyPDFLoader, TextLoader
+from langchain_core.documents import Document
+
+
+SUPPORTED_SUFFIXES = (".txt", ".md", ".pdf")
+
+
+@dataclass
+class IngestReport:
+    """증분 적재 결과"""
+    sources: int = 0
+    added: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    elapsed: float = 0.0
+    embed_seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        """임베딩 + 저장 처리량 (청크/초)"""
+        if self.embed_seconds <= 0:
+            return 0.0
+        return self.added / self.embed_seconds
+
+    def summary(self) -> str:
+        return (
+            f"파일 {self.sources}개 | 추가 {self.added} | 유지 {self.unchanged} | "
+            f"삭제 {self.deleted} | {self.elapsed:.2f}s "
+            f"({self.chunks_per_second:.1f} chunks/s)"
+        )
+
+
+def iter_source_files(directory: str) -> Iterator[str]:
+    """디렉토리에서 적재 대상 파일 경로를 정렬된 순서로 반환"""
+    for path in sorted(Path(directory).rglob("*")):
+        if path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES:
+            yield str(path)
+
+
+def load_file(path: str) -> list[Document]:
+    """단일 파일 로드 (프로세스 풀 워커에서 실행)"""
+    try:
+        if path.lower().endswith(".pdf"):
+            return PyPDFLoader(path).load()
+        return TextLoader(path, encoding="utf-8").load()
+    except Exception:
+        return []
+
+
+def iter_loaded_documents(
+    paths: Iterable[str],
+    workers: int = 1,
+) -> Iterator[tuple[str, list[Document]]]:
+    """
+    파일을 로드하여 (경로, 문서 리스트)를 완료 순서대로 반환
+
+    프로세스 풀에 동시에 넣는 작업 수를 workers * 2개로 제한하여
+    로드된 문서가 메모리에 쌓이지 않도록 합니다.
+    """
+    if workers <= 1:
+        for path in paths:
+            yield path, load_file(path)
+        return
+
+    paths = iter(paths)
+    max_in_flight = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = {}
+        for path in paths:
+            in_flight[executor.submit(load_file, path)] = path
+            if len(in_flight) >= max_in_flight:
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = in_flight.pop(future)
+                yield path, future.result()
+
+                next_path = next(paths, None)
+                if next_path is not None:
+                    in_flight[executor.submit(load_file, next_path)] = next_path
+
+
+def resolve_worker_count(workers: int) -> int:
+    """0 이하이면 CPU 수에 맞춰 워커 수 결정"""
+    if workers > 0:
+        return workers
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+class IngestPipeline:
+    """스트리밍 증분 적재 파이프라인"""
+
+    def __init__(self, manager, workers: int = 0, batch_size: int = 64):
+        """
+        Args:
+            manager: VectorStoreManager 인스턴스
+            workers: 파일 로드 프로세스 수 (0이면 자동)
+            batch_size: 한 번에 임베딩할 청크 수
+        """
+        self.manager = manager
+        self.workers = resolve_worker_count(workers)
+        self.batch_size = batch_size
+
+    def run(self, directory: str) -> IngestReport:
+        """디렉토리를 벡터 스토어와 증분 동기화"""
+        started = time.perf_counter()
+        report = IngestReport()
+
+        existing = self.manager.get_chunk_sources(directory)
+        seen = set()
+        batch = []
+
+        paths = iter_source_files(directory)
+        for _, documents in iter_loaded_documents(paths, self.workers):
+            if not documents:
+                continue
+            report.sources += 1
+
+            for split in self.manager.split_documents(documents):
+                chunk_id = split.metadata["chunk_id"]
+                if chunk_id in seen:
+                    continue
+                seen.add(chunk_id)
+
+                if chunk_id in existing:
+                    report.unchanged += 1
+                    continue
+
+                batch.append(split)
+                if len(batch) >= self.batch_size:
+                    self._flush(batch, report)
+                    batch = []
+
+        if batch:
+            self._flush(batch, report)
+
+        stale_ids = [chunk_id for chunk_id in existing if chunk_id not in seen]
+        self.manager.delete_chunks(stale_ids)
+        report.deleted = len(stale_ids)
+
+        # 변경이 있으면 BM25 역색인도 다시 생성
+        if report.added or report.deleted or self.manager.get_lexical_index() is None:
+            self.manager.rebuild_lexical_index()
+
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def _flush(self, batch: list[Document], report: IngestReport) -> None:
+        """청크 배치를 임베딩하여 저장"""
+        started = time.perf_counter()
+        self.manager.upsert_chunks(batch)
+        report.embed_seconds += time.perf_counter() - started
+        report.added += len(batch)
@@ -0,0 +1,109 @@
+"""ONNX Runtime 기반 int8 양자화 임베딩 (CPU 전용 배포용)
+
+PyTorch 없이 onnxruntime + tokenizers만으로 sentence-transformers 모델을
+실행합니다. 모델 변환(export)은 한 번만 필요하며, 변환에는 optimum 패키지가
+필요하지만 실행 시에는 필요하지 않습니다.
+"""
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+QUANTIZED_MODEL_FILENAME = "model_quantized.onnx"
+
+
+def get_model_dir(model_name: str, cache_dir: str) -> Path:
+    """모델별 ONNX 파일 저장 디렉토리"""
+    return Path(cache_dir) / model_name.replace("/", "__")
+
+
+def export_quantized_model(model_name: str, output_dir: Path) -> Path:
+    """
+    HuggingFace 모델을 ONNX로 변환하고 int8 동적 양자화
+
+    Returns:
+        양자화된 모델 파일 경로
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+    except ImportError as e:
+        raise ImportError(
+            "ONNX 모델 변환에는 optimum 패키지가 필요합니다: "
+            "pip install 'optimum[onnxruntime]'"
+        ) from e
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)
+
+    quantized_path = output_dir / QUANTIZED_MODEL_FILENAME
+    quantize_dynamic(
+        str(output_dir / "model.onnx"),
+        str(quantized_path),
+        weight_type=QuantType.QInt8,
+    )
+    return quantized_path
+
+
+class OnnxEmbeddings(Embeddings):
+    """int8 양자화 ONNX sentence-transformers 임베딩 (mean pooling)"""
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: str = "./models/onnx",
+        batch_size: int = 32,
+        max_length: int = 128,
+    ):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+
+        model_dir = get_model_dir(model_name, cache_dir)
+        model_path = model_dir / QUANTIZED_MODEL_FILENAME
+        if not model_path.exists():
+            model_path = export_quantized_model(model_name, model_dir)
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        self.session = ort.InferenceSession(
+            str(model_path), providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    def _embed_batch(self, texts: list[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # sentence-transformers와 동일한 mean pooling (패딩 토큰 제외)
+        mask = attention_mask[..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        return summed / counts
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = self._embed_batch(texts[start:start + self.batch_size])
+            vectors.extend(batch.tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed_batch([text])[0].tolist()
@@ -0,0 +1,98 @@
+"""쿼리 임베딩 / 검색 결과 캐시"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """크기 제한 + 선택적 TTL을 갖는 스레드 안전 LRU 캐시"""
+
+    def __init__(self, max_size: int = 256, ttl: float = 0):
+        """
+        Args:
+            max_size: 최대 항목 수 (0이면 캐시 비활성화)
+            ttl: 항목 유효 시간 (초, 0이면 만료 없음)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """캐시 조회 (없거나 만료되면 None)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, stored_at = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """캐시 저장 (가장 오래 사용되지 않은 항목부터 제거)"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
+
+
+class QueryCache:
+    """
+    유사도 검색용 캐시
+
+    - 쿼리 벡터: (임베딩 모델, 정규화된 쿼리) -> 벡터
+    - 검색 결과: (임베딩 모델, 정규화된 쿼리, 검색 조건) -> 문서 리스트
+    - 청크 벡터: (임베딩 모델, chunk_id) -> 저장된 벡터 (MMR용)
+
+    쿼리 벡터와 청크 벡터(chunk_id가 내용 해시)는 컬렉션 변경과 무관하므로
+    유지하고, 검색 결과는 컬렉션에 쓰기가 발생하면 invalidate()로 비웁니다.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 0):
+        self.vectors = LRUCache(max_size, ttl)
+        self.results = LRUCache(max_size, ttl)
+        self.chunk_vectors = LRUCache(max_size * 8, ttl)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """공백/대소문자 차이를 무시하도록 쿼리 정규화"""
+        return " ".join(query.split()).lower()
+
+    def invalidate(self) -> None:
+        """컬렉션 변경 시 검색 결과 캐시 비우기"""
+        self.results.clear()
+
+    def stats(self) -> dict:
+        return {
+            "vectors": self.vectors.stats(),
+            "results": self.results.stats(),
+            "chunk_vectors": self.chunk_vectors.stats(),
+        }
@@ -0,0 +1,75 @@
+"""검색 결과 다양화(MMR)와 cross-encoder 재순위화
+
+MMR은 벡터 스토어에 저장된 청크 임베딩을 재사용하므로 추가 임베딩 비용이
+없습니다. cross-encoder는 sentence-transformers가 설치되어 있고
+RERANK_MODEL이 설정된 경우에만 사용합니다.
+"""
+import threading
+
+import numpy as np
+from langchain_chroma.vectorstores import maximal_marginal_relevance
+from langchain_core.documents import Document
+
+
+def mmr_select(
+    query_vector: list[float],
+    documents: list[Document],
+    vectors: list[list[float]],
+    k: int,
+    lambda_mult: float = 0.5,
+) -> list[Document]:
+    """
+    MMR로 쿼리와 관련 있으면서 서로 겹치지 않는 문서 k개 선택
+
+    Args:
+        query_vector: 쿼리 임베딩
+        documents: 후보 문서 (유사도 순)
+        vectors: 후보 문서의 임베딩
+        k: 선택할 문서 수
+        lambda_mult: 1에 가까울수록 관련성, 0에 가까울수록 다양성 우선
+    """
+    if len(documents) <= 1:
+        return documents[:k]
+    indices = maximal_marginal_relevance(
+        np.array(query_vector, dtype=np.float32),
+        np.array(vectors, dtype=np.float32),
+        lambda_mult=lambda_mult,
+        k=min(k, len(documents)),
+    )
+    return [documents[i] for i in indices]
+
+
+class CrossEncoderReranker:
+    """(쿼리, 문서) 쌍을 직접 채점하는 로컬 cross-encoder"""
+
+    def __init__(self, model_name: str):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as e:
+            raise ImportError(
+                "cross-encoder rerank에는 sentence-transformers 패키지가 필요합니다: "
+                "pip install sentence-transformers"
+            ) from e
+
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name)
+
+    def rerank(self, query: str, documents: list[Document], k: int) -> list[Document]:
+        """점수 순으로 상위 k개 문서 반환"""
+        if not documents:
+            return []
+        scores = self.model.predict([(query, doc.page_content) for doc in documents])
+        order = np.argsort(-np.asarray(scores))
+        return [documents[i] for i in order[:k]]
+
+
+# 싱글톤 인스턴스 (모델별)
+_rerankers = {}
+_rerankers_lock = threading.Lock()
+
+
+def get_reranker(model_name: str) -> CrossEncoderReranker:
+    with _rerankers_lock:
+        if model_name not in _rerankers:
+            _rerankers[model_name] = CrossEncoderReranker(model_name)
+        return _rerankers[model_name]
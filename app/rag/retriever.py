@@ -1,13 +1,65 @@
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from langchain_core.documents import Document
-from app.rag.vectorstore import get_vectorstore_manager
+from app.config import get_settings
+from app.rag.context import ContextStats, build_context, estimate_tokens
+from app.rag.rerank import get_reranker, mmr_select
+from app.rag.vectorstore import get_vectorstore_manager, build_metadata_filter
 from app.models.schemas import TopicCategory, DifficultyLevel
 
 
+logger = logging.getLogger(__name__)
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[Document]],
+    k: int,
+    rrf_k: int = 60,
+) -> list[Document]:
+    """여러 검색 결과 순위를 RRF(1 / (rrf_k + rank))로 결합"""
+    scores = {}
+    documents = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, 1):
+            key = doc.metadata.get("chunk_id") or doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            documents.setdefault(key, doc)
+
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [documents[key] for key in ranked[:k]]
+
+
 class PythonEducationRetriever:
     """Python 교육용 RAG Retriever"""
 
     def __init__(self):
+        self.settings = get_settings()
         self.vectorstore_manager = get_vectorstore_manager()
+        # 임베딩(CPU)과 Chroma I/O를 이벤트 루프 밖에서 실행하는 제한된 풀
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, self.settings.retrieval_max_concurrency),
+            thread_name_prefix="rag-retrieval",
+        )
+
+    async def _run_in_executor(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def aretrieve(self, query: str, *args, **kwargs) -> list[Document]:
+        """retrieve의 비동기 버전 (retrieval 스레드 풀에서 실행, 인자는 retrieve와 같음)"""
+        return await self._run_in_executor(self.retrieve, query, *args, **kwargs)
+
+    async def aretrieve_for_problem(self, *args, **kwargs) -> list[Document]:
+        """retrieve_for_problem의 비동기 버전"""
+        return await self._run_in_executor(self.retrieve_for_problem, *args, **kwargs)
+
+    async def aretrieve_for_explanation(self, *args, **kwargs) -> list[Document]:
+        """retrieve_for_explanation의 비동기 버전"""
+        return await self._run_in_executor(self.retrieve_for_explanation, *args, **kwargs)
 
     def retrieve(
         self,
@@ -15,58 +67,141 @@ class PythonEducationRetriever:
         topic: TopicCategory = None,
         difficulty: DifficultyLevel = None,
         k: int = 4,
+        mode: str = None,
+        diversify: bool = False,
+        fetch_k: int = None,
+        lambda_mult: float = None,
+        rerank: bool = False,
     ) -> list[Document]:
         """
         쿼리에 맞는 문서 검색
 
         Args:
             query: 검색 쿼리
-            topic: 주제 필터 (선택)
-            difficulty: 난이도 필터 (선택)
+            topic: 주제 필터 (선택, 메타데이터 topic)
+            difficulty: 난이도 필터 (선택, 메타데이터 difficulty)
             k: 반환할 문서 수
+            mode: "vector" 또는 "hybrid" (기본값: 설정값)
+            diversify: MMR로 서로 비슷한 청크를 걸러냄
+            fetch_k: 다양화/재순위화 전 후보 문서 수 (기본값: max(3k, 10))
+            lambda_mult: MMR 관련성 가중치 (기본값: 설정값)
+            rerank: cross-encoder로 재순위화 (RERANK_MODEL 설정 필요)
 
         Returns:
             관련 문서 리스트
         """
-        # 쿼리 향상 - 주제와 난이도 정보 추가
-        enhanced_query = query
-        if topic:
-            topic_korean = {
-                TopicCategory.BASICS: "파이썬 기초 문법",
-                TopicCategory.DATA_STRUCTURES: "자료구조",
-                TopicCategory.ALGORITHMS: "알고리즘",
-                TopicCategory.OOP: "객체지향 프로그래밍",
-                TopicCategory.FILE_IO: "파일 입출력",
-                TopicCategory.EXCEPTIONS: "예외 처리",
-                TopicCategory.MODULES: "모듈과 패키지",
-                TopicCategory.FUNCTIONS: "함수",
-            }
-            enhanced_query = f"{topic_korean.get(topic, topic.value)} {enhanced_query}"
-
-        if difficulty:
-            difficulty_korean = {
-                DifficultyLevel.BEGINNER: "입문 초급",
-                DifficultyLevel.INTERMEDIATE: "중급",
-                DifficultyLevel.ADVANCED: "고급 심화",
-            }
-            enhanced_query = (
-                f"{difficulty_korean.get(difficulty, difficulty.value)} {enhanced_query}"
+        mode = mode or self.settings.retrieval_mode
+        if not (diversify or rerank):
+            return self._search(query, topic, difficulty, k, mode)
+
+        started = time.perf_counter()
+        fetch_k = max(fetch_k or max(k * 3, 10), k)
+        candidates = self._search(query, topic, difficulty, fetch_k, mode)
+        search_ms = (time.perf_counter() - started) * 1000
+
+        documents = candidates
+        mmr_ms = 0.0
+        if diversify:
+            started = time.perf_counter()
+            if lambda_mult is None:
+                lambda_mult = self.settings.mmr_lambda
+            # rerank할 경우 cross-encoder가 고를 여유분을 남김
+            documents = mmr_select(
+                self.vectorstore_manager.embed_query(query),
+                candidates,
+                self.vectorstore_manager.get_chunk_vectors(candidates),
+                k=k * 2 if rerank else k,
+                lambda_mult=lambda_mult,
             )
+            mmr_ms = (time.perf_counter() - started) * 1000
+
+        rerank_ms = 0.0
+        if rerank:
+            started = time.perf_counter()
+            documents = self._rerank(query, documents, k)
+            rerank_ms = (time.perf_counter() - started) * 1000
+        documents = documents[:k]
+
+        baseline_tokens = sum(estimate_tokens(doc.page_content) for doc in candidates[:k])
+        selected_tokens = sum(estimate_tokens(doc.page_content) for doc in documents)
+        _, merged = build_context(documents)
+        logger.info(
+            "retrieve: k=%d fetch_k=%d diversify=%s rerank=%s | search=%.1fms mmr=%.1fms "
+            "rerank=%.1fms | tokens=%d (top-k=%d, merged=%d)",
+            k, fetch_k, diversify, rerank, search_ms, mmr_ms, rerank_ms,
+            selected_tokens, baseline_tokens, merged.context_tokens,
+        )
+        return documents
 
-        # 유사도 검색
-        documents = self.vectorstore_manager.similarity_search(enhanced_query, k=k)
+    def _search(
+        self,
+        query: str,
+        topic: TopicCategory,
+        difficulty: DifficultyLevel,
+        k: int,
+        mode: str,
+    ) -> list[Document]:
+        """주제/난이도 필터 검색 (부족하면 전체 컬렉션에서 보충)"""
+        # 주제/난이도는 쿼리 문자열이 아닌 메타데이터 필터로 적용
+        where = build_metadata_filter(topic, difficulty)
+        if mode == "hybrid":
+            documents = self._hybrid_search(query, k, where)
+        else:
+            documents = self.vectorstore_manager.similarity_search(query, k=k, where=where)
+
+        # 해당 주제/난이도 문서가 부족하면 전체 컬렉션에서 보충
+        if where is not None and len(documents) < k:
+            seen = {doc.metadata.get("chunk_id") for doc in documents}
+            for doc in self.vectorstore_manager.similarity_search(query, k=k):
+                if len(documents) >= k:
+                    break
+                if doc.metadata.get("chunk_id") not in seen:
+                    documents.append(doc)
 
         return documents
 
+    def _rerank(self, query: str, documents: list[Document], k: int) -> list[Document]:
+        """cross-encoder 재순위화 (모델 미설정 시 순서 유지)"""
+        if not self.settings.rerank_model:
+            logger.warning("rerank 요청이 있었지만 RERANK_MODEL이 설정되지 않았습니다")
+            return documents[:k]
+        return get_reranker(self.settings.rerank_model).rerank(query, documents, k)
+
+    def _hybrid_search(self, query: str, k: int, where: dict = None) -> list[Document]:
+        """벡터 검색과 BM25 검색 결과를 RRF로 결합"""
+        fetch_k = max(k * 3, 10)
+        vector_docs = self.vectorstore_manager.similarity_search(query, k=fetch_k, where=where)
+        lexical_docs = self.vectorstore_manager.lexical_search(query, k=fetch_k, where=where)
+        return reciprocal_rank_fusion([vector_docs, lexical_docs], k=k)
+
     def retrieve_for_problem(
         self,
         topic: TopicCategory,
         difficulty: DifficultyLevel,
         problem_type: str,
+        k: int = None,
+        diversify: bool = None,
+        fetch_k: int = None,
+        lambda_mult: float = None,
+        rerank: bool = False,
     ) -> list[Document]:
-        """문제 출제를 위한 문서 검색"""
-        query = f"{topic.value} {difficulty.value} {problem_type} 문제 예제"
-        return self.retrieve(query, topic, difficulty, k=6)
+        """
+        문제 출제를 위한 문서 검색
+
+        k와 diversify를 생략하면 설정값(PROBLEM_RETRIEVAL_K,
+        PROBLEM_RETRIEVAL_DIVERSIFY)을 사용합니다.
+        """
+        query = f"{problem_type} 문제 예제"
+        return self.retrieve(
+            query,
+            topic,
+            difficulty,
+            k=k or self.settings.problem_retrieval_k,
+            diversify=self.settings.problem_retrieval_diversify if diversify is None else diversify,
+            fetch_k=fetch_k,
+            lambda_mult=lambda_mult,
+            rerank=rerank,
+        )
 
     def retrieve_for_explanation(
         self,
@@ -77,17 +212,28 @@ class PythonEducationRetriever:
         query = f"{concept} 개념 설명 예제"
         return self.retrieve(query, topic, k=4)
 
-    def get_context_string(self, documents: list[Document]) -> str:
+    def build_context(
+        self,
+        documents: list[Document],
+        max_tokens: int = None,
+    ) -> tuple[str, ContextStats]:
+        """중복 제거/병합/토큰 예산 적용한 컨텍스트와 통계 반환"""
+        context, stats = build_context(documents, max_tokens=max_tokens)
+        logger.info(
+            "context: docs=%d sections=%d tokens=%d (raw=%d, saved=%d, budget=%s)",
+            stats.documents, stats.sections, stats.context_tokens,
+            stats.raw_tokens, stats.tokens_saved, stats.budget,
+        )
+        return context, stats
+
+    def get_context_string(
+        self,
+        documents: list[Document],
+        max_tokens: int = None,
+    ) -> str:
         """문서 리스트를 컨텍스트 문자열로 변환"""
-        if not documents:
-            return "관련 문서를 찾을 수 없습니다."
-
-        context_parts = []
-        for i, doc in enumerate(documents, 1):
-            source = doc.metadata.get("source", "알 수 없음")
-            context_parts.append(f"[문서 {i}] (출처: {source})\n{doc.page_content}")
-
-        return "\n\n---\n\n".join(context_parts)
+        context, _ = self.build_context(documents, max_tokens=max_tokens)
+        return context
 
 
 # 싱글톤 인스턴스
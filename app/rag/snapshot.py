@@ -0,0 +1,281 @@
+"""읽기 전용 벡터 인덱스 스냅샷
+
+적재(ingest)를 한 곳에서만 수행하고, 결과 컬렉션을 버전별 스냅샷
+디렉토리로 내보내 여러 레플리카가 공유 볼륨에서 그대로 읽어 씁니다.
+
+    <root>/
+        CURRENT                     # 현재 버전 디렉토리 이름
+        20250101T120000-3f2a9c1d0e/
+            manifest.json           # 형식 버전, 임베딩 모델 fingerprint, 청크 수
+            embeddings.npy          # float32 (N, D), np.load(mmap_mode="r")로 로드
+            chunks.json             # ids, documents, metadatas
+            bm25_index.json
+
+임베딩은 메모리 매핑으로 열기 때문에 재임베딩이나 인덱스 빌드 없이 바로
+검색할 수 있고, 같은 호스트의 레플리카끼리는 페이지 캐시를 공유합니다.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.rag.bm25 import BM25Index, INDEX_FILENAME, matches_filter
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+CURRENT_FILENAME = "CURRENT"
+MANIFEST_FILENAME = "manifest.json"
+EMBEDDINGS_FILENAME = "embeddings.npy"
+CHUNKS_FILENAME = "chunks.json"
+
+
+def _write_json(path: Path, data) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def read_current(root: str) -> str | None:
+    """CURRENT 포인터가 가리키는 버전 이름 (없으면 None)"""
+    try:
+        version = (Path(root) / CURRENT_FILENAME).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def _set_current(root: Path, version: str) -> None:
+    """CURRENT 포인터 원자적 교체"""
+    tmp_path = root / f".{CURRENT_FILENAME}.tmp"
+    tmp_path.write_text(version, encoding="utf-8")
+    os.replace(tmp_path, root / CURRENT_FILENAME)
+
+
+def _content_hash(fingerprint: dict, ids: list[str]) -> str:
+    """청크 ID(내용 해시)와 모델 정보로 스냅샷 내용 식별"""
+    digest = hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode("utf-8"))
+    for chunk_id in ids:
+        digest.update(chunk_id.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def export_snapshot(manager, root: str, keep: int = 3) -> tuple[str, bool]:
+    """
+    현재 컬렉션을 새 스냅샷 버전으로 내보내고 CURRENT를 갱신
+
+    내용이 현재 스냅샷과 같으면 새 버전을 만들지 않습니다.
+
+    Args:
+        manager: Chroma 모드의 VectorStoreManager
+        root: 스냅샷 루트 디렉토리
+        keep: 보관할 최근 버전 수 (교체 중인 레플리카를 위해 여유분 유지)
+
+    Returns:
+        (버전 이름, 새로 만들었는지 여부)
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+
+    if manager.vectorstore is None:
+        manager.initialize()
+    fingerprint = manager.get_fingerprint()
+    stored = manager.vectorstore.get(include=["documents", "metadatas", "embeddings"])
+
+    order = sorted(range(len(stored["ids"])), key=lambda i: stored["ids"][i])
+    ids = [stored["ids"][i] for i in order]
+    content_hash = _content_hash(fingerprint, ids)
+
+    current = read_current(root)
+    if current is not None:
+        manifest_path = root / current / MANIFEST_FILENAME
+        if manifest_path.exists():
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                if json.load(f).get("content_hash") == content_hash:
+                    return current, False
+
+    version = f"{time.strftime('%Y%m%dT%H%M%S')}-{content_hash[:10]}"
+    tmp_dir = root / f".{version}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+
+    dimension = fingerprint["embedding_dimension"]
+    vectors = np.zeros((len(ids), dimension), dtype=np.float32)
+    for row, i in enumerate(order):
+        vectors[row] = stored["embeddings"][i]
+    np.save(tmp_dir / EMBEDDINGS_FILENAME, vectors)
+
+    documents = [stored["documents"][i] for i in order]
+    metadatas = [stored["metadatas"][i] or {} for i in order]
+    _write_json(tmp_dir / CHUNKS_FILENAME, {
+        "ids": ids,
+        "documents": documents,
+        "metadatas": metadatas,
+    })
+    BM25Index.build(ids, documents, metadatas).save(tmp_dir / INDEX_FILENAME)
+
+    # manifest는 마지막에 기록 (manifest가 있으면 완성된 스냅샷)
+    _write_json(tmp_dir / MANIFEST_FILENAME, {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "version": version,
+        "created_at": time.time(),
+        "content_hash": content_hash,
+        "fingerprint": fingerprint,
+        "count": len(ids),
+    })
+
+    os.rename(tmp_dir, root / version)
+    _set_current(root, version)
+    prune_snapshots(root, keep)
+    return version, True
+
+
+def prune_snapshots(root: str, keep: int = 3) -> list[str]:
+    """CURRENT와 최근 keep개를 제외한 오래된 버전 삭제"""
+    root = Path(root)
+    current = read_current(root)
+    versions = sorted(
+        path.name for path in root.iterdir()
+        if path.is_dir() and (path / MANIFEST_FILENAME).exists()
+    )
+    removed = []
+    for version in versions[:-keep] if keep > 0 else versions:
+        if version == current:
+            continue
+        shutil.rmtree(root / version, ignore_errors=True)
+        removed.append(version)
+    return removed
+
+
+class SnapshotIndex:
+    """
+    메모리 매핑된 스냅샷 위의 읽기 전용 벡터 인덱스
+
+    VectorStoreManager가 쓰는 Chroma 검색 인터페이스(similarity_search_by_vector,
+    get)만 구현합니다. 검색은 Chroma 기본값과 같은 L2 거리의 전수 비교입니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        with open(self.path / MANIFEST_FILENAME, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"지원하지 않는 스냅샷 형식입니다: {self.manifest.get('format_version')}"
+            )
+
+        self.embeddings = np.load(self.path / EMBEDDINGS_FILENAME, mmap_mode="r")
+        with open(self.path / CHUNKS_FILENAME, "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+        self.ids = chunks["ids"]
+        self.documents = chunks["documents"]
+        self.metadatas = chunks["metadatas"]
+        self.positions = {chunk_id: i for i, chunk_id in enumerate(self.ids)}
+
+        # 검색마다 다시 계산하지 않도록 벡터 제곱 노름만 미리 계산
+        self.squared_norms = np.einsum("ij,ij->i", self.embeddings, self.embeddings)
+
+        self.lexical_index = BM25Index.load(self.path / INDEX_FILENAME)
+        if self.lexical_index is None:
+            self.lexical_index = BM25Index.build(self.ids, self.documents, self.metadatas)
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    @property
+    def fingerprint(self) -> dict:
+        return self.manifest["fingerprint"]
+
+    def _document(self, i: int) -> Document:
+        return Document(page_content=self.documents[i], metadata=dict(self.metadatas[i]))
+
+    def similarity_search_by_vector(
+        self,
+        embedding: list[float],
+        k: int = 4,
+        filter: dict = None,
+    ) -> list[Document]:
+        """L2 거리 기준 상위 k개 문서 (filter는 Chroma where 형식)"""
+        if not self.ids:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        distances = self.squared_norms - 2.0 * (self.embeddings @ query)
+
+        if filter:
+            mask = np.array([matches_filter(metadata, filter) for metadata in self.metadatas])
+            candidates = np.flatnonzero(mask)
+        else:
+            candidates = np.arange(len(self.ids))
+        if len(candidates) == 0:
+            return []
+
+        k = min(k, len(candidates))
+        candidate_distances = distances[candidates]
+        top = np.argpartition(candidate_distances, k - 1)[:k]
+        top = top[np.argsort(candidate_distances[top])]
+        return [self._document(int(candidates[i])) for i in top]
+
+    def get(self, ids: list[str] = None, include: list[str] = None) -> dict:
+        """Chroma.get과 같은 형식의 조회 (없는 ID는 건너뜀)"""
+        include = include or ["documents", "metadatas"]
+        if ids is None:
+            positions = list(range(len(self.ids)))
+        else:
+            positions = [self.positions[chunk_id] for chunk_id in ids if chunk_id in self.positions]
+
+        result = {"ids": [self.ids[i] for i in positions]}
+        if "documents" in include:
+            result["documents"] = [self.documents[i] for i in positions]
+        if "metadatas" in include:
+            result["metadatas"] = [dict(self.metadatas[i]) for i in positions]
+        if "embeddings" in include:
+            result["embeddings"] = [np.asarray(self.embeddings[i]) for i in positions]
+        return result
+
+
+def load_current_snapshot(root: str) -> SnapshotIndex:
+    """CURRENT가 가리키는 스냅샷 로드"""
+    version = read_current(root)
+    if version is None:
+        raise FileNotFoundError(
+            f"'{root}'에 스냅샷이 없습니다. "
+            "`python ingest_knowledge_base.py --export-snapshot <경로>` 로 먼저 내보내세요."
+        )
+    return SnapshotIndex(Path(root) / version)
+
+
+class SnapshotWatcher(threading.Thread):
+    """CURRENT 포인터를 주기적으로 확인해 새 버전이 보이면 on_change 호출"""
+
+    def __init__(self, root: str, interval: float, current_version: str, on_change):
+        super().__init__(name="snapshot-watcher", daemon=True)
+        self.root = root
+        self.interval = interval
+        self.current_version = current_version
+        self.on_change = on_change
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            version = read_current(self.root)
+            if version is None or version == self.current_version:
+                continue
+            # 실패한 버전도 다시 시도하지 않음 (다음 export가 새 버전을 만듦)
+            self.current_version = version
+            try:
+                self.on_change(SnapshotIndex(Path(self.root) / version))
+            except Exception:
+                # 잘못된 스냅샷이면 기존 버전으로 계속 서비스
+                logger.exception("스냅샷 '%s' 교체 실패", version)
+
+    def stop(self) -> None:
+        self._stop_event.set()
@@ -1,126 +1,387 @@
-import os
+import json
+import hashlib
+import logging
+import threading
 from pathlib import Path
 from langchain_chroma import Chroma
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import (
-    DirectoryLoader,
-    TextLoader,
-    PyPDFLoader,
-)
 from langchain_core.documents import Document
 
 from app.config import get_settings
+from app.models.schemas import TopicCategory, DifficultyLevel
+from app.rag.ingest import (
+    IngestPipeline,
+    IngestReport,
+    iter_loaded_documents,
+    iter_source_files,
+    resolve_worker_count,
+)
+from app.rag.query_cache import QueryCache
+from app.rag.bm25 import BM25Index, INDEX_FILENAME
+from app.rag.chunker import MarkdownChunker
+from app.rag.snapshot import SnapshotIndex, SnapshotWatcher, load_current_snapshot
+
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "python_education"
+
+# 청크 메타데이터 형식이 바뀌면 올려서 다음 적재 때 전체 재임베딩
+CHUNK_SCHEMA_VERSION = 4
+
+# knowledge_base/<디렉토리>/ 이름 중 TopicCategory 값과 다른 것
+TOPIC_DIRECTORY_ALIASES = {
+    "python_basics": TopicCategory.BASICS,
+}
 
+# 난이도 디렉토리가 없는 문서는 모든 난이도에서 검색됨
+ALL_DIFFICULTIES = "all"
 
-def get_embeddings():
-    """임베딩 모델 가져오기 (에러 핸들링 포함)"""
+# 테스트용 임베딩 (EMBEDDING_MODEL=fake 로 명시한 경우에만 사용)
+FAKE_EMBEDDING_MODEL = "fake"
+
+
+def compute_chunk_id(source: str, content: str) -> str:
+    """출처 경로와 청크 내용으로 결정적인 청크 ID 생성"""
+    digest = hashlib.sha256()
+    digest.update(f"v{CHUNK_SCHEMA_VERSION}\0".encode("utf-8"))
+    digest.update(source.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def is_under_directory(source: str, directory: str) -> bool:
+    """source 경로가 directory 하위에 있는지 확인"""
     try:
-        # 먼저 HuggingFace 임베딩 시도
-        from langchain_huggingface import HuggingFaceEmbeddings
-        return HuggingFaceEmbeddings(
-            model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+        Path(source).resolve().relative_to(Path(directory).resolve())
+        return True
+    except ValueError:
+        return False
+
+
+def derive_chunk_tags(source: str) -> dict:
+    """
+    knowledge_base/<topic>/[<difficulty>/]파일 경로에서 검색 필터용 태그 추출
+
+    Returns:
+        {"topic": ..., "difficulty": ...} (주제를 알 수 없으면 topic 생략)
+    """
+    topics = {topic.value: topic for topic in TopicCategory}
+    topics.update(TOPIC_DIRECTORY_ALIASES)
+    difficulties = {level.value for level in DifficultyLevel}
+
+    tags = {"difficulty": ALL_DIFFICULTIES}
+    for part in Path(source).parent.parts:
+        if part in topics:
+            tags["topic"] = topics[part].value
+        elif part in difficulties:
+            tags["difficulty"] = part
+    return tags
+
+
+def build_metadata_filter(
+    topic: TopicCategory = None,
+    difficulty: DifficultyLevel = None,
+) -> dict | None:
+    """주제/난이도로 Chroma where 필터 생성"""
+    conditions = []
+    if topic:
+        conditions.append({"topic": topic.value})
+    if difficulty:
+        conditions.append(
+            {"difficulty": {"$in": [difficulty.value, ALL_DIFFICULTIES]}}
         )
-    except Exception:
-        try:
-            # 백업: 더 간단한 임베딩 모델
-            from langchain_huggingface import HuggingFaceEmbeddings
-            return HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2"
-            )
-        except Exception:
-            # 최종 백업: 기본 임베딩
-            from langchain_community.embeddings import FakeEmbeddings
-            return FakeEmbeddings(size=384)
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+class EmbeddingModelMismatchError(RuntimeError):
+    """컬렉션을 만든 임베딩 모델과 현재 설정된 모델이 다름"""
+
+
+class ReadOnlyIndexError(RuntimeError):
+    """스냅샷 모드에서 인덱스 쓰기 시도"""
+
+
+def get_embeddings(model_name: str = None, backend: str = None):
+    """
+    설정된 임베딩 모델 가져오기
+
+    다른 모델로 조용히 대체하지 않습니다. 모델 로드에 실패하면 예외를 그대로
+    올려서, 다른 벡터 공간으로 기존 컬렉션을 검색하는 일이 없도록 합니다.
+    FAKE_EMBEDDING_MODEL은 테스트/오프라인 개발에서 명시적으로 지정할 때만 사용됩니다.
+
+    Args:
+        model_name: HuggingFace 모델 이름 (기본값: 설정값)
+        backend: "torch" (HuggingFaceEmbeddings) 또는 "onnx" (int8 ONNX Runtime)
+    """
+    settings = get_settings()
+    model_name = model_name or settings.embedding_model
+    backend = backend or settings.embedding_backend
+
+    if model_name == FAKE_EMBEDDING_MODEL:
+        from langchain_community.embeddings import FakeEmbeddings
+        return FakeEmbeddings(size=384)
+
+    if backend == "onnx":
+        from app.rag.onnx_embeddings import OnnxEmbeddings
+        return OnnxEmbeddings(model_name, cache_dir=settings.onnx_model_dir)
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+
+def get_text_splitter() -> RecursiveCharacterTextSplitter:
+    """지식 베이스 청크 분할기"""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=200,
+        separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""],
+        add_start_index=True,
+    )
+
+
+def get_chunker() -> MarkdownChunker:
+    """마크다운은 헤딩/코드 블록 단위로, 그 외 문서는 기존 분할기로 분할"""
+    return MarkdownChunker(chunk_size=1000, fallback_splitter=get_text_splitter())
 
 
 class VectorStoreManager:
-    """ChromaDB 벡터 스토어 관리자"""
+    """
+    ChromaDB 벡터 스토어 관리자
+
+    VECTOR_SNAPSHOT_PATH가 설정되면 Chroma 대신 공유 스냅샷(읽기 전용)을
+    메모리 매핑으로 열어 검색합니다 (app/rag/snapshot.py 참고).
+    """
 
-    def __init__(self):
+    def __init__(self, use_snapshot: bool = True):
+        """
+        Args:
+            use_snapshot: False면 설정과 관계없이 Chroma 사용 (적재 스크립트용)
+        """
         self.settings = get_settings()
-        self.embeddings = get_embeddings()
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""],
+        self.snapshot_path = self.settings.vector_snapshot_path if use_snapshot else ""
+        self.snapshot_watcher = None
+        self.embedding_model_name = self.settings.embedding_model
+        self.embeddings = get_embeddings(self.embedding_model_name)
+        self.embedding_dimension = None
+        self.query_cache = QueryCache(
+            max_size=self.settings.query_cache_size,
+            ttl=self.settings.query_cache_ttl,
         )
+        self.text_splitter = get_chunker()
         self.vectorstore = None
+        self.lexical_index = None
 
-    def initialize(self) -> Chroma:
-        """벡터 스토어 초기화 또는 로드"""
-        persist_dir = self.settings.chroma_persist_directory
+    def get_fingerprint(self) -> dict:
+        """컬렉션 메타데이터에 저장할 임베딩 모델 정보"""
+        if self.embedding_dimension is None:
+            self.embedding_dimension = len(self.embeddings.embed_query("dimension"))
+        return {
+            "embedding_model": self.embedding_model_name,
+            "embedding_dimension": self.embedding_dimension,
+        }
 
-        if os.path.exists(persist_dir) and os.listdir(persist_dir):
-            # 기존 벡터 스토어 로드
-            self.vectorstore = Chroma(
-                persist_directory=persist_dir,
-                embedding_function=self.embeddings,
-                collection_name="python_education",
-            )
-        else:
-            # 새 벡터 스토어 생성
-            self.vectorstore = Chroma(
-                persist_directory=persist_dir,
-                embedding_function=self.embeddings,
-                collection_name="python_education",
-            )
+    @property
+    def read_only(self) -> bool:
+        return bool(self.snapshot_path)
 
-        return self.vectorstore
+    @property
+    def snapshot_version(self) -> str | None:
+        """현재 서비스 중인 스냅샷 버전 (Chroma 모드면 None)"""
+        if isinstance(self.vectorstore, SnapshotIndex):
+            return self.vectorstore.version
+        return None
 
-    def load_documents_from_directory(self, directory: str) -> list[Document]:
-        """디렉토리에서 문서 로드"""
-        documents = []
+    def initialize(self, check_fingerprint: bool = True) -> Chroma | SnapshotIndex:
+        """
+        벡터 스토어 초기화 또는 로드
+
+        Args:
+            check_fingerprint: 기존 컬렉션의 임베딩 모델이 현재 설정과 같은지 확인
+
+        Raises:
+            EmbeddingModelMismatchError: 다른 모델로 만든 컬렉션인 경우
+        """
+        fingerprint = self.get_fingerprint()
+        if self.read_only:
+            self.swap_snapshot(load_current_snapshot(self.snapshot_path), check_fingerprint)
+            return self.vectorstore
 
-        # 텍스트 파일 로드
-        txt_loader = DirectoryLoader(
-            directory,
-            glob="**/*.txt",
-            loader_cls=TextLoader,
-            loader_kwargs={"encoding": "utf-8"},
-            silent_errors=True,
+        self.vectorstore = Chroma(
+            persist_directory=self.settings.chroma_persist_directory,
+            embedding_function=self.embeddings,
+            collection_name=COLLECTION_NAME,
+            collection_metadata=fingerprint,
         )
-        try:
-            documents.extend(txt_loader.load())
-        except Exception:
-            pass
-
-        # 마크다운 파일 로드
-        md_loader = DirectoryLoader(
-            directory,
-            glob="**/*.md",
-            loader_cls=TextLoader,
-            loader_kwargs={"encoding": "utf-8"},
-            silent_errors=True,
+
+        if check_fingerprint:
+            self._check_fingerprint(fingerprint)
+
+        return self.vectorstore
+
+    def _check_fingerprint(self, fingerprint: dict) -> None:
+        """저장된 모델 정보와 현재 모델 비교 (빈 컬렉션이면 현재 모델로 기록)"""
+        collection = self.vectorstore._collection
+        stored = collection.metadata or {}
+        stored_fingerprint = {key: stored.get(key) for key in fingerprint}
+
+        if stored_fingerprint == fingerprint:
+            return
+
+        if collection.count() == 0:
+            collection.modify(metadata=fingerprint)
+            return
+
+        raise EmbeddingModelMismatchError(
+            f"'{COLLECTION_NAME}' 컬렉션은 {stored_fingerprint} 로 생성되었지만 "
+            f"현재 설정은 {fingerprint} 입니다. "
+            "`python ingest_knowledge_base.py --reembed` 로 다시 임베딩하세요."
         )
-        try:
-            documents.extend(md_loader.load())
-        except Exception:
-            pass
-
-        # PDF 파일 로드
-        pdf_path = Path(directory)
-        for pdf_file in pdf_path.glob("**/*.pdf"):
-            try:
-                loader = PyPDFLoader(str(pdf_file))
-                documents.extend(loader.load())
-            except Exception:
-                pass
 
+    def swap_snapshot(self, index: SnapshotIndex, check_fingerprint: bool = True) -> None:
+        """
+        검색 대상을 새 스냅샷으로 교체 (진행 중인 검색은 기존 스냅샷으로 끝남)
+
+        Raises:
+            EmbeddingModelMismatchError: 다른 모델로 만든 스냅샷인 경우
+        """
+        fingerprint = self.get_fingerprint()
+        stored_fingerprint = {key: index.fingerprint.get(key) for key in fingerprint}
+        if check_fingerprint and stored_fingerprint != fingerprint:
+            raise EmbeddingModelMismatchError(
+                f"스냅샷 '{index.version}'은 {stored_fingerprint} 로 생성되었지만 "
+                f"현재 설정은 {fingerprint} 입니다."
+            )
+
+        previous = self.snapshot_version
+        self.vectorstore = index
+        self.lexical_index = index.lexical_index
+        self.query_cache.invalidate()
+        logger.info("vector snapshot: %s -> %s (%d chunks)", previous, index.version, len(index.ids))
+
+    def start_snapshot_watcher(self) -> SnapshotWatcher | None:
+        """스냅샷 CURRENT 변경 감시 시작 (스냅샷 모드가 아니거나 주기가 0이면 None)"""
+        if not self.read_only or self.settings.snapshot_poll_interval <= 0:
+            return None
+        if self.snapshot_watcher is None:
+            self.snapshot_watcher = SnapshotWatcher(
+                self.snapshot_path,
+                self.settings.snapshot_poll_interval,
+                self.snapshot_version,
+                self.swap_snapshot,
+            )
+            self.snapshot_watcher.start()
+        return self.snapshot_watcher
+
+    def _ensure_writable(self) -> None:
+        if self.read_only:
+            raise ReadOnlyIndexError(
+                "스냅샷 모드(VECTOR_SNAPSHOT_PATH)에서는 인덱스를 수정할 수 없습니다. "
+                "적재는 ingest_knowledge_base.py 로 수행하세요."
+            )
+
+    def reset_collection(self) -> None:
+        """컬렉션과 BM25 역색인을 삭제하고 현재 모델로 빈 컬렉션 생성"""
+        self._ensure_writable()
+        if self.vectorstore is None:
+            self.initialize(check_fingerprint=False)
+
+        self.vectorstore.delete_collection()
+        self.lexical_index_path.unlink(missing_ok=True)
+        self.lexical_index = None
+        self.query_cache.invalidate()
+        self.initialize()
+
+    def load_documents_from_directory(self, directory: str) -> list[Document]:
+        """디렉토리에서 문서 로드 (txt, md, pdf)"""
+        workers = resolve_worker_count(self.settings.ingest_workers)
+        documents = []
+        for _, loaded in iter_loaded_documents(iter_source_files(directory), workers):
+            documents.extend(loaded)
         return documents
 
+    def split_documents(self, documents: list[Document]) -> list[Document]:
+        """문서를 청크로 분할하고 청크 ID 메타데이터 부여"""
+        splits = self.text_splitter.split_documents(documents)
+        for split in splits:
+            source = str(split.metadata.get("source", ""))
+            split.metadata.update(derive_chunk_tags(source))
+            split.metadata["chunk_id"] = compute_chunk_id(source, split.page_content)
+        return splits
+
     def add_documents(self, documents: list[Document]) -> None:
         """문서를 벡터 스토어에 추가"""
         if not documents:
             return
 
         # 문서 분할
-        splits = self.text_splitter.split_documents(documents)
+        splits = self.split_documents(documents)
+
+        # 벡터 스토어에 추가 (BM25 역색인은 컬렉션 전체를 다시 읽지 않고 새 청크만 추가)
+        self.upsert_chunks(splits)
+        self.update_lexical_index(splits)
+
+    def upsert_chunks(self, splits: list[Document]) -> None:
+        """분할된 청크 저장 (같은 청크는 같은 ID로 덮어씀)"""
+        if not splits:
+            return
+        self._ensure_writable()
+        if self.vectorstore is None:
+            self.initialize()
+
+        ids = [split.metadata["chunk_id"] for split in splits]
+        self.vectorstore.add_documents(splits, ids=ids)
+        self.query_cache.invalidate()
+
+    def get_chunk_sources(self, directory: str = None) -> dict[str, str]:
+        """저장된 청크 ID -> 출처 매핑 (directory 지정 시 하위 출처만)"""
+        if self.vectorstore is None:
+            self.initialize()
+
+        stored = self.vectorstore.get(include=["metadatas"])
+        chunk_sources = {}
+        for chunk_id, metadata in zip(stored["ids"], stored["metadatas"]):
+            source = str((metadata or {}).get("source", ""))
+            if directory is None or is_under_directory(source, directory):
+                chunk_sources[chunk_id] = source
+        return chunk_sources
 
-        # 벡터 스토어에 추가
+    def delete_chunks(self, ids: list[str]) -> None:
+        """청크 ID 목록 삭제"""
+        if not ids:
+            return
+        self._ensure_writable()
         if self.vectorstore is None:
             self.initialize()
+        self.vectorstore.delete(ids=ids)
+        self.query_cache.invalidate()
+
+    def sync_directory(self, directory: str) -> IngestReport:
+        """
+        디렉토리 내용을 벡터 스토어와 증분 동기화
 
-        self.vectorstore.add_documents(splits)
+        청크는 (출처 경로, 내용 해시)로 식별하므로 새로 생기거나 바뀐 청크만
+        임베딩하고, 사라진 파일/청크는 삭제합니다. 파일 로드와 임베딩은
+        IngestPipeline에서 스트리밍 배치로 처리합니다.
+
+        Args:
+            directory: 지식 베이스 디렉토리
+
+        Returns:
+            변경 내역 리포트
+        """
+        pipeline = IngestPipeline(
+            self,
+            workers=self.settings.ingest_workers,
+            batch_size=self.settings.ingest_batch_size,
+        )
+        return pipeline.run(directory)
 
     def add_text(self, text: str, metadata: dict = None) -> None:
         """텍스트를 벡터 스토어에 추가"""
@@ -130,12 +391,144 @@ class VectorStoreManager:
         doc = Document(page_content=text, metadata=metadata)
         self.add_documents([doc])
 
-    def similarity_search(self, query: str, k: int = 4) -> list[Document]:
-        """유사도 검색"""
+    def embed_query(self, query: str) -> list[float]:
+        """쿼리 임베딩 (LRU 캐시 사용)"""
+        key = (self.embedding_model_name, self.query_cache.normalize(query))
+        vector = self.query_cache.vectors.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(query)
+            self.query_cache.vectors.set(key, vector)
+        return vector
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        where: dict = None,
+    ) -> list[Document]:
+        """
+        유사도 검색 (쿼리 벡터와 상위 k개 결과를 캐시)
+
+        Args:
+            query: 검색 쿼리
+            k: 반환할 문서 수
+            where: Chroma 메타데이터 필터 (build_metadata_filter 참고)
+        """
         if self.vectorstore is None:
             self.initialize()
 
-        return self.vectorstore.similarity_search(query, k=k)
+        key = (
+            self.embedding_model_name,
+            self.query_cache.normalize(query),
+            k,
+            json.dumps(where, sort_keys=True) if where else None,
+        )
+        documents = self.query_cache.results.get(key)
+        if documents is None:
+            vector = self.embed_query(query)
+            documents = self.vectorstore.similarity_search_by_vector(
+                vector, k=k, filter=where
+            )
+            self.query_cache.results.set(key, documents)
+
+        return list(documents)
+
+    def get_chunk_vectors(self, documents: list[Document]) -> list[list[float]]:
+        """
+        검색된 청크의 저장된 임베딩 조회 (재임베딩 없이 chunk_id로 캐시)
+
+        chunk_id가 없거나 컬렉션에 없는 문서만 새로 임베딩합니다.
+        """
+        if self.vectorstore is None:
+            self.initialize()
+
+        keys = [(self.embedding_model_name, doc.metadata.get("chunk_id")) for doc in documents]
+        vectors = [self.query_cache.chunk_vectors.get(key) for key in keys]
+
+        missing_ids = list({
+            key[1] for key, vector in zip(keys, vectors) if vector is None and key[1]
+        })
+        if missing_ids:
+            stored = self.vectorstore.get(ids=missing_ids, include=["embeddings"])
+            for chunk_id, embedding in zip(stored["ids"], stored["embeddings"]):
+                self.query_cache.chunk_vectors.set(
+                    (self.embedding_model_name, chunk_id), [float(x) for x in embedding]
+                )
+            vectors = [self.query_cache.chunk_vectors.get(key) for key in keys]
+
+        unresolved = [i for i, vector in enumerate(vectors) if vector is None]
+        if unresolved:
+            embedded = self.embeddings.embed_documents(
+                [documents[i].page_content for i in unresolved]
+            )
+            for i, vector in zip(unresolved, embedded):
+                vectors[i] = vector
+
+        return vectors
+
+    @property
+    def lexical_index_path(self) -> Path:
+        """BM25 역색인 파일 경로 (Chroma 저장 디렉토리 옆)"""
+        return Path(self.settings.chroma_persist_directory) / INDEX_FILENAME
+
+    def get_lexical_index(self) -> BM25Index | None:
+        """BM25 역색인 로드 (없으면 None)"""
+        if self.lexical_index is None:
+            self.lexical_index = BM25Index.load(self.lexical_index_path)
+        return self.lexical_index
+
+    def rebuild_lexical_index(self) -> BM25Index:
+        """컬렉션 전체로 BM25 역색인을 다시 만들어 저장"""
+        self._ensure_writable()
+        if self.vectorstore is None:
+            self.initialize()
+
+        stored = self.vectorstore.get(include=["documents", "metadatas"])
+        index = BM25Index.build(stored["ids"], stored["documents"], stored["metadatas"])
+        index.save(self.lexical_index_path)
+        self.lexical_index = index
+        return index
+
+    def update_lexical_index(self, splits: list[Document]) -> BM25Index:
+        """새 청크를 BM25 역색인에 추가해 저장 (역색인이 없으면 전체 생성)"""
+        index = self.get_lexical_index()
+        if index is None:
+            return self.rebuild_lexical_index()
+
+        added = index.add(
+            [split.metadata["chunk_id"] for split in splits],
+            [split.page_content for split in splits],
+            [split.metadata for split in splits],
+        )
+        if added:
+            index.save(self.lexical_index_path)
+        return index
+
+    def lexical_search(
+        self,
+        query: str,
+        k: int = 4,
+        where: dict = None,
+    ) -> list[Document]:
+        """BM25 어휘 검색 (역색인이 없으면 빈 리스트)"""
+        index = self.get_lexical_index()
+        if index is None:
+            return []
+        if self.vectorstore is None:
+            self.initialize()
+
+        chunk_ids = [chunk_id for chunk_id, _ in index.search(query, k=k, where=where)]
+        if not chunk_ids:
+            return []
+
+        stored = self.vectorstore.get(ids=chunk_ids, include=["documents", "metadatas"])
+        by_id = {
+            chunk_id: Document(page_content=text, metadata=metadata or {})
+            for chunk_id, text, metadata in zip(
+                stored["ids"], stored["documents"], stored["metadatas"]
+            )
+        }
+        return [by_id[chunk_id] for chunk_id in chunk_ids if chunk_id in by_id]
 
     def get_retriever(self, k: int = 4):
         """Retriever 객체 반환"""
@@ -145,13 +538,18 @@ class VectorStoreManager:
         return self.vectorstore.as_retriever(search_kwargs={"k": k})
 
 
-# 싱글톤 인스턴스
+# 싱글톤 인스턴스 (warm-up 스레드와 요청 스레드가 동시에 생성하지 않도록 잠금)
 _vectorstore_manager = None
+_vectorstore_manager_lock = threading.Lock()
 
 
 def get_vectorstore_manager() -> VectorStoreManager:
     global _vectorstore_manager
     if _vectorstore_manager is None:
-        _vectorstore_manager = VectorStoreManager()
-        _vectorstore_manager.initialize()
+        with _vectorstore_manager_lock:
+            if _vectorstore_manager is None:
+                manager = VectorStoreManager()
+                manager.initialize()
+                manager.start_snapshot_watcher()
+                _vectorstore_manager = manager
     return _vectorstore_manager
@@ -0,0 +1,99 @@
+"""임베딩 모델 / 벡터 스토어 사전 로딩(warm-up)
+
+첫 요청에서 sentence-transformers 모델 로드와 Chroma 인덱스 오픈이
+일어나지 않도록, 프로세스 시작 시 백그라운드 스레드에서 미리 초기화합니다.
+실패하면 간격을 늘려 가며 다시 시도하고, 그래도 실패하면 다음
+start_background_warmup 호출(/ready, Streamlit 새로고침) 때 처음부터 다시 시작합니다.
+"""
+import logging
+import threading
+import time
+
+from app.rag.vectorstore import get_vectorstore_manager
+
+
+logger = logging.getLogger(__name__)
+
+# 스레드 한 번에 시도할 횟수와 첫 재시도 대기 시간 (초, 시도마다 두 배)
+RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 1.0
+
+_ready = threading.Event()
+_lock = threading.Lock()
+_thread = None
+_status = {"started_at": None, "elapsed": None, "error": None, "attempts": 0}
+
+
+def warm_up() -> bool:
+    """모델 로드, 더미 임베딩, 인덱스 오픈까지 동기적으로 수행 (성공 여부 반환)"""
+    started = time.perf_counter()
+    _status["started_at"] = time.time()
+    _status["attempts"] += 1
+    try:
+        manager = get_vectorstore_manager()
+
+        # 더미 임베딩으로 지연 초기화(토크나이저, 모델 가중치) 유도
+        vector = manager.embeddings.embed_query("파이썬 warm-up")
+
+        # 검색 한 번으로 HNSW 인덱스와 BM25 역색인 로드
+        manager.vectorstore.similarity_search_by_vector(vector, k=1)
+        manager.get_lexical_index()
+
+        _status["error"] = None
+        _ready.set()
+        return True
+    except Exception as e:
+        _status["error"] = f"{type(e).__name__}: {e}"
+        return False
+    finally:
+        _status["elapsed"] = time.perf_counter() - started
+
+
+def _warm_up_with_retry() -> None:
+    """실패하면 RETRY_BASE_DELAY부터 두 배씩 기다리며 재시도, 끝내 실패하면 스레드 슬롯을 비움"""
+    global _thread
+    try:
+        for attempt in range(RETRY_ATTEMPTS):
+            if warm_up():
+                return
+            if attempt + 1 < RETRY_ATTEMPTS:
+                delay = RETRY_BASE_DELAY * 2 ** attempt
+                logger.warning("warm-up 실패, %g초 후 재시도: %s", delay, _status["error"])
+                time.sleep(delay)
+        logger.error("warm-up %d회 실패: %s", RETRY_ATTEMPTS, _status["error"])
+    finally:
+        # 실패한 채로 남은 스레드 때문에 이후 호출이 재시도하지 못하는 일이 없도록
+        with _lock:
+            if not _ready.is_set():
+                _thread = None
+
+
+def start_background_warmup() -> threading.Thread:
+    """백그라운드 warm-up 시작 (실행 중이거나 완료됐으면 그 스레드를, 실패한 뒤면 새로 시작)"""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_warm_up_with_retry, name="rag-warmup", daemon=True)
+            _thread.start()
+        return _thread
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def wait_until_ready(timeout: float = None) -> bool:
+    """warm-up 완료까지 대기 (실패 시에는 재시도를 모두 마친 시점에 반환)"""
+    thread = start_background_warmup()
+    thread.join(timeout)
+    return is_ready()
+
+
+def get_warmup_status() -> dict:
+    """readiness 엔드포인트용 상태"""
+    return {
+        "ready": is_ready(),
+        "elapsed": _status["elapsed"],
+        "error": _status["error"],
+        "attempts": _status["attempts"],
+    }
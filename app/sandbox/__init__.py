@@ -0,0 +1,7 @@
+from .pool import SandboxPool, get_sandbox_pool, is_sandbox_failure
+
+__all__ = [
+    "SandboxPool",
+    "get_sandbox_pool",
+    "is_sandbox_failure",
+]
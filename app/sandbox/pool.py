@@ -0,0 +1,445 @@
+"""제출 코드 실행용 워커 프로세스 풀
+
+학생 코드를 웹 프로세스 안에서 exec하면 무한 루프나 거대한 할당 하나가
+Streamlit/FastAPI 프로세스 전체를 멈추게 합니다. SandboxPool은 rlimit이 걸린
+워커 프로세스를 미리 띄워 두고, 워커는 작업마다 일회용 자식을 fork해 실행합니다
+(worker.py 참고).
+
+- 격리: 비밀이 없는 최소 환경 변수로 시작, 자식은 sandbox_user로 setuid (웹 앱이 root여야
+  가능), 자식은 새 프로세스 생성/파일 쓰기 불가 (RLIMIT_NPROC/FSIZE = 0)
+- 권한을 낮출 수 없으면 (root가 아니거나 사용자가 없으면) 자식이 웹 앱과 같은 uid로
+  /proc/<pid>/environ, .env의 API 키를 읽을 수 있으므로, allow_same_user를 명시적으로
+  켜지 않는 한 코드 실행을 거부합니다.
+- CPU 시간: 자식 RLIMIT_CPU (초과 시 커널이 자식 종료)
+- 메모리: 자식 RLIMIT_AS (초과 시 MemoryError)
+- 벽시계: 부모가 결과를 timeout초만 기다리고, 넘으면 워커 프로세스 그룹을 kill
+- 출력: max_output자를 넘으면 실행 중단
+
+죽었거나 kill된 워커, max_jobs개 작업을 처리한 워커는 새 워커로 교체됩니다.
+교체할 워커를 띄우지 못하면 빈 자리로 기록해 두고 다음 작업 때 다시 띄워
+풀 크기를 회복합니다.
+"""
+import atexit
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# 작업마다 자식을 fork할 수 없으면 학생 코드가 워커 자신에서 실행되므로 작업마다 교체
+FORK_PER_JOB = hasattr(os, "fork")
+
+# 코드보다 서버 상태(부하, 메모리 여유)에 따라 달라질 수 있는 실패의 에러 접두어
+_UNSTABLE_ERRORS = ("TimeoutError:", "MemoryError:")
+
+
+def is_sandbox_failure(result: dict) -> bool:
+    """
+    실행/채점 결과에 샌드박스 쪽 실패가 있는지
+
+    프로세스 비정상 종료(크래시, SIGKILL), CPU/벽시계 시간 초과, 메모리 한도 초과는
+    같은 코드라도 다시 실행하면 결과가 달라질 수 있어 코드의 결과로 저장하면 안 됩니다.
+    """
+    if result.get("crashed") or result.get("timed_out") or result.get("unavailable"):
+        return True
+    errors = [result.get("error") or ""]
+    for test in result.get("tests", []):
+        if test.get("timed_out"):
+            return True
+        errors.append(test.get("error") or "")
+    return any(error.startswith(_UNSTABLE_ERRORS) for error in errors)
+
+
+def _can_drop_privileges(user: str) -> bool:
+    """작업마다 fork한 자식을 user로 setuid할 수 있는지 (root로 실행 중이고 사용자가 있어야 함)"""
+    if not FORK_PER_JOB or not user or os.geteuid() != 0:
+        return False
+    import pwd
+
+    try:
+        pwd.getpwnam(user)
+    except KeyError:
+        return False
+    return True
+
+
+def _worker_env() -> dict:
+    """워커 환경 변수: API 키 등 웹 앱의 환경 변수를 물려주지 않음"""
+    env = {"PATH": os.defpath, "LANG": "C.UTF-8", "PYTHONDONTWRITEBYTECODE": "1"}
+    if os.name == "nt":
+        # Windows 인터프리터 시작에 필요
+        env["SYSTEMROOT"] = os.environ.get("SYSTEMROOT", "")
+    return env
+
+
+class _Worker:
+    """워커 프로세스와 부모 쪽 파이프"""
+
+    def __init__(self, cpu_seconds: float, memory_mb: int, max_output: int, user: str):
+        self.conn, child_conn = multiprocessing.Pipe()
+        # multiprocessing.Process(spawn/forkserver)는 자식에서 부모의 __main__ 모듈
+        # (Streamlit/FastAPI 앱 전체)을 다시 import하므로, 워커 모듈만 import하는
+        # 새 인터프리터를 직접 띄우고 파이프 fd를 넘김
+        fd = child_conn.fileno()
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-c",
+                "from app.sandbox.worker import main; main()",
+                str(fd), str(cpu_seconds), str(memory_mb), str(max_output), user,
+            ],
+            cwd=PROJECT_ROOT,
+            env=_worker_env(),
+            stdin=subprocess.DEVNULL,
+            pass_fds=(fd,),
+            # 벽시계 제한 초과 시 실행 중인 자식까지 한 번에 kill
+            start_new_session=FORK_PER_JOB,
+        )
+        child_conn.close()
+        self.jobs = 0
+
+    @property
+    def exitcode(self) -> Optional[int]:
+        return self.process.poll()
+
+    def kill(self) -> None:
+        if self.process.poll() is None:
+            try:
+                if FORK_PER_JOB:
+                    os.killpg(self.process.pid, signal.SIGKILL)
+                else:
+                    self.process.kill()
+            except ProcessLookupError:
+                pass
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+        self.conn.close()
+
+    def stop(self) -> None:
+        """정상 종료 요청 후 응답이 없으면 kill"""
+        try:
+            self.conn.send(None)
+            self.process.wait(timeout=1)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            pass
+        self.kill()
+
+
+class SandboxPool:
+    """rlimit이 걸린 워커 프로세스를 재사용하는 코드 실행 풀"""
+
+    def __init__(
+        self,
+        size: int = 2,
+        cpu_seconds: float = 2,
+        memory_mb: int = 256,
+        timeout: float = 5.0,
+        max_output: int = 10000,
+        user: str = "nobody",
+        max_jobs: int = 1000,
+        allow_same_user: bool = False,
+    ):
+        """
+        Args:
+            size: 워커 프로세스 수 (동시에 실행할 수 있는 제출 수)
+            cpu_seconds: 실행당 CPU 시간 한도 (초)
+            memory_mb: 워커 주소 공간 한도 (MB)
+            timeout: 기본 벽시계 제한 (초)
+            max_output: 출력 최대 길이 (자)
+            user: 학생 코드를 실행할 사용자 (웹 앱이 root로 실행 중일 때만 적용)
+            max_jobs: 워커 하나가 처리할 최대 작업 수 (넘으면 새 워커로 교체)
+            allow_same_user: user로 권한을 낮출 수 없을 때 웹 앱과 같은 사용자로 실행할지
+                (False면 실행을 거부)
+        """
+        self.size = max(1, size)
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.timeout = timeout
+        self.max_output = max_output
+        self.user = user
+        self.max_jobs = max(1, max_jobs) if FORK_PER_JOB else 1
+
+        # 권한을 낮출 수 없고 같은 사용자 실행도 허용되지 않았으면 워커를 띄우지 않고 거부
+        self.refused = False
+        if not _can_drop_privileges(user):
+            if allow_same_user:
+                logger.warning(
+                    "샌드박스 자식을 사용자 %r로 낮출 수 없어 웹 앱과 같은 사용자로 실행합니다 "
+                    "(SANDBOX_ALLOW_SAME_USER=true)", user,
+                )
+            else:
+                logger.error(
+                    "샌드박스 자식을 사용자 %r로 낮출 수 없어 코드 실행을 거부합니다 "
+                    "(웹 앱을 root로 실행하거나 SANDBOX_ALLOW_SAME_USER=true로 명시적으로 허용)", user,
+                )
+                self.refused = True
+
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"executed": 0, "timeouts": 0, "crashes": 0, "restarts": 0, "recycled": 0}
+
+        # 띄우지 못한 워커 수 (다음 작업 때 다시 시도)
+        self._missing = 0 if self.refused else self.size
+        self._restore_workers()
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self.cpu_seconds, self.memory_mb, self.max_output, self.user)
+
+    def _replace(self) -> None:
+        """워커 한 자리를 새 워커로 채움 (실패하면 빈 자리로 기록)"""
+        with self._lock:
+            self._missing += 1
+        self._restore_workers()
+
+    def _restore_workers(self) -> None:
+        """빈 자리만큼 워커를 띄움 (실패한 자리는 다음 호출 때 다시)"""
+        with self._lock:
+            missing, self._missing = self._missing, 0
+        for _ in range(missing):
+            try:
+                self._idle.put(self._spawn())
+            except Exception:
+                logger.exception("샌드박스 워커 시작 실패 (다음 작업 때 다시 시도)")
+                with self._lock:
+                    self._missing += 1
+
+    def _checkout(self) -> Optional[_Worker]:
+        """유휴 워커를 꺼냄 (빈 자리는 먼저 채우고, 워커가 하나도 없으면 None)"""
+        self._restore_workers()
+        while True:
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                self._restore_workers()
+                with self._lock:
+                    if self._missing >= self.size:
+                        return None
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _failure(self, worker: _Worker) -> dict:
+        """결과 없이 끝난 워커의 종료 원인을 실행 결과로 변환"""
+        try:
+            worker.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+        exitcode = worker.exitcode
+        if exitcode == -getattr(signal, "SIGXCPU", 0):
+            error = f"TimeoutError: CPU 시간 한도({self.cpu_seconds}초)를 초과했습니다"
+        elif exitcode == -signal.SIGKILL:
+            error = f"MemoryError: 메모리 한도({self.memory_mb}MB)를 초과해 강제 종료되었습니다"
+        else:
+            error = f"RuntimeError: 실행 프로세스가 비정상 종료되었습니다 (exit code {exitcode})"
+        return {"success": False, "output": "", "error": error, "crashed": True}
+
+    def _submit(self, job: dict, wall: float) -> dict:
+        """유휴 워커에 작업을 보내고 wall초 안에 결과를 받음 (실패한 워커는 교체)"""
+        if self._closed:
+            raise RuntimeError("SandboxPool이 종료되었습니다")
+        if self.refused:
+            return {
+                "success": False,
+                "output": "",
+                "error": "RuntimeError: 샌드박스를 별도 사용자로 실행할 수 없어 코드 실행이 비활성화되었습니다",
+                "unavailable": True,
+                "duration_ms": 0.0,
+            }
+
+        worker = self._checkout()
+        if worker is None:
+            return {
+                "success": False,
+                "output": "",
+                "error": "RuntimeError: 샌드박스 워커를 시작할 수 없습니다",
+                "crashed": True,
+                "duration_ms": 0.0,
+            }
+        healthy = False
+        started = time.perf_counter()
+        try:
+            worker.conn.send(job)
+            worker.jobs += 1
+            if worker.conn.poll(wall):
+                result = worker.conn.recv()
+                healthy = True
+                if result.get("crashed"):
+                    self._count("crashes")
+            else:
+                worker.kill()
+                self._count("timeouts")
+                result = {
+                    "success": False,
+                    "output": "",
+                    "error": f"TimeoutError: 실행 시간 제한({wall}초)을 초과했습니다",
+                    "timed_out": True,
+                }
+        except (EOFError, OSError):
+            self._count("crashes")
+            result = self._failure(worker)
+        finally:
+            if self._closed:
+                worker.stop()
+            elif healthy and worker.jobs >= self.max_jobs:
+                worker.stop()
+                self._count("recycled")
+                self._replace()
+            elif healthy:
+                self._idle.put(worker)
+            else:
+                worker.kill()
+                self._count("restarts")
+                self._replace()
+
+        result.setdefault("duration_ms", (time.perf_counter() - started) * 1000)
+        self._count("executed")
+        return result
+
+    def execute(self, code: str, timeout: Optional[float] = None) -> dict:
+        """
+        워커 프로세스에서 코드를 실행하고 결과 반환
+
+        Args:
+            code: 실행할 코드
+            timeout: 벽시계 제한 (초, 없으면 풀 기본값)
+
+        Returns:
+            {"success", "output", "error", "duration_ms"} 딕셔너리
+            (벽시계 제한 초과 시 "timed_out": True 포함)
+        """
+        return self._submit({"kind": "run", "code": code}, timeout or self.timeout)
+
+    def judge(
+        self,
+        code: str,
+        function_name: str,
+        tests: list[dict],
+        default_time_limit_ms: int = 1000,
+        timeout: Optional[float] = None,
+    ) -> dict:
+        """
+        워커 프로세스에서 코드의 함수를 테스트 케이스로 채점
+
+        Args:
+            code: 학생 코드
+            function_name: 호출할 함수 이름
+            tests: {"input": 위치 인자 목록, "expected": 기대 반환값, "time_limit_ms"} 목록
+            default_time_limit_ms: 테스트별 기본 시간 제한 (ms)
+            timeout: 전체 벽시계 제한 (초, 없으면 풀 기본값과 테스트 제한 합 중 큰 값)
+
+        Returns:
+            execute 결과에 테스트별 결과 목록("tests")을 더한 딕셔너리
+        """
+        # 테스트마다 시간 제한까지 돌 수 있으므로 CPU/벽시계 한도는 제한 합계 이상으로
+        total_seconds = sum(
+            test.get("time_limit_ms") or default_time_limit_ms for test in tests
+        ) / 1000 + 1
+        if timeout is None:
+            timeout = max(self.timeout, total_seconds)
+        job = {
+            "kind": "judge",
+            "code": code,
+            "function_name": function_name,
+            "tests": tests,
+            "default_time_limit_ms": default_time_limit_ms,
+            "cpu_seconds": max(self.cpu_seconds, total_seconds),
+        }
+        result = self._submit(job, timeout)
+        result.setdefault("tests", [])
+        return result
+
+    def profile(
+        self,
+        code: str,
+        function_name: str,
+        template: list,
+        sizes: list[int],
+        run_limit_ms: int = 500,
+        budget_ms: int = 2000,
+    ) -> dict:
+        """
+        워커 프로세스에서 입력 크기를 늘려 가며 함수 성능 측정
+
+        Args:
+            code: 학생 코드
+            function_name: 측정할 함수 이름
+            template: 크기를 늘릴 기준 입력 (위치 인자 목록)
+            sizes: 측정할 입력 크기 목록 (작은 것부터)
+            run_limit_ms: 한 번의 호출 시간 제한 (ms)
+            budget_ms: 전체 측정 시간 예산 (ms)
+
+        Returns:
+            execute 결과에 크기별 측정값("samples")과 중단 사유("stopped")를 더한 딕셔너리
+        """
+        # 예산 직전에 시작한 크기가 반복/계측 호출까지 마칠 수 있도록 여유를 둠
+        limit_seconds = (budget_ms + run_limit_ms * 7) / 1000 + 1
+        job = {
+            "kind": "profile",
+            "code": code,
+            "function_name": function_name,
+            "template": template,
+            "sizes": sizes,
+            "run_limit_ms": run_limit_ms,
+            "budget_ms": budget_ms,
+            "cpu_seconds": max(self.cpu_seconds, limit_seconds),
+        }
+        result = self._submit(job, max(self.timeout, limit_seconds))
+        result.setdefault("samples", [])
+        result.setdefault("stopped", "")
+        return result
+
+    def stats(self) -> dict:
+        """실행/타임아웃/비정상 종료/워커 교체(장애, 작업 수 한도) 횟수와 빈 자리 수"""
+        with self._lock:
+            return {"size": self.size, "idle": self._idle.qsize(), "missing": self._missing, **self._stats}
+
+    def shutdown(self) -> None:
+        """유휴 워커 종료 (실행 중인 워커는 작업이 끝나는 대로 종료)"""
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+
+
+# 싱글톤 인스턴스
+_sandbox_pool = None
+_sandbox_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool() -> SandboxPool:
+    global _sandbox_pool
+    if _sandbox_pool is None:
+        with _sandbox_pool_lock:
+            if _sandbox_pool is None:
+                # 워커가 import하는 패키지에 설정 모듈을 끌어들이지 않도록 여기서 import
+                from app.config import get_settings
+
+                settings = get_settings()
+                _sandbox_pool = SandboxPool(
+                    size=settings.sandbox_pool_size,
+                    cpu_seconds=settings.sandbox_cpu_seconds,
+                    memory_mb=settings.sandbox_memory_mb,
+                    timeout=settings.sandbox_timeout,
+                    max_output=settings.sandbox_max_output,
+                    user=settings.sandbox_user,
+                    max_jobs=settings.sandbox_max_jobs,
+                    allow_same_user=settings.sandbox_allow_same_user,
+                )
+                atexit.register(_sandbox_pool.shutdown)
+    return _sandbox_pool
@@ -0,0 +1,642 @@
+"""샌드박스 워커 프로세스
+
+SandboxPool이 미리 띄워 두는 자식 프로세스의 본체입니다 (진입점: main). 워커 자신은
+학생 코드를 실행하지 않고, 작업마다 fork한 일회용 자식에서 실행합니다.
+
+- 자식은 권한을 낮추고(root로 실행 중이면 sandbox_user로 setuid), 메모리/CPU/프로세스 수/
+  파일 크기 rlimit을 건 뒤 코드를 실행하고 결과를 JSON으로 워커에 돌려준 뒤 종료합니다.
+  학생 코드가 모듈 상태(채점 함수 등)를 바꿔도 다음 작업은 깨끗한 워커에서 fork됩니다.
+- 워커는 자식의 JSON 결과만 받아(pickle은 받지 않음) 풀에 전달하고, 결과 없이 죽은
+  자식은 종료 신호를 에러로 바꿔 전달합니다.
+- 제한된 builtins는 보조 방어일 뿐이며 (객체 그래프로 우회 가능), 격리 경계는 별도
+  프로세스, 권한 축소, rlimit, 비밀 없는 환경 변수입니다.
+
+작업은 세 종류입니다.
+- run: 코드를 실행하고 출력 반환
+- judge: 코드를 실행해 함수를 정의한 뒤 테스트 케이스별로 호출해 기대값과 비교
+  (테스트별 시간 제한은 ITIMER_REAL 타이머로 중단)
+- profile: 테스트 케이스 입력을 점점 크게 늘려 가며 함수를 호출하고 크기별
+  실행 시간, 최대 메모리, 함수 호출 수를 측정
+"""
+import copy
+import io
+import json
+import math
+import os
+import random
+import signal
+import sys
+import time
+import traceback
+import tracemalloc
+from contextlib import redirect_stdout, redirect_stderr
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows: rlimit 없이 벽시계 제한만 적용
+    resource = None
+
+
+# 학생 코드에 허용하는 builtins
+SAFE_BUILTINS = {
+    "print": print,
+    "len": len,
+    "range": range,
+    "enumerate": enumerate,
+    "zip": zip,
+    "map": map,
+    "filter": filter,
+    "sorted": sorted,
+    "reversed": reversed,
+    "sum": sum,
+    "min": min,
+    "max": max,
+    "abs": abs,
+    "round": round,
+    "int": int,
+    "float": float,
+    "str": str,
+    "bool": bool,
+    "list": list,
+    "dict": dict,
+    "set": set,
+    "tuple": tuple,
+    "type": type,
+    "isinstance": isinstance,
+    "input": lambda x="": "",  # input은 빈 문자열 반환
+    "True": True,
+    "False": False,
+    "None": None,
+}
+
+
+class OutputLimitExceeded(Exception):
+    """출력 크기 한도 초과"""
+
+
+class CappedOutput(io.StringIO):
+    """max_chars를 넘게 쓰면 OutputLimitExceeded를 일으키는 출력 버퍼"""
+
+    def __init__(self, max_chars: int):
+        super().__init__()
+        self.max_chars = max_chars
+        self.size = 0
+
+    def write(self, s: str) -> int:
+        remaining = self.max_chars - self.size
+        if len(s) > remaining:
+            super().write(s[:max(0, remaining)])
+            self.size = self.max_chars
+            raise OutputLimitExceeded(f"출력이 {self.max_chars}자를 넘었습니다")
+        self.size += len(s)
+        return super().write(s)
+
+
+def _cpu_time_used() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _apply_process_limits() -> None:
+    """자식이 새 프로세스를 만들거나(fork/exec로 셸 실행) 파일을 쓰지 못하게 함"""
+    if resource is None:
+        return
+    for limit in ("RLIMIT_NPROC", "RLIMIT_FSIZE", "RLIMIT_CORE"):
+        if hasattr(resource, limit):
+            resource.setrlimit(getattr(resource, limit), (0, 0))
+
+
+def _drop_privileges(user: str) -> None:
+    """root로 실행 중이면 user의 uid/gid로 영구히 낮춤 (root가 아니면 바꿀 권한이 없음)"""
+    if not user or not hasattr(os, "geteuid") or os.geteuid() != 0:
+        return
+    import pwd
+
+    entry = pwd.getpwnam(user)
+    os.setgroups([])
+    os.setgid(entry.pw_gid)
+    os.setuid(entry.pw_uid)
+
+
+def _apply_memory_limit(memory_mb: int) -> None:
+    if resource is None or memory_mb <= 0:
+        return
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _apply_cpu_limit(cpu_seconds: float) -> None:
+    """
+    이번 작업의 CPU 한도 (지금까지 쓴 CPU + cpu_seconds)
+
+    soft limit에서 SIGXCPU, 1초 뒤 hard limit에서 SIGKILL. 학생 코드가 soft limit을
+    다시 올리지 못하도록 hard limit도 함께 낮춥니다 (작업마다 새 자식이므로 가능).
+    """
+    if resource is None or cpu_seconds <= 0:
+        return
+    soft = math.ceil(_cpu_time_used() + cpu_seconds)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 1))
+
+
+def run_code(code: str, max_output: int, keep_namespace: bool = False) -> dict:
+    """제한된 builtins로 코드를 실행하고 결과 반환 (keep_namespace면 실행 후 전역 이름공간 포함)"""
+    result = {
+        "success": False,
+        "output": "",
+        "error": "",
+    }
+    stdout_capture = CappedOutput(max_output)
+    stderr_capture = CappedOutput(max_output)
+    namespace = {"__builtins__": dict(SAFE_BUILTINS)}
+    started = time.perf_counter()
+
+    try:
+        with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
+            exec(code, namespace)
+        result["success"] = True
+    except OutputLimitExceeded as e:
+        result["error"] = f"OutputLimitExceeded: {e}"
+    except MemoryError:
+        result["error"] = "MemoryError: 메모리 한도를 초과했습니다"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {str(e)}\n{traceback.format_exc()}"
+
+    result["output"] = stdout_capture.getvalue()
+    result["duration_ms"] = (time.perf_counter() - started) * 1000
+    if keep_namespace:
+        result["namespace"] = namespace
+    return result
+
+
+class TestTimeout(BaseException):
+    """테스트 케이스 시간 제한 초과 (학생 코드의 except Exception에 잡히지 않도록 BaseException)"""
+
+
+def _on_alarm(signum, frame):
+    raise TestTimeout()
+
+
+def _start_timer(seconds: float) -> None:
+    if hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+
+
+def _stop_timer() -> None:
+    if hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _normalize(value):
+    """비교용 정규화: 튜플 -> 리스트, 딕셔너리 키 -> 문자열 (JSON 기대값과 맞춤)"""
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    return value
+
+
+def values_match(actual, expected) -> bool:
+    """반환값과 기대값 비교 (실수는 상대 오차 1e-6까지 허용)"""
+    if isinstance(actual, (list, tuple)) and isinstance(expected, (list, tuple)):
+        return len(actual) == len(expected) and all(
+            values_match(a, e) for a, e in zip(actual, expected)
+        )
+    if isinstance(actual, dict) and isinstance(expected, dict):
+        actual, expected = _normalize(actual), _normalize(expected)
+        return actual.keys() == expected.keys() and all(
+            values_match(actual[key], expected[key]) for key in expected
+        )
+    numbers = (int, float)
+    if (
+        isinstance(actual, numbers) and isinstance(expected, numbers)
+        and not isinstance(actual, bool) and not isinstance(expected, bool)
+        and (isinstance(actual, float) or isinstance(expected, float))
+    ):
+        return math.isclose(actual, expected, rel_tol=1e-6, abs_tol=1e-9)
+    return _normalize(actual) == _normalize(expected)
+
+
+_MAX_VALUE_JSON = 256 * 1024
+
+
+def _json_value(value):
+    """반환값을 비교용으로 정규화한 JSON 값 (직렬화할 수 없거나 너무 크면 None: 불일치 처리)"""
+    normalized = _normalize(value)
+    try:
+        if len(json.dumps(normalized)) > _MAX_VALUE_JSON:
+            return None
+    except (TypeError, ValueError, RecursionError):
+        return None
+    return {"value": normalized}
+
+
+def _preview(value, limit: int = 200) -> str:
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def judge_code(
+    code: str,
+    function_name: str,
+    tests: list[dict],
+    default_time_limit_ms: int,
+    max_output: int,
+) -> dict:
+    """
+    코드를 실행해 함수를 정의하고 테스트 케이스별로 호출해 채점
+
+    Args:
+        code: 학생 코드
+        function_name: 호출할 함수 이름
+        tests: {"input": 위치 인자 목록, "expected": 기대 반환값, "time_limit_ms"} 목록
+        default_time_limit_ms: 테스트에 시간 제한이 없을 때 쓸 값
+        max_output: 출력 최대 길이
+
+    Returns:
+        run_code 결과에 테스트별 결과 목록("tests")을 더한 딕셔너리.
+        코드 실행 자체가 실패하면 "tests"는 비어 있습니다.
+    """
+    result = run_code(code, max_output, keep_namespace=True)
+    namespace = result.pop("namespace", None)
+    result["tests"] = []
+    if not result["success"]:
+        return result
+
+    func = namespace.get(function_name)
+    if not callable(func):
+        result["success"] = False
+        result["error"] = f"NameError: 함수 '{function_name}'이(가) 정의되지 않았습니다"
+        return result
+
+    output = CappedOutput(max_output)
+    for test in tests:
+        limit_ms = test.get("time_limit_ms") or default_time_limit_ms
+        outcome = {"passed": False, "actual": "", "error": "", "timed_out": False}
+        started = time.perf_counter()
+        try:
+            _start_timer(limit_ms / 1000)
+            try:
+                with redirect_stdout(output), redirect_stderr(output):
+                    actual = func(*copy.deepcopy(test.get("input") or []))
+                if "expected" in test:
+                    outcome["passed"] = values_match(actual, test["expected"])
+                else:
+                    # 기대값은 학생 코드가 도는 프로세스에 보내지 않고 워커가 비교
+                    outcome["value"] = _json_value(actual)
+                outcome["actual"] = _preview(actual)
+            finally:
+                _stop_timer()
+        except TestTimeout:
+            outcome["timed_out"] = True
+            outcome["error"] = f"TimeoutError: 시간 제한({limit_ms}ms)을 초과했습니다"
+        except OutputLimitExceeded as e:
+            outcome["error"] = f"OutputLimitExceeded: {e}"
+        except MemoryError:
+            outcome["error"] = "MemoryError: 메모리 한도를 초과했습니다"
+        except Exception as e:
+            outcome["error"] = f"{type(e).__name__}: {e}"
+        outcome["duration_ms"] = (time.perf_counter() - started) * 1000
+        if not outcome["error"] and outcome["duration_ms"] > limit_ms:
+            # 타이머를 쓸 수 없는 플랫폼에서는 사후 판정
+            outcome["passed"] = False
+            outcome.pop("value", None)
+            outcome["timed_out"] = True
+            outcome["error"] = f"TimeoutError: 시간 제한({limit_ms}ms)을 초과했습니다"
+        result["tests"].append(outcome)
+
+    result["output"] += output.getvalue()
+    return result
+
+
+class _DiscardOutput(io.TextIOBase):
+    """프로파일링 중 출력은 버림 (print 비용은 측정에 포함)"""
+
+    def write(self, s: str) -> int:
+        return len(s)
+
+
+def _scale_sequence(seq, size: int):
+    """
+    리스트/문자열을 반복해 길이 size로 늘림
+
+    정수 리스트는 반복할 때마다 값 범위만큼 더해, 서로 다른 값이었던 원소가
+    반복 때문에 중복되지 않게 합니다 (중복 검사 등이 일찍 끝나지 않도록).
+    반복 패턴이 그대로 남으면 정렬 등이 비현실적으로 빨라지므로 순서를 섞되,
+    정렬된 리스트는 정렬 상태를 유지합니다 (이진 탐색 등).
+    """
+    copies = size // len(seq) + 1
+    if isinstance(seq, list) and all(isinstance(x, int) and not isinstance(x, bool) for x in seq):
+        span = max(seq) - min(seq) + 1
+        items = [x + k * span for k in range(copies) for x in seq][:size]
+    else:
+        items = list((seq * copies)[:size])
+
+    is_string = isinstance(seq, str)
+    try:
+        keep_sorted = not is_string and seq == sorted(seq)
+    except TypeError:
+        keep_sorted = False
+    if keep_sorted:
+        items.sort()
+    else:
+        random.Random(size).shuffle(items)
+    return "".join(items) if is_string else items
+
+
+def scale_args(args: list, size: int):
+    """
+    테스트 입력을 크기 size로 확장
+
+    리스트/문자열 인자가 있으면 그 인자들만 길이 size로 늘리고, 없으면 정수 인자를
+    size로 바꿉니다. 늘릴 인자가 없으면 None.
+    """
+    def is_sequence(value):
+        return isinstance(value, (list, str)) and len(value) > 0
+
+    def is_int(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    if any(is_sequence(arg) for arg in args):
+        return [_scale_sequence(arg, size) if is_sequence(arg) else arg for arg in args]
+    if any(is_int(arg) for arg in args):
+        return [size if is_int(arg) else arg for arg in args]
+    return None
+
+
+def _fresh_args(args: list) -> list:
+    """함수가 입력을 수정해도 다음 호출에 영향이 없도록 인자 복사 (평평한 리스트는 얕은 복사)"""
+    fresh = []
+    for arg in args:
+        if isinstance(arg, list) and not any(isinstance(item, (list, dict, set)) for item in arg):
+            fresh.append(arg[:])
+        else:
+            fresh.append(copy.deepcopy(arg))
+    return fresh
+
+
+def _instrumented_call(func, args: list) -> tuple[int, int]:
+    """학생 코드 함수 호출 수와 최대 메모리(바이트)를 측정하며 한 번 호출"""
+    calls = 0
+
+    def count_calls(frame, event, arg):
+        nonlocal calls
+        if event == "call" and frame.f_code.co_filename == "<string>":
+            calls += 1
+
+    tracemalloc.start()
+    sys.setprofile(count_calls)
+    try:
+        func(*args)
+    finally:
+        sys.setprofile(None)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return calls, peak
+
+
+def profile_code(
+    code: str,
+    function_name: str,
+    template: list,
+    sizes: list[int],
+    run_limit_ms: int,
+    budget_ms: int,
+    max_output: int,
+) -> dict:
+    """
+    입력 크기를 늘려 가며 함수의 실행 시간/메모리/호출 수 측정
+
+    크기마다 (1) 반복 호출해 가장 빠른 실행 시간, (2) tracemalloc과 호출 카운터를
+    켠 한 번의 호출로 최대 메모리와 호출 수를 잽니다. 한 번의 호출이 run_limit_ms를
+    넘거나 누적 측정 시간이 budget_ms를 넘으면 거기서 멈춥니다.
+
+    Returns:
+        run_code 결과에 크기별 측정값 목록("samples")과 중단 사유("stopped")를 더한 딕셔너리
+    """
+    result = run_code(code, max_output, keep_namespace=True)
+    namespace = result.pop("namespace", None)
+    result["samples"] = []
+    result["stopped"] = ""
+    if not result["success"]:
+        return result
+
+    func = namespace.get(function_name)
+    if not callable(func):
+        result["success"] = False
+        result["error"] = f"NameError: 함수 '{function_name}'이(가) 정의되지 않았습니다"
+        return result
+
+    output = _DiscardOutput()
+    deadline = time.perf_counter() + budget_ms / 1000
+    with redirect_stdout(output), redirect_stderr(output):
+        for size in sizes:
+            args = scale_args(template, size)
+            if args is None:
+                result["stopped"] = "크기를 늘릴 수 있는 인자가 없음"
+                break
+
+            sample = {"size": size, "time_ms": None, "peak_memory_kb": None, "calls": None}
+            try:
+                _start_timer(run_limit_ms / 1000)
+                try:
+                    best = math.inf
+                    repeats = 0
+                    loop_started = time.perf_counter()
+                    # 타이머 잡음을 줄이도록 최소 3회, 20ms(복사 포함) 또는 200회까지 반복해 최솟값 사용
+                    while repeats < 3 or (
+                        repeats < 200 and time.perf_counter() - loop_started < 0.02
+                    ):
+                        call_args = _fresh_args(args)
+                        started = time.perf_counter()
+                        func(*call_args)
+                        best = min(best, time.perf_counter() - started)
+                        repeats += 1
+                    sample["time_ms"] = best * 1000
+                finally:
+                    _stop_timer()
+            except TestTimeout:
+                result["stopped"] = f"n={size}에서 실행 시간 {run_limit_ms}ms 초과"
+                break
+            except MemoryError:
+                result["stopped"] = f"n={size}에서 메모리 한도 초과"
+                break
+            except Exception as e:
+                result["stopped"] = f"n={size}에서 에러: {type(e).__name__}: {e}"
+                break
+
+            try:
+                # 계측 오버헤드로 시간 제한을 넘으면 메모리/호출 수만 생략
+                _start_timer(run_limit_ms / 1000)
+                try:
+                    calls, peak = _instrumented_call(func, _fresh_args(args))
+                finally:
+                    _stop_timer()
+                sample["calls"] = calls
+                sample["peak_memory_kb"] = peak / 1024
+            except (TestTimeout, MemoryError, Exception):
+                pass
+
+            result["samples"].append(sample)
+            if time.perf_counter() > deadline:
+                result["stopped"] = f"측정 시간 예산 {budget_ms}ms 소진"
+                break
+    return result
+
+
+def _run_job(job: dict, max_output: int) -> dict:
+    if job["kind"] == "judge":
+        return judge_code(
+            job["code"],
+            job["function_name"],
+            job["tests"],
+            job["default_time_limit_ms"],
+            max_output,
+        )
+    if job["kind"] == "profile":
+        return profile_code(
+            job["code"],
+            job["function_name"],
+            job["template"],
+            job["sizes"],
+            job["run_limit_ms"],
+            job["budget_ms"],
+            max_output,
+        )
+    return run_code(job["code"], max_output)
+
+
+def _exit_failure(status: int, cpu_seconds: float, memory_mb: int) -> dict:
+    """결과 없이 끝난 자식의 종료 상태를 실행 결과로 변환"""
+    if os.WIFSIGNALED(status):
+        signum = os.WTERMSIG(status)
+        if signum == getattr(signal, "SIGXCPU", None):
+            error = f"TimeoutError: CPU 시간 한도({cpu_seconds:g}초)를 초과했습니다"
+        elif signum == signal.SIGKILL:
+            error = f"MemoryError: 메모리 한도({memory_mb}MB)를 초과해 강제 종료되었습니다"
+        else:
+            error = f"RuntimeError: 실행 프로세스가 신호 {signum}로 종료되었습니다"
+    else:
+        error = f"RuntimeError: 실행 프로세스가 결과 없이 종료되었습니다 (exit code {os.WEXITSTATUS(status)})"
+    return {"success": False, "output": "", "error": error, "crashed": True}
+
+
+def _read_result(fd: int, limit: int) -> Optional[dict]:
+    """자식이 쓴 JSON 결과 (자식이 종료해 파이프가 닫힐 때까지 읽고, limit바이트 넘게 쓰면 버림)"""
+    chunks = []
+    size = 0
+    while True:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size <= limit:
+            chunks.append(chunk)
+    if not chunks or size > limit:
+        return None
+    try:
+        result = json.loads(b"".join(chunks))
+    except ValueError:
+        return None
+    return result if isinstance(result, dict) else None
+
+
+def _grade_values(result: dict, expected: list) -> dict:
+    """자식이 돌려준 반환값을 기대값과 비교 (자식은 기대값을 모르므로 결과를 위조할 수 없음)"""
+    for outcome, value in zip(result.get("tests") or [], expected):
+        returned = outcome.pop("value", None)
+        outcome["passed"] = bool(
+            isinstance(returned, dict)
+            and "value" in returned
+            and not outcome.get("error")
+            and not outcome.get("timed_out")
+            and values_match(returned["value"], value)
+        )
+    return result
+
+
+def _run_in_child(conn, job: dict, cpu_seconds: float, memory_mb: int, max_output: int, user: str) -> dict:
+    """작업을 fork한 일회용 자식에서 실행하고 결과 반환 (워커 자신은 학생 코드를 실행하지 않음)"""
+    expected = None
+    if job["kind"] == "judge":
+        expected = [test.get("expected") for test in job["tests"]]
+        job = {**job, "tests": [
+            {key: item for key, item in test.items() if key != "expected"} for test in job["tests"]
+        ]}
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # 자식: 풀과의 파이프에 접근하지 못하게 닫고 제한을 건 뒤 실행
+        exit_code = 1
+        try:
+            os.close(read_fd)
+            conn.close()
+            os.chdir("/")
+            _drop_privileges(user)
+            _apply_memory_limit(memory_mb)
+            _apply_cpu_limit(cpu_seconds)
+            _apply_process_limits()
+            result = _run_job(job, max_output)
+            payload = json.dumps(result, ensure_ascii=False, default=repr).encode("utf-8")
+            while payload:
+                payload = payload[os.write(write_fd, payload):]
+            exit_code = 0
+        finally:
+            os._exit(exit_code)
+
+    os.close(write_fd)
+    try:
+        # 출력 max_output자 두 벌(stdout, 테스트 출력)과 테스트/측정 결과를 담을 만큼만 받음
+        result = _read_result(read_fd, max_output * 8 + 4 * 1024 * 1024)
+    finally:
+        os.close(read_fd)
+    _, status = os.waitpid(pid, 0)
+    if status != 0:
+        return _exit_failure(status, cpu_seconds, memory_mb)
+    if result is None:
+        return {
+            "success": False,
+            "output": "",
+            "error": "RuntimeError: 실행 프로세스가 올바른 결과를 돌려주지 않았습니다",
+            "crashed": True,
+        }
+    if expected is not None:
+        _grade_values(result, expected)
+    return result
+
+
+def worker_main(conn, cpu_seconds: float, memory_mb: int, max_output: int, user: str = "") -> None:
+    """
+    워커 프로세스 진입점: 파이프에서 작업을 받아 실행하고 결과를 돌려주는 루프
+
+    작업은 {"kind": "run" | "judge" | "profile", ...} 딕셔너리이며("cpu_seconds"가 있으면
+    이번 작업의 CPU 한도로 사용), None을 받거나 부모가 파이프를 닫으면 종료합니다.
+    fork를 지원하지 않는 플랫폼에서는 워커가 직접 실행하고, 풀이 작업마다 워커를 교체합니다.
+    """
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _on_alarm)
+    if not hasattr(os, "fork"):
+        _apply_memory_limit(memory_mb)
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        job_cpu_seconds = job.get("cpu_seconds") or cpu_seconds
+        if hasattr(os, "fork"):
+            result = _run_in_child(conn, job, job_cpu_seconds, memory_mb, max_output, user)
+        else:
+            _apply_cpu_limit(job_cpu_seconds)
+            result = _run_job(job, max_output)
+        conn.send(result)
+
+
+def main() -> None:
+    """명령행 진입점: <파이프 fd> <CPU 초> <메모리 MB> <최대 출력> [실행 사용자]"""
+    from multiprocessing.connection import Connection
+
+    fd, cpu_seconds, memory_mb, max_output = sys.argv[1:5]
+    user = sys.argv[5] if len(sys.argv) > 5 else ""
+    worker_main(Connection(int(fd)), float(cpu_seconds), int(memory_mb), int(max_output), user)
@@ -0,0 +1,118 @@
+"""청크 분할 전략 벤치마크 (recursive vs markdown)
+
+knowledge_base를 각 분할기로 나눈 뒤 임시 Chroma 컬렉션에 적재하여
+청크 수, 잘린 코드 블록 수, 인덱스 디스크 크기와 top-k hit rate를 비교합니다.
+
+hit rate는 라벨링된 쿼리 셋의 "answer"(정답 예제 코드 한 줄)가 top-k 청크 중
+하나에 온전히 들어 있는 쿼리 비율입니다. 예제가 청크 경계에서 잘리면 miss가
+되므로, 같은 hit rate를 더 작은 k로 얻을 수 있는지 확인할 수 있습니다.
+
+사용법:
+    python benchmark_chunking.py --k 2 4 6
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+# 프로젝트 루트를 path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from langchain_chroma import Chroma
+
+from app.rag.ingest import iter_loaded_documents, iter_source_files
+from app.rag.vectorstore import get_chunker, get_embeddings, get_text_splitter
+
+
+DEFAULT_QUERY_SET = project_root / "data" / "retrieval_eval_queries.json"
+
+SPLITTERS = {
+    "recursive": get_text_splitter,
+    "markdown": get_chunker,
+}
+
+
+def count_broken_fences(text: str) -> int:
+    """코드 펜스가 짝이 맞지 않으면 1 (청크 경계에서 코드 블록이 잘림)"""
+    fences = sum(1 for line in text.splitlines() if line.strip().startswith(("```", "~~~")))
+    return fences % 2
+
+
+def directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def evaluate(name: str, documents: list, queries: list[dict], embeddings, k_values: list[int]) -> dict:
+    """한 분할 전략의 청크 통계와 top-k hit rate"""
+    splits = SPLITTERS[name]().split_documents(documents)
+    lengths = [len(split.page_content) for split in splits]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = Chroma.from_documents(
+            splits,
+            embeddings,
+            collection_name=f"chunking_{name}",
+            persist_directory=tmp_dir,
+        )
+        max_k = max(k_values)
+        results = [store.similarity_search(item["query"], k=max_k) for item in queries]
+        index_bytes = directory_size(Path(tmp_dir))
+
+    hit_rates = {}
+    for k in k_values:
+        hits = [
+            any(item["answer"] in doc.page_content for doc in docs[:k])
+            for item, docs in zip(queries, results)
+        ]
+        hit_rates[k] = statistics.mean(hits)
+
+    return {
+        "name": name,
+        "chunks": len(splits),
+        "avg_chars": statistics.mean(lengths),
+        "max_chars": max(lengths),
+        "broken_fences": sum(count_broken_fences(split.page_content) for split in splits),
+        "stored_chars": sum(lengths),
+        "index_kb": index_bytes / 1024,
+        "hit_rates": hit_rates,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="청크 분할 전략 벤치마크")
+    parser.add_argument("--queries", default=str(DEFAULT_QUERY_SET), help="라벨링된 쿼리 셋 JSON")
+    parser.add_argument("--directory", default=str(project_root / "knowledge_base"))
+    parser.add_argument("--k", type=int, nargs="+", default=[2, 4, 6], help="평가할 k 값들")
+    args = parser.parse_args()
+
+    with open(args.queries, "r", encoding="utf-8") as f:
+        queries = [item for item in json.load(f) if item.get("answer")]
+
+    documents = []
+    for _, loaded in iter_loaded_documents(iter_source_files(args.directory)):
+        documents.extend(loaded)
+
+    embeddings = get_embeddings()
+    print(f"📊 문서 {len(documents)}개, 정답 예제가 있는 쿼리 {len(queries)}개")
+
+    header = (f"{'splitter':<10} {'chunks':>7} {'avg':>6} {'max':>6} {'broken':>7} "
+              f"{'chars':>7} {'index(KB)':>10}")
+    header += "".join(f" {f'hit@{k}':>7}" for k in args.k)
+    print(header)
+
+    for name in SPLITTERS:
+        result = evaluate(name, documents, queries, embeddings, args.k)
+        row = (
+            f"{result['name']:<10} {result['chunks']:>7} {result['avg_chars']:>6.0f} "
+            f"{result['max_chars']:>6} {result['broken_fences']:>7} "
+            f"{result['stored_chars']:>7} {result['index_kb']:>10.1f}"
+        )
+        row += "".join(f" {result['hit_rates'][k]:>7.3f}" for k in args.k)
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""임베딩 백엔드 벤치마크 (torch vs onnx)
+
+각 백엔드를 별도 프로세스에서 실행하여 모델 로드 시간, 쿼리 임베딩 지연 시간,
+최대 RSS를 측정하고, knowledge_base 청크에 대한 top-k 검색 결과가 기준
+백엔드(첫 번째)와 얼마나 일치하는지 비교합니다.
+
+사용법:
+    python benchmark_embeddings.py --backends torch onnx --k 4
+"""
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 프로젝트 루트를 path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.rag.ingest import iter_loaded_documents, iter_source_files
+from app.rag.vectorstore import get_chunker, get_embeddings
+
+
+DEFAULT_QUERY_SET = project_root / "data" / "retrieval_eval_queries.json"
+
+
+def load_benchmark_inputs(query_set: Path) -> tuple[list[str], list[str]]:
+    """(청크 텍스트, 쿼리) 로드"""
+    documents = []
+    for _, loaded in iter_loaded_documents(iter_source_files(project_root / "knowledge_base")):
+        documents.extend(loaded)
+    chunks = [split.page_content for split in get_chunker().split_documents(documents)]
+
+    with open(query_set, "r", encoding="utf-8") as f:
+        queries = [item["query"] for item in json.load(f)]
+    return chunks, queries
+
+
+def run_worker(backend: str, query_set: Path, output: Path) -> None:
+    """한 백엔드 측정 (자식 프로세스에서 실행)"""
+    chunks, queries = load_benchmark_inputs(query_set)
+
+    started = time.perf_counter()
+    embeddings = get_embeddings(backend=backend)
+    embeddings.embed_query("warm-up")
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    doc_vectors = np.array(embeddings.embed_documents(chunks), dtype=np.float32)
+    docs_per_second = len(chunks) / (time.perf_counter() - started)
+
+    latencies = []
+    query_vectors = []
+    for query in queries:
+        started = time.perf_counter()
+        query_vectors.append(embeddings.embed_query(query))
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    # Linux에서 ru_maxrss 단위는 KB
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    np.savez(
+        output,
+        doc_vectors=doc_vectors,
+        query_vectors=np.array(query_vectors, dtype=np.float32),
+        stats=json.dumps({
+            "backend": backend,
+            "load_seconds": load_seconds,
+            "docs_per_second": docs_per_second,
+            "query_p50_ms": statistics.median(latencies),
+            "query_p95_ms": sorted(latencies)[int(len(latencies) * 0.95) - 1],
+            "max_rss_mb": max_rss_mb,
+        }),
+    )
+
+
+def top_k(doc_vectors: np.ndarray, query_vectors: np.ndarray, k: int) -> list[set]:
+    """L2 거리 기준 쿼리별 top-k 청크 인덱스 (Chroma 기본 거리와 동일)"""
+    distances = (
+        (query_vectors ** 2).sum(axis=1)[:, None]
+        + (doc_vectors ** 2).sum(axis=1)[None, :]
+        - 2 * query_vectors @ doc_vectors.T
+    )
+    return [set(np.argsort(row)[:k]) for row in distances]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 백엔드 벤치마크")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx"])
+    parser.add_argument("--queries", default=str(DEFAULT_QUERY_SET))
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, Path(args.queries), Path(args.output))
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for backend in args.backends:
+            output = Path(tmp_dir) / f"{backend}.npz"
+            subprocess.run(
+                [sys.executable, __file__, "--worker", backend,
+                 "--queries", args.queries, "--output", str(output)],
+                check=True,
+            )
+            data = np.load(output)
+            results.append({
+                "stats": json.loads(str(data["stats"])),
+                "doc_vectors": data["doc_vectors"],
+                "query_vectors": data["query_vectors"],
+            })
+
+    baseline = results[0]
+    baseline_top = top_k(baseline["doc_vectors"], baseline["query_vectors"], args.k)
+
+    print(f"{'backend':<8} {'load(s)':>8} {'docs/s':>8} {'p50(ms)':>8} "
+          f"{'p95(ms)':>8} {'RSS(MB)':>8} {'top-k 일치':>10}")
+    for result in results:
+        stats = result["stats"]
+        result_top = top_k(result["doc_vectors"], result["query_vectors"], args.k)
+        agreement = statistics.mean(
+            len(a & b) / args.k for a, b in zip(baseline_top, result_top)
+        )
+        print(
+            f"{stats['backend']:<8} {stats['load_seconds']:>8.2f} "
+            f"{stats['docs_per_second']:>8.1f} {stats['query_p50_ms']:>8.2f} "
+            f"{stats['query_p95_ms']:>8.2f} {stats['max_rss_mb']:>8.0f} {agreement:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""코드 실행 샌드박스 벤치마크
+
+1. 처리량: 같은 제출 코드를 (a) 기존 방식인 웹 프로세스 내 exec, (b) 제출마다
+   새 인터프리터를 띄우는 방식, (c) SandboxPool(미리 띄운 워커가 제출마다 fork)로 실행해
+   초당 제출 수를 비교합니다.
+2. 격리: 무한 루프, 거대한 메모리 할당, 출력 폭주, sleep 제출을 정상 제출과 동시에
+   보내고, 정상 제출이 모두 성공하며 지연이 제한 시간 안에 머무는지, 폭주 제출이
+   모두 한도 에러로 끝나고 풀이 복구되는지 확인합니다. 실패하면 종료 코드 1.
+
+사용법:
+    python benchmark_sandbox.py
+    python benchmark_sandbox.py --submissions 500 --workers 4
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 프로젝트 루트를 path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.sandbox import SandboxPool
+from app.sandbox.worker import run_code
+
+
+NORMAL_CODE = """
+def fibonacci(n):
+    a, b = 0, 1
+    result = []
+    for _ in range(n):
+        result.append(a)
+        a, b = b, a + b
+    return result
+
+print(fibonacci(20))
+print(sorted([5, 3, 1, 4, 2]))
+"""
+
+RUNAWAY_CODES = {
+    "무한 루프": "while True:\n    pass",
+    "거대한 할당": "data = [0] * (10 ** 10)",
+    "점진적 할당": "data = []\nwhile True:\n    data.append('x' * 10 ** 6)",
+    "출력 폭주": "while True:\n    print('spam' * 100)",
+    "재귀 폭주": "def f(n):\n    return f(n + 1)\nf(0)",
+}
+
+
+def measure_throughput(label: str, execute, submissions: int, concurrency: int = 1) -> float:
+    started = time.perf_counter()
+    if concurrency == 1:
+        for _ in range(submissions):
+            execute(NORMAL_CODE)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lambda _: execute(NORMAL_CODE), range(submissions)))
+    elapsed = time.perf_counter() - started
+    rate = submissions / elapsed
+    print(f"   {label:<34} {rate:>9.1f} 제출/초  ({elapsed * 1000 / submissions:.2f} ms/제출)")
+    return rate
+
+
+def spawn_per_submission(code: str) -> dict:
+    """제출마다 새 인터프리터를 띄우는 방식 (비교용)"""
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        timeout=10,
+    )
+    return {"success": completed.returncode == 0, "output": completed.stdout}
+
+
+def run_isolation(pool: SandboxPool, timeout: float, normal_count: int) -> bool:
+    """폭주 제출과 정상 제출을 동시에 실행하고 결과 검증"""
+    runaway_results = {}
+    normal_latencies = []
+    normal_failures = []
+
+    def submit_runaway(name: str, code: str):
+        runaway_results[name] = pool.execute(code, timeout=timeout)
+
+    def submit_normal():
+        started = time.perf_counter()
+        result = pool.execute(NORMAL_CODE, timeout=timeout)
+        normal_latencies.append((time.perf_counter() - started) * 1000)
+        if not result["success"]:
+            normal_failures.append(result["error"])
+
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=submit_runaway, args=(name, code))
+        for name, code in RUNAWAY_CODES.items()
+    ]
+    for thread in threads:
+        thread.start()
+
+    # 폭주 제출이 워커를 차지한 동안 정상 제출을 흘려보냄
+    time.sleep(0.2)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(lambda _: submit_normal(), range(normal_count)))
+
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    ok = True
+    print(f"   폭주 제출 {len(RUNAWAY_CODES)}개 (벽시계 제한 {timeout}초)")
+    for name in RUNAWAY_CODES:
+        result = runaway_results.get(name, {})
+        contained = not result.get("success", True)
+        ok &= contained
+        error = (result.get("error") or "").splitlines()[0] if result.get("error") else "성공 (격리 실패)"
+        print(f"   {'✅' if contained else '❌'} {name:<10} {result.get('duration_ms', 0):>8.0f} ms  {error[:70]}")
+
+    latencies = sorted(normal_latencies)
+    p50 = statistics.median(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    bounded = latencies[-1] < timeout * 1000
+    ok &= not normal_failures and bounded
+    print(f"   {'✅' if not normal_failures else '❌'} 정상 제출 {len(latencies)}개 중 실패 {len(normal_failures)}개")
+    print(f"   {'✅' if bounded else '❌'} 정상 제출 지연 p50 {p50:.1f} ms / p95 {p95:.1f} ms / 최대 {latencies[-1]:.1f} ms")
+    print(f"   전체 소요 {elapsed:.1f}초")
+
+    recovered = pool.execute(NORMAL_CODE)["success"]
+    ok &= recovered
+    print(f"   {'✅' if recovered else '❌'} 폭주 이후 풀 정상 동작: {pool.stats()}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="코드 실행 샌드박스 벤치마크")
+    parser.add_argument("--submissions", type=int, default=300, help="처리량 측정 제출 수")
+    parser.add_argument("--workers", type=int, default=4, help="워커 프로세스 수")
+    parser.add_argument("--timeout", type=float, default=3.0, help="격리 테스트 벽시계 제한 (초)")
+    parser.add_argument("--normal", type=int, default=200, help="격리 테스트 중 정상 제출 수")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    # 벤치마크 코드는 신뢰할 수 있으므로 root가 아니어도 같은 사용자로 실행 허용
+    pool = SandboxPool(
+        size=args.workers, cpu_seconds=2, memory_mb=256, timeout=args.timeout, allow_same_user=True,
+    )
+    print(f"🚀 워커 {args.workers}개 준비: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    print("\n📊 처리량")
+    measure_throughput("웹 프로세스 내 exec (기존, 격리 없음)", lambda code: run_code(code, 10000), args.submissions)
+    measure_throughput("제출마다 새 인터프리터", spawn_per_submission, max(10, args.submissions // 10))
+    measure_throughput("SandboxPool (순차)", pool.execute, args.submissions)
+    measure_throughput(f"SandboxPool (동시 {args.workers})", pool.execute, args.submissions, args.workers)
+
+    print("\n🧪 폭주 코드 격리")
+    ok = run_isolation(pool, args.timeout, args.normal)
+    pool.shutdown()
+
+    print()
+    print("✅ 모든 격리 검증 통과" if ok else "❌ 격리 검증 실패")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
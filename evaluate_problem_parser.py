@@ -0,0 +1,94 @@
+"""문제 응답 파서 복구율 평가
+
+data/malformed_problem_responses.json의 응답 코퍼스(앞뒤 설명, 코드 블록,
+잘린 출력, 끝 쉼표, 잘못된 이스케이프 등)를 기존 파서(첫 '{'부터 마지막
+'}'까지 json.loads)와 새 파서로 각각 파싱해 복구한 문제 수를 비교합니다.
+새 파서는 응답을 무작위 크기 조각으로 나눠 스트리밍으로도 파싱해, 한 번에
+파싱한 결과와 같은지 확인합니다.
+
+사용법:
+    python evaluate_problem_parser.py
+    python evaluate_problem_parser.py --corpus my_responses.json --verbose
+"""
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.agents.json_parser import ProblemStreamParser, parse_problem_objects
+
+
+DEFAULT_CORPUS = project_root / "data" / "malformed_problem_responses.json"
+
+
+def legacy_parse(response: str) -> list[dict]:
+    """기존 ProblemAgent._parse_response 방식"""
+    start, end = response.find("{"), response.rfind("}") + 1
+    if start == -1 or end == 0:
+        return []
+    try:
+        return json.loads(response[start:end]).get("problems", [])
+    except (json.JSONDecodeError, AttributeError):
+        return []
+
+
+def stream_parse(response: str, rng: random.Random) -> list[dict]:
+    """1~24자 무작위 조각으로 나눠 스트리밍 파싱"""
+    parser = ProblemStreamParser()
+    i = 0
+    while i < len(response):
+        size = rng.randint(1, 24)
+        parser.feed(response[i:i + size])
+        i += size
+    parser.close()
+    return parser.objects
+
+
+def main():
+    parser = argparse.ArgumentParser(description="문제 응답 파서 복구율 평가")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS), help="응답 코퍼스 JSON")
+    parser.add_argument("--seed", type=int, default=0, help="스트리밍 조각 크기 시드")
+    parser.add_argument("--verbose", action="store_true", help="복구한 문제 질문 출력")
+    args = parser.parse_args()
+
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        cases = json.load(f)
+
+    rng = random.Random(args.seed)
+    totals = {"expected": 0, "legacy": 0, "lenient": 0}
+    stream_mismatches = 0
+
+    print(f"{'case':<28} {'expected':>8} {'legacy':>7} {'lenient':>8} {'stream':>7}")
+    for case in cases:
+        expected = case["expected"]
+        legacy = len(legacy_parse(case["response"]))
+        objects = parse_problem_objects(case["response"])
+        streamed = stream_parse(case["response"], rng)
+        if [o.get("question") for o in streamed] != [o.get("question") for o in objects]:
+            stream_mismatches += 1
+
+        totals["expected"] += expected
+        totals["legacy"] += min(legacy, expected)
+        totals["lenient"] += min(len(objects), expected)
+
+        marker = "" if len(objects) >= expected else "  ✗"
+        print(f"{case['name']:<28} {expected:>8} {legacy:>7} {len(objects):>8} {len(streamed):>7}{marker}")
+        if args.verbose:
+            for obj in objects:
+                print(f"    - {str(obj.get('question'))[:60]!r}")
+
+    expected = totals["expected"] or 1
+    print()
+    print(f"📊 복구율 (복구한 문제 / 복구 가능한 문제 {totals['expected']}개)")
+    print(f"   기존 파서: {totals['legacy'] / expected:.1%}")
+    print(f"   새 파서:   {totals['lenient'] / expected:.1%}")
+    print(f"   스트리밍 결과 불일치: {stream_mismatches}건")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""검색 모드별 recall@k 평가 스크립트
+
+라벨링된 쿼리 셋(data/retrieval_eval_queries.json)으로 순수 벡터 검색과
+하이브리드(BM25 + 벡터) 검색, 하이브리드 + MMR 다양화의 recall@k, 지연 시간,
+컨텍스트 토큰 수를 비교합니다.
+
+사용법:
+    python evaluate_retrieval.py --k 4
+    python evaluate_retrieval.py --k 3 --rerank
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.models.schemas import TopicCategory
+from app.rag.context import build_context
+from app.rag.retriever import get_retriever
+
+
+DEFAULT_QUERY_SET = project_root / "data" / "retrieval_eval_queries.json"
+
+
+def load_query_set(path: Path) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_relevant(source: str, relevant_sources: list[str]) -> bool:
+    """문서 출처가 정답 출처 중 하나인지 확인 (상대 경로 접미사 비교)"""
+    source = Path(source).as_posix()
+    return any(source.endswith(relevant) for relevant in relevant_sources)
+
+
+def evaluate(
+    retriever,
+    queries: list[dict],
+    mode: str,
+    k: int,
+    diversify: bool = False,
+    rerank: bool = False,
+) -> dict:
+    """한 검색 설정의 recall@k, 지연 시간, 컨텍스트 토큰 수 측정"""
+    recalls = []
+    latencies = []
+    tokens = []
+    for item in queries:
+        topic = TopicCategory(item["topic"]) if item.get("topic") else None
+
+        started = time.perf_counter()
+        documents = retriever.retrieve(
+            item["query"], topic=topic, k=k, mode=mode, diversify=diversify, rerank=rerank
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        tokens.append(build_context(documents)[1].context_tokens)
+
+        sources = {str(doc.metadata.get("source", "")) for doc in documents}
+        relevant = item["relevant_sources"]
+        found = sum(
+            1 for target in relevant
+            if any(is_relevant(source, [target]) for source in sources)
+        )
+        recalls.append(found / len(relevant))
+
+    label = mode + ("+mmr" if diversify else "") + ("+rerank" if rerank else "")
+    return {
+        "mode": label,
+        "recall": statistics.mean(recalls),
+        "tokens": statistics.mean(tokens),
+        "p50_ms": statistics.median(latencies),
+        "max_ms": max(latencies),
+    }
+
+
+def evaluate_lexical_latency(retriever, queries: list[dict], k: int) -> float:
+    """BM25 단계만의 평균 지연 시간 (ms)"""
+    index = retriever.vectorstore_manager.get_lexical_index()
+    if index is None:
+        return float("nan")
+
+    started = time.perf_counter()
+    for item in queries:
+        index.search(item["query"], k=k)
+    return (time.perf_counter() - started) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 모드별 recall@k 평가")
+    parser.add_argument("--queries", default=str(DEFAULT_QUERY_SET), help="라벨링된 쿼리 셋 JSON")
+    parser.add_argument("--k", type=int, default=4, help="검색 문서 수")
+    parser.add_argument("--rerank", action="store_true", help="cross-encoder 재순위화 포함 (RERANK_MODEL 필요)")
+    args = parser.parse_args()
+
+    configs = [("vector", False, False), ("hybrid", False, False), ("hybrid", True, False)]
+    if args.rerank:
+        configs.append(("hybrid", True, True))
+
+    queries = load_query_set(Path(args.queries))
+    retriever = get_retriever()
+
+    print(f"📊 쿼리 {len(queries)}개, k={args.k}")
+    print(f"{'mode':<18} {'recall@k':>9} {'tokens':>7} {'p50(ms)':>9} {'max(ms)':>9}")
+    for mode, diversify, rerank in configs:
+        # 캐시 영향 제거를 위해 모드마다 결과 캐시 초기화
+        retriever.vectorstore_manager.query_cache.invalidate()
+        result = evaluate(retriever, queries, mode, args.k, diversify=diversify, rerank=rerank)
+        print(
+            f"{result['mode']:<18} {result['recall']:>9.3f} {result['tokens']:>7.0f} "
+            f"{result['p50_ms']:>9.2f} {result['max_ms']:>9.2f}"
+        )
+
+    lexical_ms = evaluate_lexical_latency(retriever, queries, args.k)
+    print(f"BM25 단계 평균: {lexical_ms:.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
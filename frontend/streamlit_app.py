@@ -7,8 +7,13 @@ from streamlit_ace import st_ace
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from app.agents import get_teacher_agent, get_problem_agent, get_review_agent
+from app.agents import get_teacher_agent, get_problem_agent, get_review_agent, get_problem_bank
+from app.agents.profiler import format_profile
+from app.agents.static_analysis import format_static_hints
+from app.config import get_settings
 from app.database import get_db_manager
+from app.rag import start_background_warmup, is_ready, wait_until_ready, get_warmup_status
+from app.sandbox import get_sandbox_pool
 from app.models.schemas import (
     TopicCategory,
     DifficultyLevel,
@@ -268,6 +273,32 @@ if css_path.exists():
 
 
 
+@st.cache_resource
+def start_warmup():
+    """프로세스당 한 번 임베딩 모델/벡터 스토어 warm-up 시작"""
+    return start_background_warmup()
+
+
+@st.cache_resource
+def start_problem_bank():
+    """프로세스당 한 번 문제 은행 백그라운드 보충 시작 (실제 보충은 DB 임대를 가진 프로세스 하나만)"""
+    settings = get_settings()
+    if settings.problem_bank_enabled and settings.problem_bank_refiller:
+        return get_problem_bank().start_refiller()
+    return None
+
+
+@st.cache_resource
+def start_sandbox_pool():
+    """프로세스당 한 번 코드 실행 워커 풀 생성"""
+    return get_sandbox_pool()
+
+
+start_warmup()
+start_problem_bank()
+start_sandbox_pool()
+
+
 def init_session_state():
     """세션 상태 초기화"""
     if "chat_history" not in st.session_state:
@@ -366,6 +397,35 @@ def get_problem_type_display_name(problem_type) -> str:
     return mapping.get(pt_str, pt_str)
 
 
+def render_test_results(test_results: list[dict]):
+    """테스트 케이스 채점 결과 표시"""
+    if not test_results:
+        return
+    passed = sum(1 for t in test_results if t["passed"])
+    st.markdown(f"### 🧪 테스트 케이스 ({passed}/{len(test_results)} 통과)")
+    for i, t in enumerate(test_results, 1):
+        mark = "✅" if t["passed"] else "❌"
+        detail = "" if t["passed"] else f" → {t['error'] or '반환값 ' + t['actual']}"
+        st.markdown(f"{mark} **#{i}** 입력 `{t['input']!r}` / 기대값 `{t['expected']!r}`"
+                    f" ({t['duration_ms']:.1f}ms){detail}")
+
+
+def render_performance(performance):
+    """입력 크기별 성능 측정 결과 표시"""
+    if not performance:
+        return
+    st.markdown("### ⏱️ 성능 측정")
+    st.markdown(format_profile(performance))
+
+
+def render_static_analysis(analysis):
+    """정적 분석 발견 사항 표시 (문법 오류는 피드백에 이미 표시)"""
+    if not analysis or analysis.syntax_error or not analysis.findings:
+        return
+    st.markdown("### 🔍 정적 분석")
+    st.markdown(format_static_hints(analysis))
+
+
 def login_section():
     """로그인 섹션"""
     st.markdown("### 👤 사용자 설정")
@@ -491,42 +551,40 @@ def learning_mode(topic: TopicCategory, difficulty: DifficultyLevel):
         with st.chat_message("user"):
             st.markdown(user_input)
 
-        # AI 응답 생성
+        # AI 응답 생성 (토큰이 생성되는 대로 표시)
         with st.chat_message("assistant"):
-            with st.spinner("생각하는 중..."):
-                try:
-                    teacher = get_teacher_agent()
-                    response = teacher.teach_sync(
-                        question=user_input,
-                        topic=topic,
-                        difficulty=difficulty,
-                        chat_history=st.session_state.chat_history[:-1],
+            try:
+                teacher = get_teacher_agent()
+                response = st.write_stream(teacher.stream_teach(
+                    question=user_input,
+                    topic=topic,
+                    difficulty=difficulty,
+                    chat_history=st.session_state.chat_history[:-1],
+                ))
+
+                # 응답 저장 (스트림이 끝난 뒤)
+                st.session_state.chat_history.append({
+                    "role": "assistant",
+                    "content": response,
+                })
+
+                # DB에 채팅 기록 저장
+                if st.session_state.user_id:
+                    db = get_db_manager()
+                    db.save_chat_message(
+                        user_id=st.session_state.user_id,
+                        role="user",
+                        content=user_input,
+                        topic=topic.value
                     )
-                    st.markdown(response)
-
-                    # 응답 저장
-                    st.session_state.chat_history.append({
-                        "role": "assistant",
-                        "content": response,
-                    })
-
-                    # DB에 채팅 기록 저장
-                    if st.session_state.user_id:
-                        db = get_db_manager()
-                        db.save_chat_message(
-                            user_id=st.session_state.user_id,
-                            role="user",
-                            content=user_input,
-                            topic=topic.value
-                        )
-                        db.save_chat_message(
-                            user_id=st.session_state.user_id,
-                            role="assistant",
-                            content=response,
-                            topic=topic.value
-                        )
-                except Exception as e:
-                    st.error(f"오류가 발생했습니다: {str(e)}")
+                    db.save_chat_message(
+                        user_id=st.session_state.user_id,
+                        role="assistant",
+                        content=response,
+                        topic=topic.value
+                    )
+            except Exception as e:
+                st.error(f"오류가 발생했습니다: {str(e)}")
 
 
 def problem_mode(topic: TopicCategory, difficulty: DifficultyLevel):
@@ -550,13 +608,23 @@ def problem_mode(topic: TopicCategory, difficulty: DifficultyLevel):
         if st.button("🎲 새 문제 생성", use_container_width=True):
             with st.spinner("문제 생성 중..."):
                 try:
-                    problem_agent = get_problem_agent()
-                    problems = problem_agent.generate_problems_sync(
-                        topic=topic,
-                        difficulty=difficulty,
-                        problem_type=selected_problem_type,
-                        count=1,
-                    )
+                    problems = []
+                    if get_settings().problem_bank_enabled:
+                        # 미리 생성해 둔 문제가 있으면 LLM 호출 없이 바로 출제
+                        problem = get_problem_bank().serve(
+                            topic, difficulty, selected_problem_type,
+                            user_id=st.session_state.user_id,
+                        )
+                        if problem is not None:
+                            problems = [problem]
+                    if not problems:
+                        problem_agent = get_problem_agent()
+                        problems = problem_agent.generate_problems_sync(
+                            topic=topic,
+                            difficulty=difficulty,
+                            problem_type=selected_problem_type,
+                            count=1,
+                        )
                     if problems:
                         st.session_state.current_problem = problems[0]
                         st.session_state.hint_index = 0
@@ -664,6 +732,9 @@ def problem_mode(topic: TopicCategory, difficulty: DifficultyLevel):
         # 코딩/알고리즘 문제인 경우
         elif problem.problem_type in [ProblemType.CODING, ProblemType.ALGORITHM, ProblemType.DEBUGGING]:
             st.markdown("### 💻 코드 작성")
+            if problem.function_name and problem.test_cases:
+                st.caption(f"`{problem.function_name}` 함수를 작성하세요. "
+                           f"제출하면 테스트 케이스 {len(problem.test_cases)}개로 먼저 채점합니다.")
 
             # Ace 에디터 사용 (key 지원으로 입력 유지)
             default_code = "# 여기에 코드를 작성하세요\n\n"
@@ -689,6 +760,9 @@ def problem_mode(topic: TopicCategory, difficulty: DifficultyLevel):
 
                 st.markdown("### 📝 피드백")
                 st.markdown(saved_result.get("feedback", ""))
+                render_test_results(saved_result.get("test_results") or [])
+                render_performance(saved_result.get("performance"))
+                render_static_analysis(saved_result.get("static_analysis"))
 
                 if saved_result.get("suggestions"):
                     st.markdown("### 💡 개선 제안")
@@ -704,6 +778,11 @@ def problem_mode(topic: TopicCategory, difficulty: DifficultyLevel):
                     st.code(problem.answer, language="python")
                     st.markdown(f"**해설:** {problem.explanation}")
             else:
+                profile = st.checkbox(
+                    "통과하면 입력 크기별 성능 측정 (1초 정도 더 걸림)",
+                    value=get_settings().review_profiling,
+                    key="review_profile",
+                )
                 col1, col2 = st.columns(2)
                 with col1:
                     if st.button("제출하기", use_container_width=True):
@@ -714,6 +793,7 @@ def problem_mode(topic: TopicCategory, difficulty: DifficultyLevel):
                                     result = review_agent.review_submission_sync(
                                         code=user_code,
                                         problem=problem,
+                                        profile=profile,
                                     )
 
                                     # 결과를 세션에 저장
@@ -725,6 +805,9 @@ def problem_mode(topic: TopicCategory, difficulty: DifficultyLevel):
                                         "improved_code": result.improved_code,
                                         "user_code": user_code,
                                         "shown_answer": False,
+                                        "test_results": [t.model_dump() for t in result.test_results],
+                                        "performance": result.performance,
+                                        "static_analysis": result.static_analysis,
                                     }
                                     st.session_state.problem_submitted = True
 
@@ -735,6 +818,9 @@ def problem_mode(topic: TopicCategory, difficulty: DifficultyLevel):
 
                                     st.markdown("### 📝 피드백")
                                     st.markdown(result.feedback)
+                                    render_test_results([t.model_dump() for t in result.test_results])
+                                    render_performance(result.performance)
+                                    render_static_analysis(result.static_analysis)
 
                                     if result.suggestions:
                                         st.markdown("### 💡 개선 제안")
@@ -1073,6 +1159,14 @@ def main():
             login_section()
         return
 
+    # warm-up 완료 전에는 RAG를 쓰는 화면을 열지 않음
+    if not is_ready():
+        with st.spinner("학습 자료를 준비하는 중입니다..."):
+            wait_until_ready()
+        if not is_ready():
+            st.error(f"학습 자료 준비에 실패했습니다: {get_warmup_status()['error']}")
+            return
+
     # 사이드바
     topic, difficulty = sidebar()
 
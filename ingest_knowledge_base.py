@@ -0,0 +1,94 @@
+"""지식 베이스를 벡터 스토어에 적재하는 스크립트"""
+import argparse
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.rag.snapshot import export_snapshot
+from app.rag.vectorstore import VectorStoreManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="지식 베이스 증분 적재")
+    parser.add_argument(
+        "--directory",
+        default=str(project_root / "knowledge_base"),
+        help="적재할 지식 베이스 디렉토리",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="기존 청크를 모두 삭제하고 처음부터 다시 적재",
+    )
+    parser.add_argument(
+        "--reembed",
+        action="store_true",
+        help="임베딩 모델 변경 후 컬렉션 전체를 현재 모델로 다시 임베딩",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="파일 로드 프로세스 수 (기본값: 설정값)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="임베딩 배치 크기 (기본값: 설정값)",
+    )
+    parser.add_argument(
+        "--export-snapshot",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="DIR",
+        help="적재 후 읽기 전용 스냅샷으로 내보내기 (DIR 생략 시 VECTOR_SNAPSHOT_PATH)",
+    )
+    parser.add_argument(
+        "--keep-snapshots",
+        type=int,
+        default=3,
+        help="보관할 최근 스냅샷 버전 수",
+    )
+    args = parser.parse_args()
+
+    # 적재는 항상 원본 Chroma 컬렉션에 수행 (스냅샷은 읽기 전용)
+    manager = VectorStoreManager(use_snapshot=False)
+    if args.reembed:
+        # 모델이 바뀐 컬렉션은 일반 초기화에서 거부되므로 검사 없이 열어서 재생성
+        manager.reset_collection()
+        print(f"♻️  컬렉션 초기화: {manager.embedding_model_name}")
+    else:
+        manager.initialize()
+
+    if args.workers is not None:
+        manager.settings.ingest_workers = args.workers
+    if args.batch_size is not None:
+        manager.settings.ingest_batch_size = args.batch_size
+
+    if args.full:
+        stale_ids = list(manager.get_chunk_sources(args.directory))
+        manager.delete_chunks(stale_ids)
+        print(f"🗑️  기존 청크 {len(stale_ids)}개 삭제")
+
+    print(f"🚀 '{args.directory}' 적재 시작...")
+    report = manager.sync_directory(args.directory)
+    print(f"✅ 적재 완료: {report.summary()}")
+
+    if args.export_snapshot is not None:
+        snapshot_root = args.export_snapshot or manager.settings.vector_snapshot_path
+        if not snapshot_root:
+            parser.error("--export-snapshot 경로 또는 VECTOR_SNAPSHOT_PATH 설정이 필요합니다")
+        version, created = export_snapshot(manager, snapshot_root, keep=args.keep_snapshots)
+        if created:
+            print(f"📦 스냅샷 내보내기 완료: {snapshot_root}/{version}")
+        else:
+            print(f"📦 변경 없음, 현재 스냅샷 유지: {version}")
+
+
+if __name__ == "__main__":
+    main()
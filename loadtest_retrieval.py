@@ -0,0 +1,109 @@
+"""동시 검색 부하 테스트 (sync vs async)
+
+asyncio 클라이언트 여러 개가 동시에 검색을 요청할 때의 요청 지연 시간
+(p50/p99)과 이벤트 루프 지연(lag)을 측정합니다.
+
+- sync: 코루틴 안에서 retrieve()를 직접 호출 (기존 /teach 방식, 루프가 막힘)
+- async: aretrieve()로 retrieval 스레드 풀에 위임
+
+쿼리마다 고유 접미사를 붙여 캐시를 우회하므로 매 요청이 실제 임베딩과
+검색을 수행합니다.
+
+사용법:
+    python loadtest_retrieval.py --concurrency 16 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 path에 추가
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.rag.retriever import get_retriever
+
+
+DEFAULT_QUERY_SET = project_root / "data" / "retrieval_eval_queries.json"
+LAG_PROBE_INTERVAL = 0.01
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def probe_loop_lag(stop: asyncio.Event, lags: list[float]) -> None:
+    """주기적으로 잠들었다 깨어나며 예정 시각보다 늦은 만큼을 기록"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        lags.append((time.perf_counter() - started - LAG_PROBE_INTERVAL) * 1000)
+
+
+async def run(retriever, queries: list[str], mode: str, concurrency: int, total: int) -> dict:
+    """한 모드로 total개 요청을 concurrency개 클라이언트가 나눠 수행"""
+    latencies = []
+    lags = []
+    counter = iter(range(total))
+
+    async def client() -> None:
+        for i in counter:
+            query = f"{queries[i % len(queries)]} #{mode}{i}"
+            started = time.perf_counter()
+            if mode == "async":
+                await retriever.aretrieve(query, k=4)
+            else:
+                retriever.retrieve(query, k=4)
+                await asyncio.sleep(0)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(stop, lags))
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    return {
+        "mode": mode,
+        "throughput": total / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": percentile(latencies, 0.99),
+        "lag_p99_ms": percentile(lags, 0.99) if lags else float("nan"),
+        "lag_max_ms": max(lags) if lags else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 검색 부하 테스트")
+    parser.add_argument("--queries", default=str(DEFAULT_QUERY_SET), help="쿼리 셋 JSON")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 클라이언트 수")
+    parser.add_argument("--requests", type=int, default=200, help="모드별 총 요청 수")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"])
+    args = parser.parse_args()
+
+    with open(args.queries, "r", encoding="utf-8") as f:
+        queries = [item["query"] for item in json.load(f)]
+
+    retriever = get_retriever()
+    retriever.retrieve(queries[0], k=4)  # 모델/인덱스 로드는 측정에서 제외
+
+    print(f"📊 동시 클라이언트 {args.concurrency}개, 요청 {args.requests}개, "
+          f"retrieval 스레드 {retriever.settings.retrieval_max_concurrency}개")
+    print(f"{'mode':<6} {'req/s':>8} {'p50(ms)':>9} {'p99(ms)':>9} "
+          f"{'loop lag p99':>13} {'lag max':>9}")
+    for mode in args.modes:
+        result = asyncio.run(run(retriever, queries, mode, args.concurrency, args.requests))
+        print(
+            f"{result['mode']:<6} {result['throughput']:>8.1f} {result['p50_ms']:>9.2f} "
+            f"{result['p99_ms']:>9.2f} {result['lag_p99_ms']:>13.2f} {result['lag_max_ms']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -46,6 +46,53 @@ CREATE TABLE IF NOT EXISTS chat_history (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- 5. 문제 은행 테이블 (미리 생성해 둔 문제)
+CREATE TABLE IF NOT EXISTS problem_bank (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    topic TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    problem_type TEXT NOT NULL,
+    question TEXT NOT NULL,
+    options JSONB,
+    answer TEXT NOT NULL,
+    explanation TEXT,
+    hints JSONB DEFAULT '[]'::JSONB,
+    function_name TEXT,
+    test_cases JSONB DEFAULT '[]'::JSONB,
+    served_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- 채점용 컬럼이 없던 기존 테이블에 컬럼 추가
+ALTER TABLE problem_bank ADD COLUMN IF NOT EXISTS function_name TEXT;
+ALTER TABLE problem_bank ADD COLUMN IF NOT EXISTS test_cases JSONB DEFAULT '[]'::JSONB;
+
+-- 6. 사용자별로 이미 받은 문제 은행 문제
+CREATE TABLE IF NOT EXISTS problem_bank_seen (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    problem_id UUID NOT NULL REFERENCES problem_bank(id) ON DELETE CASCADE,
+    seen_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, problem_id)
+);
+
+-- 7. 여러 프로세스 중 하나만 맡는 백그라운드 작업의 임대 (문제 은행 보충 등)
+CREATE TABLE IF NOT EXISTS background_leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- 8. 코드 리뷰 결과 캐시 (정규화한 AST 해시 + 문제 ID -> 리뷰 결과)
+CREATE TABLE IF NOT EXISTS code_review_cache (
+    cache_key TEXT PRIMARY KEY,
+    problem_id TEXT,
+    result JSONB NOT NULL,
+    execution_output TEXT,
+    hits INTEGER DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    last_used_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- 인덱스 생성 (성능 최적화)
 CREATE INDEX IF NOT EXISTS idx_problem_attempts_user_id ON problem_attempts(user_id);
 CREATE INDEX IF NOT EXISTS idx_problem_attempts_topic ON problem_attempts(topic);
@@ -53,12 +100,19 @@ CREATE INDEX IF NOT EXISTS idx_problem_attempts_attempted_at ON problem_attempts
 CREATE INDEX IF NOT EXISTS idx_chat_history_user_id ON chat_history(user_id);
 CREATE INDEX IF NOT EXISTS idx_chat_history_created_at ON chat_history(created_at);
 CREATE INDEX IF NOT EXISTS idx_learning_sessions_user_id ON learning_sessions(user_id);
+CREATE INDEX IF NOT EXISTS idx_problem_bank_bucket ON problem_bank(topic, difficulty, problem_type, served_count, created_at);
+CREATE INDEX IF NOT EXISTS idx_code_review_cache_last_used ON code_review_cache(last_used_at);
+CREATE INDEX IF NOT EXISTS idx_code_review_cache_created ON code_review_cache(created_at);
 
 -- Row Level Security (RLS) 활성화
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE learning_sessions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE problem_attempts ENABLE ROW LEVEL SECURITY;
 ALTER TABLE chat_history ENABLE ROW LEVEL SECURITY;
+ALTER TABLE problem_bank ENABLE ROW LEVEL SECURITY;
+ALTER TABLE problem_bank_seen ENABLE ROW LEVEL SECURITY;
+ALTER TABLE code_review_cache ENABLE ROW LEVEL SECURITY;
+ALTER TABLE background_leases ENABLE ROW LEVEL SECURITY;
 
 -- RLS 정책 (사용자는 자신의 데이터만 접근 가능)
 -- 익명 사용자도 접근 가능하도록 설정 (교육 앱 특성상)
@@ -79,6 +133,17 @@ CREATE POLICY "Users can manage their own attempts" ON problem_attempts
 CREATE POLICY "Users can manage their own chat history" ON chat_history
     FOR ALL USING (true);
 
+-- 문제 은행 정책
+CREATE POLICY "Anyone can use the problem bank" ON problem_bank
+    FOR ALL USING (true);
+
+CREATE POLICY "Users can manage their own seen problems" ON problem_bank_seen
+    FOR ALL USING (true);
+
+-- 코드 리뷰 캐시 정책
+CREATE POLICY "Anyone can use the code review cache" ON code_review_cache
+    FOR ALL USING (true);
+
 -- ==========================================
 -- RPC 함수들 (통계 계산용)
 -- ==========================================
@@ -198,4 +263,144 @@ AS $$
     HAVING COUNT(*) >= 3
     ORDER BY accuracy ASC
     LIMIT 3;
-$$;
\ No newline at end of file
+$$;
+
+-- ==========================================
+-- RPC 함수들 (문제 은행)
+-- ==========================================
+
+-- 문제 은행에서 문제 하나 꺼내기 (덜 출제된 순, 사용자가 이미 받은 문제 제외)
+CREATE OR REPLACE FUNCTION serve_bank_problem(
+    p_topic TEXT,
+    p_difficulty TEXT,
+    p_problem_type TEXT,
+    p_user_id UUID DEFAULT NULL
+)
+RETURNS SETOF problem_bank
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    picked problem_bank;
+BEGIN
+    SELECT * INTO picked
+    FROM problem_bank pb
+    WHERE pb.topic = p_topic
+        AND pb.difficulty = p_difficulty
+        AND pb.problem_type = p_problem_type
+        AND NOT EXISTS (
+            SELECT 1 FROM problem_bank_seen s
+            WHERE s.user_id = p_user_id AND s.problem_id = pb.id
+        )
+    ORDER BY pb.served_count, pb.created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    UPDATE problem_bank SET served_count = served_count + 1 WHERE id = picked.id;
+    IF p_user_id IS NOT NULL THEN
+        INSERT INTO problem_bank_seen (user_id, problem_id)
+        VALUES (p_user_id, picked.id)
+        ON CONFLICT DO NOTHING;
+    END IF;
+
+    RETURN NEXT picked;
+END;
+$$;
+
+-- 버킷별 전체/미출제 문제 수
+CREATE OR REPLACE FUNCTION get_bank_stock()
+RETURNS TABLE (
+    topic TEXT,
+    difficulty TEXT,
+    problem_type TEXT,
+    total BIGINT,
+    unserved BIGINT
+)
+LANGUAGE SQL
+SECURITY DEFINER
+AS $$
+    SELECT
+        pb.topic,
+        pb.difficulty,
+        pb.problem_type,
+        COUNT(*) as total,
+        SUM(CASE WHEN pb.served_count = 0 THEN 1 ELSE 0 END) as unserved
+    FROM problem_bank pb
+    GROUP BY pb.topic, pb.difficulty, pb.problem_type;
+$$;
+
+-- 백그라운드 작업 임대 획득/연장 (비어 있거나 만료됐거나 이미 p_owner가 가진 경우만)
+CREATE OR REPLACE FUNCTION acquire_lease(p_name TEXT, p_owner TEXT, p_ttl_seconds DOUBLE PRECISION)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+    INSERT INTO background_leases (name, owner, expires_at)
+    VALUES (p_name, p_owner, NOW() + make_interval(secs => p_ttl_seconds))
+    ON CONFLICT (name) DO UPDATE
+        SET owner = EXCLUDED.owner, expires_at = EXCLUDED.expires_at
+        WHERE background_leases.owner = EXCLUDED.owner
+            OR background_leases.expires_at < NOW();
+    RETURN FOUND;
+END;
+$$;
+
+-- 캐시된 코드 리뷰 조회 (히트 수와 마지막 사용 시각 갱신, p_ttl_seconds가 0이면 만료 없음)
+CREATE OR REPLACE FUNCTION get_cached_review(p_cache_key TEXT, p_ttl_seconds INTEGER)
+RETURNS TABLE (
+    result JSONB,
+    execution_output TEXT
+)
+LANGUAGE SQL
+SECURITY DEFINER
+AS $$
+    UPDATE code_review_cache c
+    SET hits = c.hits + 1, last_used_at = NOW()
+    WHERE c.cache_key = p_cache_key
+        AND (p_ttl_seconds <= 0 OR c.created_at >= NOW() - make_interval(secs => p_ttl_seconds))
+    RETURNING c.result, COALESCE(c.execution_output, '');
+$$;
+
+-- 만료 항목 삭제 후 최대 개수를 넘었을 때만 초과분(오래 안 쓰인 순) 삭제
+CREATE OR REPLACE FUNCTION trim_code_review_cache(p_ttl_seconds INTEGER, p_max_entries INTEGER)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    v_excess BIGINT;
+BEGIN
+    IF p_ttl_seconds > 0 THEN
+        DELETE FROM code_review_cache
+        WHERE created_at < NOW() - make_interval(secs => p_ttl_seconds);
+    END IF;
+
+    SELECT COUNT(*) - p_max_entries INTO v_excess FROM code_review_cache;
+    IF v_excess > 0 THEN
+        DELETE FROM code_review_cache
+        WHERE cache_key IN (
+            SELECT cache_key FROM code_review_cache
+            ORDER BY last_used_at
+            LIMIT v_excess
+        );
+    END IF;
+END;
+$$;
+
+-- 코드 리뷰 캐시 항목 수와 누적 히트 수
+CREATE OR REPLACE FUNCTION get_review_cache_stats()
+RETURNS TABLE (
+    entries BIGINT,
+    hits BIGINT
+)
+LANGUAGE SQL
+SECURITY DEFINER
+AS $$
+    SELECT COUNT(*) as entries, COALESCE(SUM(hits), 0) as hits
+    FROM code_review_cache;
+$$;
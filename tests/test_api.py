@@ -0,0 +1,68 @@
+"""API 테스트: 폭주 코드 리뷰가 실행되는 동안에도 다른 요청이 바로 응답하는지"""
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake import FakeListLLM
+
+import api.main as main
+from app.agents.review_agent import CodeReviewAgent
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # 시작 훅의 모델 로드/문제 은행과 리뷰 캐시(DB)는 이 테스트와 무관
+    monkeypatch.setattr(main, "start_background_warmup", lambda: None)
+    monkeypatch.setattr(main.settings, "problem_bank_enabled", False)
+    monkeypatch.setattr(main.settings, "review_cache_enabled", False)
+
+    agent = CodeReviewAgent()
+    agent.llm = FakeListLLM(responses=["### 점수\n0\n### 피드백\n무한 루프입니다."])
+    monkeypatch.setattr(main, "get_review_agent", lambda: agent)
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_health_answers_while_runaway_review_runs(client):
+    review = {}
+    thread = threading.Thread(
+        target=lambda: review.update(
+            response=client.post("/code/review", json={"code": "while True:\n    pass"})
+        )
+    )
+    thread.start()
+    time.sleep(0.3)
+
+    latencies = []
+    for _ in range(5):
+        started = time.perf_counter()
+        assert client.get("/health").status_code == 200
+        latencies.append(time.perf_counter() - started)
+    still_running = thread.is_alive()
+    thread.join()
+
+    assert still_running
+    assert max(latencies) < 0.5
+    assert review["response"].status_code == 200
+    assert not review["response"].json()["is_correct"]
+
+
+def test_rag_cache_stats_reports_hit_ratio(client, monkeypatch):
+    from app.rag.query_cache import QueryCache
+
+    cache = QueryCache(max_size=4)
+    cache.vectors.set("q", [0.0])
+    cache.vectors.get("q")
+    cache.vectors.get("missing")
+
+    class Manager:
+        query_cache = cache
+
+    monkeypatch.setattr(main, "is_ready", lambda: True)
+    monkeypatch.setattr(main, "get_vectorstore_manager", lambda: Manager)
+    stats = client.get("/rag/cache/stats").json()
+    assert stats["ready"]
+    assert stats["vectors"]["hits"] == 1
+    assert stats["vectors"]["hit_ratio"] == 0.5
@@ -0,0 +1,32 @@
+"""SQLite DatabaseManager 테스트: 문제 은행 동시 출제"""
+import threading
+
+from app.database.models import DatabaseManager
+
+
+def test_concurrent_serves_never_repeat_a_problem_for_a_user(tmp_path):
+    db = DatabaseManager(tmp_path / "bank.db")
+    db.save_bank_problems("basics", "beginner", "coding", [
+        {"question": f"문제 {i}", "answer": "", "explanation": ""} for i in range(5)
+    ])
+
+    served = []
+    barrier = threading.Barrier(8)
+
+    def serve():
+        barrier.wait()
+        row = db.serve_bank_problem("basics", "beginner", "coding", user_id=1)
+        if row is not None:
+            served.append(row["id"])
+
+    threads = [threading.Thread(target=serve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 문제는 5개뿐이므로 5번만 성공하고, 같은 문제를 두 번 받지 않음
+    assert sorted(served) == sorted(set(served))
+    assert len(served) == 5
+    stock = db.get_bank_stock()[0]
+    assert stock["unserved"] == 0
@@ -0,0 +1,48 @@
+"""문제 응답 파서 테스트: 손상된 응답 코퍼스에서 기대한 수만큼 복구하고 스트리밍 결과가 같은지"""
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from app.agents.json_parser import ProblemStreamParser, parse_problem_objects
+
+
+CORPUS = Path(__file__).parent.parent / "data" / "malformed_problem_responses.json"
+
+with open(CORPUS, "r", encoding="utf-8") as f:
+    CASES = json.load(f)
+
+
+def stream_parse(response: str, seed: int) -> list[dict]:
+    """1~24자 무작위 조각으로 나눠 스트리밍 파싱"""
+    rng = random.Random(seed)
+    parser = ProblemStreamParser()
+    i = 0
+    while i < len(response):
+        size = rng.randint(1, 24)
+        parser.feed(response[i:i + size])
+        i += size
+    parser.close()
+    return parser.objects
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_recovers_expected_problems(case):
+    objects = parse_problem_objects(case["response"])
+    assert len(objects) >= case["expected"], case["note"]
+    assert all(obj.get("question") for obj in objects[:case["expected"]])
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_streaming_matches_one_shot(case, seed):
+    assert stream_parse(case["response"], seed) == parse_problem_objects(case["response"])
+
+
+def test_single_chunk_stream_matches_one_shot():
+    for case in CASES:
+        parser = ProblemStreamParser()
+        parser.feed(case["response"])
+        parser.close()
+        assert parser.objects == parse_problem_objects(case["response"]), case["name"]
@@ -0,0 +1,157 @@
+"""SandboxPool 격리 테스트: 폭주 코드가 다른 제출을 막지 못하고 풀이 복구되는지"""
+import os
+import threading
+import time
+
+import pytest
+
+from app.sandbox import SandboxPool
+
+
+NORMAL_CODE = "print(sum(range(10)))"
+
+# 객체 그래프로 builtins 제한을 우회해 os 모듈 전역에 접근하는 코드
+ESCAPE_PREFIX = """
+for cls in ().__class__.__base__.__subclasses__():
+    if cls.__name__ == "_wrap_close":
+        g = cls.__init__.__globals__
+"""
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SandboxPool(size=2, cpu_seconds=1, memory_mb=256, timeout=3.0, max_output=1000)
+    yield pool
+    pool.shutdown()
+
+
+def test_normal_submission(pool):
+    result = pool.execute(NORMAL_CODE)
+    assert result["success"]
+    assert result["output"] == "45\n"
+
+
+def test_infinite_loop_is_killed(pool):
+    started = time.perf_counter()
+    result = pool.execute("while True:\n    pass")
+    assert not result["success"]
+    assert result["error"].startswith("TimeoutError")
+    assert time.perf_counter() - started < 3.5
+
+
+def test_oversized_allocation_is_rejected(pool):
+    result = pool.execute("data = [0] * (10 ** 10)")
+    assert not result["success"]
+    assert result["error"].startswith("MemoryError")
+
+
+def test_output_flood_is_cut(pool):
+    result = pool.execute("while True:\n    print('spam' * 100)")
+    assert not result["success"]
+    assert result["error"].startswith("OutputLimitExceeded")
+    assert len(result["output"]) <= 1000
+
+
+def test_normal_submission_finishes_while_runaway_is_killed(pool):
+    runaway = {}
+    thread = threading.Thread(
+        target=lambda: runaway.update(pool.execute("while True:\n    pass"))
+    )
+    thread.start()
+    time.sleep(0.1)
+
+    latencies = []
+    for _ in range(20):
+        started = time.perf_counter()
+        assert pool.execute(NORMAL_CODE)["success"]
+        latencies.append(time.perf_counter() - started)
+    finished_while_running = thread.is_alive()
+    thread.join()
+
+    assert finished_while_running
+    assert max(latencies) < 1.0
+    assert runaway["error"].startswith("TimeoutError")
+
+
+def test_pool_recovers_after_runaway(pool):
+    pool.execute("while True:\n    pass", timeout=0.5)
+    assert pool.execute(NORMAL_CODE)["success"]
+    stats = pool.stats()
+    assert stats["idle"] == stats["size"]
+
+
+def test_pool_refills_slots_after_spawn_failures(monkeypatch):
+    pool = SandboxPool(size=1, cpu_seconds=1, timeout=3.0, max_jobs=1)
+    try:
+        spawn = pool._spawn
+
+        def broken_spawn():
+            raise OSError("fork failed")
+
+        # 작업 뒤 교체 워커를 띄우지 못하면 빈 자리로 남고, 워커가 없으니 작업은 실패
+        monkeypatch.setattr(pool, "_spawn", broken_spawn)
+        assert pool.execute(NORMAL_CODE)["success"]
+        assert pool.stats()["missing"] == 1
+        assert not pool.execute(NORMAL_CODE)["success"]
+
+        # 다시 띄울 수 있게 되면 다음 작업 때 풀 크기를 회복
+        monkeypatch.setattr(pool, "_spawn", spawn)
+        assert pool.execute(NORMAL_CODE)["success"]
+        stats = pool.stats()
+        assert stats["missing"] == 0
+        assert stats["idle"] == stats["size"]
+    finally:
+        pool.shutdown()
+
+
+def test_submission_cannot_poison_later_submissions(pool):
+    poison = ESCAPE_PREFIX + """
+        g["sys"].modules["app.sandbox.worker"].values_match = lambda actual, expected: True
+def answer():
+    return 0
+"""
+    tests = [{"input": [], "expected": 42}]
+    assert not pool.judge(poison, "answer", tests)["tests"][0]["passed"]
+    assert not pool.judge("def answer():\n    return 0", "answer", tests)["tests"][0]["passed"]
+    assert pool.judge("def answer():\n    return 42", "answer", tests)["tests"][0]["passed"]
+
+
+def test_type_is_available(pool):
+    # 입문 자료(python_basics/variables_and_types.md)에서 쓰는 type()은 그대로 동작
+    result = pool.execute("print(type(1))")
+    assert result["success"]
+    assert result["output"] == "<class 'int'>\n"
+
+
+def test_worker_does_not_inherit_secrets(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test-secret")
+    pool = SandboxPool(size=1, cpu_seconds=1, timeout=3.0)
+    try:
+        result = pool.execute(ESCAPE_PREFIX + '        print(g["environ"].get("ANTHROPIC_API_KEY"))')
+    finally:
+        pool.shutdown()
+    assert "sk-test-secret" not in result["output"]
+
+
+def test_pool_refuses_same_user_execution_unless_allowed(monkeypatch):
+    # root가 아닌 웹 앱처럼 보이게 해 권한을 낮출 수 없는 상황을 만듦
+    monkeypatch.setattr(os, "geteuid", lambda: 1000)
+    refused = SandboxPool(size=1, cpu_seconds=1, timeout=3.0)
+    try:
+        result = refused.execute(NORMAL_CODE)
+    finally:
+        refused.shutdown()
+    assert not result["success"]
+    assert result["unavailable"]
+
+    allowed = SandboxPool(size=1, cpu_seconds=1, timeout=3.0, allow_same_user=True)
+    try:
+        assert allowed.execute(NORMAL_CODE)["success"]
+    finally:
+        allowed.shutdown()
+
+
+def test_submission_cannot_start_processes(pool):
+    result = pool.execute(ESCAPE_PREFIX + '        print(g["popen"]("echo escaped").read())')
+    assert "escaped" not in result["output"]
+    assert not result["success"]